@@ -0,0 +1,94 @@
+"""
+Benchmark of the vectorized `ProcessAdxBlock` against the row-wise `df.apply` implementation.
+
+    python benchmarks/bench_adx.py --years 10 --number 20
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from kabutobashi.domain.entity.blocks.process_blocks import ProcessAdxBlock
+
+COLUMNS = ["DX", "ADX", "ADXR", "adx_buy_signal", "adx_sell_signal"]
+
+
+def _true_range(x: pd.Series) -> float:
+    a = x["high"] - x["low"]
+    b = x["high"] - x["shift_close"]
+    c = x["shift_close"] - x["low"]
+    return max(max(a, b), max(a, c))
+
+
+def _fixed_dm(dm: float, opposite_dm: float) -> float:
+    return dm if dm > 0 and dm > opposite_dm else 0
+
+
+def _row_wise(df: pd.DataFrame, term: int, adx_term: int, adxr_term: int) -> pd.DataFrame:
+    # `ProcessAdxBlock` before the vectorization
+    df = df.assign(shift_high=df["high"].shift(1), shift_low=df["low"].shift(1), shift_close=df["close"].shift(1))
+    df = df.assign(
+        plus_dm=df.apply(lambda x: x["high"] - x["shift_high"], axis=1),
+        minus_dm=df.apply(lambda x: x["shift_low"] - x["low"], axis=1),
+    )
+    df = df.assign(
+        fixed_plus_dm=df.apply(lambda x: _fixed_dm(x["plus_dm"], x["minus_dm"]), axis=1),
+        fixed_minus_dm=df.apply(lambda x: _fixed_dm(x["minus_dm"], x["plus_dm"]), axis=1),
+    )
+    df = df.assign(
+        true_range=df.apply(_true_range, axis=1),
+        sum_tr=lambda x: x["true_range"].rolling(term).sum(),
+        sum_plus_dm=lambda x: x["fixed_plus_dm"].rolling(term).sum(),
+        sum_minus_dm=lambda x: x["fixed_minus_dm"].rolling(term).sum(),
+    )
+    df = df.assign(
+        plus_di=df.apply(lambda x: x["sum_plus_dm"] / x["sum_tr"] * 100, axis=1),
+        minus_di=df.apply(lambda x: x["sum_minus_dm"] / x["sum_tr"] * 100, axis=1),
+    )
+    df = df.assign(
+        DX=df.apply(lambda x: abs(x["plus_di"] - x["minus_di"]) / (x["plus_di"] + x["minus_di"]) * 100, axis=1),
+        ADX=lambda x: x["DX"].rolling(adx_term).mean(),
+        ADXR=lambda x: x["DX"].rolling(adxr_term).mean(),
+    )
+    adx_trend = (df["ADX"] - df["ADX"].shift(1)).rolling(5).sum()
+    diff = df["plus_di"] - df["minus_di"]
+    shifted = diff.shift(1)
+    is_cross = diff * shifted < 0
+    df["adx_buy_signal"] = ((adx_trend > 0) & is_cross & (diff > shifted)).astype(int)
+    df["adx_sell_signal"] = ((adx_trend < 0) & is_cross & (diff < shifted)).astype(int)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    n = args.years * 250
+    close = 1000 + np.cumsum(rng.normal(0, 10, n))
+    high = close + rng.uniform(0, 15, n)
+    low = close - rng.uniform(0, 15, n)
+    open_ = low + (high - low) * rng.uniform(0, 1, n)
+    price_df = pd.DataFrame({"open": open_, "high": high, "low": low, "close": close})
+    block = ProcessAdxBlock(series=price_df, params={})
+
+    def _row():
+        return _row_wise(df=price_df, term=block.term, adx_term=block.adx_term, adxr_term=block.adxr_term)
+
+    expected = _row()
+    actual = block._process()
+    for column in COLUMNS:
+        pd.testing.assert_series_equal(actual[column], expected[column], check_exact=True, check_dtype=False)
+    row_time = min(timeit.repeat(_row, number=1, repeat=3))
+    vectorized_time = min(timeit.repeat(block._process, number=args.number, repeat=3)) / args.number
+    print(f"rows={n}")
+    print(f"df.apply  : {row_time * 1000:.3f} ms")
+    print(f"vectorized: {vectorized_time * 1000:.3f} ms ({row_time / vectorized_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark of the impacts of all the signals at once against `get_impact()` of each prefix over the full rows.
+
+    python benchmarks/bench_impacts.py --rows 2500 --repeat 200
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from kabutobashi.domain.entity.blocks.parameterize_blocks import get_impacts
+
+PREFIXES = ["sma", "macd", "adx", "bollinger_bands", "momentum", "psycho_logical", "stochastics"]
+
+
+def _full_impact(df: pd.DataFrame, prefix: str, influence: int = 2, tail: int = 5) -> float:
+    # `get_impact()` before the batched and bounded calculation
+    buy_impact = df[f"{prefix}_buy_signal"].ewm(span=influence).mean()
+    sell_impact = df[f"{prefix}_sell_signal"].ewm(span=influence).mean()
+    return round(buy_impact.iloc[-tail:].sum() - sell_impact.iloc[-tail:].sum(), 5)
+
+
+def _elapsed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    df = pd.DataFrame(
+        {f"{p}_{side}_signal": (rng.random(args.rows) < 0.1).astype(int) for p in PREFIXES for side in ["buy", "sell"]}
+    )
+    expected = {f"{p}_impact": _full_impact(df, p) for p in PREFIXES}
+    assert get_impacts(df=df) == expected
+
+    full_time = _elapsed(lambda: {p: _full_impact(df, p) for p in PREFIXES}, args.repeat)
+    batched_time = _elapsed(lambda: get_impacts(df=df), args.repeat)
+    print(f"rows={args.rows} prefixes={len(PREFIXES)}")
+    print(
+        f"all prefixes full: {full_time * 1000:.3f} ms, batched: {batched_time * 1000:.3f} ms"
+        f" ({full_time / batched_time:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark of the daily update of one bar from the incremental state against the process blocks over the history.
+
+    python benchmarks/bench_incremental_update.py --rows 2500 --days 20
+"""
+
+import argparse
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from kabutobashi.domain.services.incremental import DEFAULT_INCREMENTAL_BLOCKS, IncrementalIndicators
+
+
+def _elapsed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2500)
+    parser.add_argument("--days", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    close = 1000 + np.cumsum(rng.normal(0, 10, args.rows + args.days)).round()
+    df = pd.DataFrame(
+        {"open": close, "high": close + 10, "low": close - 10, "close": close, "volume": 1000},
+        index=[f"d{i:05d}" for i in range(len(close))],
+    )
+    history, days = df.iloc[: args.rows], df.iloc[args.rows :]
+    indicators = IncrementalIndicators()
+    bootstrap_time = _elapsed(lambda: indicators.update_frame(history))
+    state_bytes = len(pickle.dumps(indicators))
+
+    def _full():
+        for idx in range(1, len(days) + 1):
+            series = df.iloc[: args.rows + idx]
+            for block in DEFAULT_INCREMENTAL_BLOCKS:
+                block(series=series, params={})._process()
+
+    def _incremental():
+        for dt, bar in days.iterrows():
+            indicators.update(bar, dt=dt)
+
+    full_time = _elapsed(_full) / len(days)
+    incremental_time = _elapsed(_incremental) / len(days)
+    print(f"rows={args.rows} days={args.days} bootstrap: {bootstrap_time * 1000:.1f} ms, state: {state_bytes} bytes")
+    print(
+        f"per day full: {full_time * 1000:.2f} ms, incremental: {incremental_time * 1000:.3f} ms"
+        f" ({full_time / incremental_time:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark of the intraday bars updated by the incremental indicators against the process blocks over the bars.
+
+    python benchmarks/bench_intraday_bars.py --codes 20 --minutes 1
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from kabutobashi.domain.services.incremental import DEFAULT_INCREMENTAL_BLOCKS, IntradayBarBuilder
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--codes", type=int, default=20)
+    parser.add_argument("--minutes", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    timestamps = pd.date_range("2024-01-05 09:00", "2024-01-05 14:59", freq="10s")
+    codes = [str(1000 + idx) for idx in range(args.codes)]
+    snapshots = [
+        {"code": code, "timestamp": ts, "close": 1000 + rng.normal(0, 5), "volume": idx * 100}
+        for idx, ts in enumerate(timestamps)
+        for code in codes
+    ]
+
+    # warm up, e.g. the compilation of the kernels
+    warm_up = IntradayBarBuilder(minutes=args.minutes)
+    list(warm_up.consume(snapshots[: 100 * args.codes]))
+    warm_up.flush()
+
+    builder = IntradayBarBuilder(minutes=args.minutes)
+    start = time.perf_counter()
+    bars = list(builder.consume(snapshots))
+    bars += builder.flush()
+    elapsed = time.perf_counter() - start
+
+    # a bar of a code recomputed by the process blocks over the bars of the day
+    series = builder.bars(code=codes[0])[["open", "high", "low", "close", "volume"]]
+    for block in DEFAULT_INCREMENTAL_BLOCKS:
+        # warm up
+        block(series=series, params={})._process()
+    start = time.perf_counter()
+    for block in DEFAULT_INCREMENTAL_BLOCKS:
+        block(series=series, params={})._process()
+    full_time = time.perf_counter() - start
+
+    per_bar = elapsed / len(bars)
+    print(f"codes={args.codes} minutes={args.minutes} snapshots={len(snapshots)} bars={len(bars)}")
+    print(f"total: {elapsed:.2f} s, per bar: {per_bar * 1000:.3f} ms (including the snapshots)")
+    print(f"per bar full: {full_time * 1000:.2f} ms over {len(series)} bars ({full_time / per_bar:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
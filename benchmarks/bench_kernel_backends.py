@@ -0,0 +1,79 @@
+"""
+Benchmark of the numba kernel backend against the numpy one, on (bars, codes) arrays.
+The numba kernels are compiled before the timing.
+
+    python benchmarks/bench_kernel_backends.py --rows 2500 --columns 4000 --number 3
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from kabutobashi.domain.entity.blocks.kernels import (
+    kernel_backend,
+    numba_available,
+    rolling_max,
+    rolling_mean,
+    rolling_min,
+    shift,
+)
+from kabutobashi.domain.entity.blocks.process_blocks import ProcessAdxBlock, ProcessStochasticsBlock
+from kabutobashi.domain.entity.blocks.process_blocks.abc_process_block import cross_signals
+
+
+def _cross(values: dict):
+    cross_signals(values["diff"])
+
+
+def _stochastics(values: dict):
+    args = values["stochastics"]
+    ProcessStochasticsBlock._buy_signal_index(*args)
+    ProcessStochasticsBlock._sell_signal_index(*args)
+
+
+def _directional_movement(values: dict):
+    high, low, close = values["high"], values["low"], values["close"]
+    ProcessAdxBlock._directional_movement(high, low, shift(high), shift(low), shift(close))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2500)
+    parser.add_argument("--columns", type=int, default=4000)
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args()
+    if not numba_available():
+        raise SystemExit("numba is not installed")
+
+    rng = np.random.default_rng(seed=0)
+    close = 1000 + np.cumsum(rng.normal(0, 10, (args.rows, args.columns)), axis=0)
+    high = close + rng.uniform(0, 15, close.shape)
+    low = close - rng.uniform(0, 15, close.shape)
+    lowest, highest = rolling_min(low, 9), rolling_max(high, 9)
+    k = np.nan_to_num((close - lowest) / (highest - lowest) * 100)
+    d = np.nan_to_num(rolling_mean(k, 3))
+    sd = np.nan_to_num(rolling_mean(d, 3))
+    values = {
+        "diff": close - shift(close),
+        "stochastics": (k, d, sd, shift(k, fill_value=0), shift(d, fill_value=0), shift(sd, fill_value=0)),
+        "high": high,
+        "low": low,
+        "close": close,
+    }
+
+    print(f"rows={args.rows} columns={args.columns}")
+    for name, func in [("cross", _cross), ("stochastics", _stochastics), ("directional", _directional_movement)]:
+        times = {}
+        for backend in ["numpy", "numba"]:
+            with kernel_backend(backend):
+                func(values)
+                times[backend] = min(timeit.repeat(lambda: func(values), number=args.number, repeat=3)) / args.number
+        print(
+            f"{name:<12} numpy: {times['numpy'] * 1000:.1f} ms, numba: {times['numba'] * 1000:.1f} ms"
+            f" ({times['numpy'] / times['numba']:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of `ProcessPsychoLogicalBlock` and `ProcessSmaBlock` against their former row-wise `apply`.
+
+    python benchmarks/bench_psycho_logical_sma.py --rows 2500 --number 20
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from kabutobashi.domain.entity.blocks.process_blocks import ProcessPsychoLogicalBlock, ProcessSmaBlock
+from kabutobashi.domain.entity.blocks.process_blocks.abc_process_block import cross
+
+
+def _row_psycho_logical(df: pd.DataFrame, psycho_term: int = 12) -> pd.DataFrame:
+    df_ = df.copy()
+    df_["shift_close"] = df_["close"].shift(1)
+    df_ = df_.fillna(0)
+    df_["diff"] = df_.apply(lambda x: x["close"] - x["shift_close"], axis=1)
+    df_["is_raise"] = df_["diff"].apply(lambda x: 1 if x > 0 else 0)
+    df_["psycho_sum"] = df_["is_raise"].rolling(psycho_term).sum()
+    df_["psycho_line"] = df_["psycho_sum"].apply(lambda x: x / psycho_term)
+    df_["bought_too_much"] = df_["psycho_line"].apply(lambda x: 1 if x > 0.75 else 0)
+    df_["sold_too_much"] = df_["psycho_line"].apply(lambda x: 1 if x < 0.25 else 0)
+    return df_
+
+
+def _row_sma(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.assign(
+        sma_short=df["close"].rolling(5).mean(),
+        sma_medium=df["close"].rolling(21).mean(),
+        sma_long=df["close"].rolling(70).mean(),
+    )
+    df["diff"] = df.apply(lambda x: x["sma_long"] - x["sma_short"], axis=1)
+    return df.join(cross(df["diff"], to_plus_name="sma_buy_signal", to_minus_name="sma_sell_signal"))
+
+
+def _timeit(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2500)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    close = 1000 + np.cumsum(rng.normal(0, 10, args.rows)).round()
+    df = pd.DataFrame({"close": close})
+
+    print(f"rows={args.rows}")
+    for name, row_wise, block in [
+        ("psycho_logical", _row_psycho_logical, ProcessPsychoLogicalBlock),
+        ("sma", _row_sma, ProcessSmaBlock),
+    ]:
+        row_time = _timeit(lambda: row_wise(df), number=1)
+        vectorized_time = _timeit(lambda: block(series=df, params={})._process(), number=args.number)
+        print(f"{name:<15} apply: {row_time * 1000:.3f} ms, vectorized: {vectorized_time * 1000:.3f} ms", end="")
+        print(f" ({row_time / vectorized_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
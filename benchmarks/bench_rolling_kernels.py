@@ -0,0 +1,63 @@
+"""
+Benchmark of `RollingKernel` against pandas rolling, for the statistics of the process blocks.
+
+    python benchmarks/bench_rolling_kernels.py --rows 2500 --columns 1 --number 20
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from kabutobashi.domain.entity.blocks.kernels import RollingKernel
+
+# (statistic, window) of ichimoku, stochastics, bollinger bands and sma
+STATISTICS = [
+    ("max", 12),
+    ("min", 12),
+    ("max", 26),
+    ("min", 26),
+    ("max", 52),
+    ("min", 52),
+    ("max", 9),
+    ("min", 9),
+    ("mean", 12),
+    ("std", 12),
+    ("mean", 5),
+    ("mean", 21),
+    ("mean", 70),
+]
+
+
+def _pandas(df: pd.DataFrame):
+    for statistic, window in STATISTICS:
+        getattr(df.rolling(window), statistic)().to_numpy()
+
+
+def _kernel(values: np.ndarray):
+    kernel = RollingKernel(values)
+    for statistic, window in STATISTICS:
+        getattr(kernel, statistic)(window)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2500)
+    parser.add_argument("--columns", type=int, default=1)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    values = 1000 + np.cumsum(rng.normal(0, 10, (args.rows, args.columns)), axis=0).round()
+    df = pd.DataFrame(values)
+
+    pandas_time = min(timeit.repeat(lambda: _pandas(df), number=args.number, repeat=3)) / args.number
+    kernel_time = min(timeit.repeat(lambda: _kernel(values), number=args.number, repeat=3)) / args.number
+    print(f"rows={args.rows} columns={args.columns} statistics={len(STATISTICS)}")
+    print(f"pandas rolling: {pandas_time * 1000:.3f} ms")
+    print(f"RollingKernel : {kernel_time * 1000:.3f} ms ({pandas_time / kernel_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
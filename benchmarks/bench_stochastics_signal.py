@@ -0,0 +1,88 @@
+"""
+Benchmark of the vectorized `ProcessStochasticsBlock` signal index against the row-wise `df.apply`.
+
+    python benchmarks/bench_stochastics_signal.py --years 10 --number 20
+"""
+
+import argparse
+import math
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from kabutobashi.domain.entity.blocks.process_blocks import ProcessStochasticsBlock
+
+COLUMNS = ["K", "D", "SD", "shift_K", "shift_D", "shift_SD"]
+
+
+def _row_buy_signal_index(x: pd.Series) -> float:
+    current_k, current_d, current_sd, prev_k, prev_d, prev_sd = x[COLUMNS]
+    if (current_k > 30) | (current_d > 30) | (current_sd > 30):
+        return 0
+    if current_k < 20 and current_d < 20:
+        if (prev_d > prev_k) and (current_d < current_k):
+            return current_k - current_d
+    if current_d < 20 and current_sd < 20:
+        if (prev_sd > prev_d) and (current_sd < current_d):
+            return current_d - current_sd
+    return 1 / math.exp(
+        math.pow(current_k - 20, 2) / 100 + math.pow(current_d - 20, 2) / 100 + math.pow(current_sd - 20, 2) / 100
+    )
+
+
+def _row_sell_signal_index(x: pd.Series) -> float:
+    current_k, current_d, current_sd, prev_k, prev_d, prev_sd = x[COLUMNS]
+    if (current_k < 70) | (current_d < 70) | (current_sd < 70):
+        return 0
+    if current_k > 80 and current_d > 80:
+        if (prev_d < prev_k) and (current_d > current_k):
+            return current_d - current_k
+    if current_d > 80 and current_sd > 80:
+        if (prev_sd < prev_d) and (current_sd > current_d):
+            return current_d - current_sd
+    return 1 / math.exp(
+        math.pow(current_k - 20, 2) / 100 + math.pow(current_d - 20, 2) / 100 + math.pow(current_sd - 20, 2) / 100
+    )
+
+
+def _row_wise(df: pd.DataFrame):
+    return df.apply(_row_buy_signal_index, axis=1), df.apply(_row_sell_signal_index, axis=1)
+
+
+def _vectorized(df: pd.DataFrame):
+    args = [df[c].to_numpy() for c in COLUMNS]
+    return ProcessStochasticsBlock._buy_signal_index(*args), ProcessStochasticsBlock._sell_signal_index(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    n = args.years * 250
+    close = 1000 + np.cumsum(rng.normal(0, 10, n))
+    high = close + rng.uniform(0, 15, n)
+    low = close - rng.uniform(0, 15, n)
+    price_df = pd.DataFrame({"close": close, "high": high, "low": low})
+    block = ProcessStochasticsBlock(series=price_df, params={})
+    applied_df = block._apply(df=price_df)
+    df = applied_df.assign(
+        shift_K=lambda x: x["K"].shift(1),
+        shift_D=lambda x: x["D"].shift(1),
+        shift_SD=lambda x: x["SD"].shift(1),
+    ).fillna(0)
+
+    for expected, actual in zip(_row_wise(df), _vectorized(df)):
+        assert np.array_equal(expected.to_numpy(), actual)
+    row_time = min(timeit.repeat(lambda: _row_wise(df), number=1, repeat=3))
+    vectorized_time = min(timeit.repeat(lambda: _vectorized(df), number=args.number, repeat=3)) / args.number
+    print(f"rows={n}")
+    print(f"df.apply  : {row_time * 1000:.3f} ms")
+    print(f"vectorized: {vectorized_time * 1000:.3f} ms ({row_time / vectorized_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
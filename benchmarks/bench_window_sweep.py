@@ -0,0 +1,55 @@
+"""
+Benchmark of a sweep of windows in one block against a block for each window.
+
+    python benchmarks/bench_window_sweep.py --rows 2500 --windows 100
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from kabutobashi.domain.entity.blocks.process_blocks import (
+    ProcessBollingerBandsBlock,
+    ProcessMacdBlock,
+    ProcessSmaBlock,
+)
+
+
+def _elapsed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2500)
+    parser.add_argument("--windows", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    df = pd.DataFrame({"close": 1000 + np.cumsum(rng.normal(0, 10, args.rows)).round()})
+    windows = np.linspace(5, 200, args.windows).astype(int).tolist()
+    sweeps = [
+        (ProcessSmaBlock, [{"short_term": w, "long_term": 200} for w in windows]),
+        (ProcessMacdBlock, [{"short_term": w, "long_term": 200} for w in windows]),
+        (ProcessBollingerBandsBlock, [{"band_term": w} for w in windows]),
+    ]
+
+    print(f"rows={args.rows} windows={args.windows}")
+    for block, params_list in sweeps:
+        # the blocks are called once, to compile the kernels of the numba backend
+        block(series=df, params=params_list[0])._process()
+        each_time = _elapsed(lambda: [block(series=df, params=params)._process() for params in params_list])
+        sweep_params = {k: [params[k] for params in params_list] for k in params_list[0].keys()}
+        sweep_time = _elapsed(lambda: block(series=df, params=sweep_params)._process())
+        print(
+            f"{block.block_name:<24} each: {each_time * 1000:.1f} ms, sweep: {sweep_time * 1000:.1f} ms"
+            f" ({each_time / sweep_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,17 @@
-from .application import analysis, crawl_info, crawl_info_multiple, crawl_ipo, crawl_missing_info, decode_brand_list
+from .application import (
+    analysis,
+    analysis_stream,
+    crawl_info,
+    crawl_info_multiple,
+    crawl_ipo,
+    crawl_missing_info,
+    decode_brand_list,
+)
 from .domain import errors
 from .domain.entity.blocks import block
 from .domain.services.flow import Flow, FlowPath
+from .domain.services.incremental import IncrementalIndicators, IndicatorStateStore, IntradayBarBuilder
+from .domain.services.panel import PricePanel
 
 # methods to analysis
 from .domain.values import DecodeHtmlPageStockIpo, RawHtmlPageStockInfo, RawHtmlPageStockIpo
@@ -1,3 +1,3 @@
-from .analysis_application import analysis
+from .analysis_application import analysis, analysis_stream
 from .applications import decode_brand_list
 from .crawl_application import crawl_info, crawl_info_multiple, crawl_ipo, crawl_missing_info
@@ -1,3 +1,5 @@
+from typing import Iterator, List, Optional, Union
+
 from kabutobashi.domain.entity.blocks.parameterize_blocks import (
     ParameterizeAdxBlock,
     ParameterizeBollingerBandsBlock,
@@ -20,34 +22,86 @@ from kabutobashi.domain.entity.blocks.process_blocks import (
 from kabutobashi.domain.entity.blocks.read_blocks import ReadSqlite3Block
 from kabutobashi.domain.entity.blocks.reduce_blocks import FullyConnectBlock
 from kabutobashi.domain.entity.blocks.write_blocks import WriteImpactSqlite3Block
-from kabutobashi.domain.services.flow import Flow
-
-
-def analysis(code: str, database_dir: str):
-    blocks = [
-        ReadSqlite3Block,
-        DefaultPreProcessBlock,
-        ProcessSmaBlock,
-        ParameterizeSmaBlock,
-        ProcessMacdBlock,
-        ParameterizeMacdBlock,
-        ProcessAdxBlock,
-        ParameterizeAdxBlock,
-        ProcessBollingerBandsBlock,
-        ParameterizeBollingerBandsBlock,
-        ProcessMomentumBlock,
-        ParameterizeMomentumBlock,
-        ProcessPsychoLogicalBlock,
-        ParameterizePsychoLogicalBlock,
-        ProcessStochasticsBlock,
-        ParameterizeStochasticsBlock,
-        FullyConnectBlock,
-        WriteImpactSqlite3Block,
-    ]
-
-    return Flow.initialize(
-        params={
-            "read_sqlite3": {"code": code, "database_dir": database_dir},
-            "write_impact_sqlite3": {"database_dir": database_dir},
-        }
-    ).then(blocks)
+from kabutobashi.domain.services.flow import DagScheduler, Flow, FlowStreamResult, required_lookback
+
+ANALYSIS_BLOCKS = [
+    ReadSqlite3Block,
+    DefaultPreProcessBlock,
+    ProcessSmaBlock,
+    ParameterizeSmaBlock,
+    ProcessMacdBlock,
+    ParameterizeMacdBlock,
+    ProcessAdxBlock,
+    ParameterizeAdxBlock,
+    ProcessBollingerBandsBlock,
+    ParameterizeBollingerBandsBlock,
+    ProcessMomentumBlock,
+    ParameterizeMomentumBlock,
+    ProcessPsychoLogicalBlock,
+    ParameterizePsychoLogicalBlock,
+    ProcessStochasticsBlock,
+    ParameterizeStochasticsBlock,
+    FullyConnectBlock,
+    WriteImpactSqlite3Block,
+]
+
+
+def analysis(
+    code: str,
+    database_dir: str,
+    scheduler: Optional[DagScheduler] = None,
+    keep_outputs: Union[bool, List[str]] = True,
+    bounded_read: bool = True,
+):
+    """
+    Args:
+        code: code of the stock
+        database_dir: directory of the database
+        scheduler: if given, independent blocks are executed concurrently
+        keep_outputs: see `Flow.initialize()`
+        bounded_read: if True, only the latest rows required by the blocks are read, see `required_lookback()`
+    """
+    blocks = ANALYSIS_BLOCKS
+
+    params = {
+        "read_sqlite3": {"code": code, "database_dir": database_dir},
+        "write_impact_sqlite3": {"database_dir": database_dir},
+    }
+    if bounded_read:
+        params["read_sqlite3"]["lookback"] = required_lookback(blocks=blocks, params=params)
+    return Flow.initialize(params=params, keep_outputs=keep_outputs).then(blocks, scheduler=scheduler)
+
+
+def analysis_stream(
+    database_dir: str,
+    chunk_size: int = 100,
+    max_in_flight_rows: Optional[int] = 100_000,
+    max_workers: Optional[int] = None,
+    bounded_read: bool = True,
+) -> Iterator[FlowStreamResult]:
+    """
+    `analysis()` of all the codes of the brand table, see `Flow.stream()`.
+    Only the output of `fully_connect` is kept in the results.
+
+    Args:
+        database_dir: directory of the database
+        chunk_size: number of codes read from the brand table at once
+        max_in_flight_rows: maximum rows of the codes executed and not yet yielded
+        max_workers: number of processes
+        bounded_read: if True, only the latest rows required by the blocks are read, see `required_lookback()`
+    """
+    params = {
+        "read_sqlite3": {"code": None, "database_dir": database_dir},
+        "write_impact_sqlite3": {"database_dir": database_dir},
+    }
+    if bounded_read:
+        params["read_sqlite3"]["lookback"] = required_lookback(blocks=ANALYSIS_BLOCKS, params=params)
+    params_list = [{"block_name": b.block_name, "params": params.get(b.block_name, {})} for b in ANALYSIS_BLOCKS]
+    return Flow.stream(
+        params_list=params_list,
+        database_dir=database_dir,
+        chunk_size=chunk_size,
+        max_in_flight_rows=max_in_flight_rows,
+        max_workers=max_workers,
+        keep_outputs=["fully_connect"],
+    )
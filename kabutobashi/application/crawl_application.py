@@ -23,7 +23,8 @@ def crawl_info(code: str, database_dir: str):
             "crawl_stock_info": {"code": code},
             "default_pre_process": {"for_analysis": False},
             "write_stock_sqlite3": {"database_dir": database_dir},
-        }
+        },
+        keep_outputs=["default_pre_process"],
     ).then(blocks)
     return res.block_glue["default_pre_process"].series
 
@@ -41,7 +42,8 @@ def crawl_info_multiple(code: str, page: str, database_dir: str) -> pd.DataFrame
             "crawl_stock_info_multiple_days_2": {"code": code, "page": page},
             "default_pre_process": {"for_analysis": False},
             "write_stock_sqlite3": {"database_dir": database_dir},
-        }
+        },
+        keep_outputs=["default_pre_process"],
     ).then(blocks)
     return res.block_glue["default_pre_process"].series
 
@@ -57,7 +59,8 @@ def crawl_ipo(year: str, database_dir: str):
         params={
             "crawl_stock_ipo": {"year": year},
             "write_brand_sqlite3": {"database_dir": database_dir},
-        }
+        },
+        keep_outputs=["extract_stock_ipo"],
     ).then(blocks)
     return res.block_glue["extract_stock_ipo"].series
 
@@ -87,7 +90,8 @@ def crawl_missing_info(code: str, database_dir: str):
             params={
                 "crawl_stock_info_multiple_days_2": {"code": code, "page": "1"},
                 "default_pre_process": {"for_analysis": False},
-            }
+            },
+            keep_outputs=["default_pre_process"],
         ).then(blocks)
         df = res.block_glue["default_pre_process"].series
         df = df.reset_index(drop=True)
@@ -1,2 +1,4 @@
-from .basis_blocks import BlockGlue, BlockOutput
+from .basis_blocks import BlockGlue, BlockOutput, BlockProfile
+from .block_cache import BlockCache, BlockCacheStats
 from .decorator import block, block_from
+from .feature_cache import FeatureCache, FeatureCacheStats
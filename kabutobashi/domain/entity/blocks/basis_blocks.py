@@ -1,15 +1,19 @@
 from dataclasses import dataclass, field, replace
 from logging import getLogger
-from typing import Dict, List, Literal, Optional, TypeAlias, Union
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Tuple, TypeAlias, Union
 
 import pandas as pd
 
 from kabutobashi.domain.errors import KabutobashiBlockGlueError
 
+if TYPE_CHECKING:
+    from .block_cache import BlockCache
+    from .feature_cache import FeatureCache
+
 logger = getLogger(__name__)
 
-__all__ = ["BlockGlue", "BlockOutput", "SeriesRequiredColumnsMode"]
-SeriesRequiredColumnsMode: TypeAlias = Literal["strict", "all"]
+__all__ = ["BlockGlue", "BlockOutput", "BlockProfile", "SeriesRequiredColumnsMode"]
+SeriesRequiredColumnsMode: TypeAlias = Literal["strict", "available", "all"]
 
 
 @dataclass(frozen=True)
@@ -18,12 +22,52 @@ class BlockInput:
     params: dict
 
 
+@dataclass(frozen=True)
+class BlockProfile:
+    """
+    Measurements of a block, recorded when the glue is created with `profiling=True`.
+
+    Args:
+        block_name: BlockName
+        factory_wall_time: seconds of `_factory()`, i.e. assembling the params and the series
+        factory_cpu_time: cpu seconds of `_factory()` on the executing thread
+        process_wall_time: seconds of `_process()`
+        process_cpu_time: cpu seconds of `_process()` on the executing thread
+        input_rows: rows of the input series
+        output_rows: rows of the output series
+        output_memory_bytes: `memory_usage(deep=True)` of the output series
+        cache_hit: True if the output is restored from `BlockCache`
+    """
+
+    block_name: str
+    factory_wall_time: float = 0.0
+    factory_cpu_time: float = 0.0
+    process_wall_time: float = 0.0
+    process_cpu_time: float = 0.0
+    input_rows: Optional[int] = None
+    output_rows: Optional[int] = None
+    output_memory_bytes: Optional[int] = None
+    cache_hit: bool = False
+
+
 @dataclass(frozen=True)
 class BlockOutput:
     series: Optional[pd.DataFrame]
     params: Optional[dict]
     block_name: str
     execution_order: int = 1
+    profile: Optional[BlockProfile] = field(default=None, repr=False, compare=False)
+    released: bool = field(default=False, compare=False)
+
+    def release(self, params: bool = True) -> "BlockOutput":
+        """
+        Args:
+            params: if False, only the series is released
+
+        Returns:
+            lightweight stub without the series and the params, which keeps the name and the order of the block.
+        """
+        return replace(self, series=None, params=None if params else self.params, released=True)
 
 
 @dataclass(frozen=True)
@@ -54,20 +98,148 @@ class SeriesColumns:
         return res_list
 
 
+@dataclass(frozen=True)
+class SeriesColumnStore:
+    """
+    Index-aligned view of the series and params of all `BlockOutput` in a `BlockGlue`.
+
+    Each column refers to the `pd.Series` of the latest block which produced it,
+    and the store grows by `append()` as each block is processed,
+    so the frame is not re-joined from all outputs on every request.
+    """
+
+    keys: Tuple[Tuple[str, int], ...]
+    columns: Dict[str, pd.Series]
+    index: Optional[pd.Index]
+    params: Optional[dict]
+
+    @staticmethod
+    def build(block_outputs: Dict[str, BlockOutput]) -> "SeriesColumnStore":
+        orders = [v.execution_order for v in block_outputs.values() if v.series is not None]
+        if len(orders) != len(set(orders)):
+            raise KabutobashiBlockGlueError(f"{orders=} must be unique.")
+        store = SeriesColumnStore(keys=(), columns={}, index=None, params={})
+        for v in sorted([v for v in block_outputs.values() if v.series is not None], key=lambda x: x.execution_order):
+            store = store._append_series(block_output=v)
+        merged_params = None
+        if list(block_outputs.keys())[:1] == ["FLOW_INITIAL"]:
+            merged_params = {}
+            for k, v in block_outputs.items():
+                if k != "FLOW_INITIAL" and v.params is not None:
+                    merged_params.update(v.params)
+        keys = tuple([(k, id(v)) for k, v in block_outputs.items()])
+        return replace(store, keys=keys, params=merged_params)
+
+    def _append_series(self, block_output: BlockOutput) -> "SeriesColumnStore":
+        series = block_output.series
+        columns = {c: series[c] for c in series.columns}
+        columns.update({k: v for k, v in self.columns.items() if k not in columns})
+        return replace(self, columns=columns, index=series.index)
+
+    def append(self, block_output: BlockOutput) -> "SeriesColumnStore":
+        """
+        Returns:
+            new store with the output of the block which was processed last.
+        """
+        store = self
+        if block_output.series is not None:
+            store = store._append_series(block_output=block_output)
+        params = self.params
+        if params is not None and block_output.params is not None:
+            params = {**params, **block_output.params}
+        keys = self.keys + ((block_output.block_name, id(block_output)),)
+        return replace(store, keys=keys, params=params)
+
+    def select(self, required_columns: List[str], series_required_columns_mode: SeriesRequiredColumnsMode):
+        if series_required_columns_mode == "strict":
+            names = required_columns
+        elif series_required_columns_mode == "available":
+            names = [name for name in required_columns if name in self.columns]
+        elif series_required_columns_mode == "all":
+            names = list(self.columns.keys())
+        else:
+            raise ValueError()
+        data = {}
+        for name in names:
+            column = self.columns[name]
+            if column.index is not self.index and not column.index.equals(self.index):
+                # same as the left join to the latest series
+                column = column.reindex(self.index)
+            data[name] = column
+        if not data:
+            return pd.DataFrame(index=self.index)
+        return pd.DataFrame(data, copy=False)
+
+    def is_aligned(self) -> bool:
+        if self.index is None:
+            return True
+        if self.index.is_unique:
+            return all([c.index.is_unique for c in self.columns.values()])
+        # duplicated index is aligned only if the indices are the same
+        return all([c.index is self.index or c.index.equals(self.index) for c in self.columns.values()])
+
+
 @dataclass(frozen=True)
 class BlockGlue:
     series: Optional[pd.DataFrame] = None
     params: Optional[dict] = None
     block_outputs: Dict[str, BlockOutput] = field(default_factory=dict, repr=False)
     execution_order: int = 1
+    cache: Optional["BlockCache"] = field(default=None, repr=False, compare=False)
+    store: Optional[SeriesColumnStore] = field(default=None, repr=False, compare=False)
+    profiling: bool = field(default=False, repr=False, compare=False)
+    keep_outputs: Union[bool, List[str]] = field(default=True, repr=False, compare=False)
+    features: Optional["FeatureCache"] = field(default=None, repr=False, compare=False)
 
-    def get_series_from_required_columns(
+    def column_store(self) -> SeriesColumnStore:
+        """
+        Returns:
+            the store of the current `block_outputs`, which is built again only if it is outdated.
+        """
+        keys = tuple([(k, id(v)) for k, v in self.block_outputs.items()])
+        if self.store is not None and self.store.keys == keys:
+            return self.store
+        store = SeriesColumnStore.build(block_outputs=self.block_outputs)
+        object.__setattr__(self, "store", store)
+        return store
+
+    def add_block_output(self, block_output: BlockOutput) -> "BlockGlue":
+        """
+        Returns:
+            new BlockGlue with `block_output`, whose store is updated incrementally.
+        """
+        if block_output.block_name in self.block_outputs:
+            store = None
+        else:
+            store = self.column_store().append(block_output=block_output)
+        block_outputs = self.block_outputs if self.block_outputs else {}
+        block_outputs.update({block_output.block_name: block_output})
+        return replace(self, block_outputs=block_outputs, execution_order=self.execution_order + 1, store=store)
+
+    def release(self, block_names: List[str], params: bool = True) -> "BlockGlue":
+        """
+        Args:
+            block_names: blocks whose outputs are no longer required by the following blocks
+            params: if False, only the series of the outputs are released
+
+        Returns:
+            new BlockGlue whose outputs of `block_names` are replaced with stubs,
+            except the blocks listed in `keep_outputs`.
+        """
+        if self.keep_outputs is True:
+            return self
+        keep_outputs = self.keep_outputs or []
+        released = [k for k in block_names if k in self.block_outputs and k not in keep_outputs]
+        if not released:
+            return self
+        logger.debug(f"release {released}, {params=}")
+        # the dict is copied, since the previous glue shares it
+        block_outputs = {k: v.release(params=params) if k in released else v for k, v in self.block_outputs.items()}
+        return replace(self, block_outputs=block_outputs, store=None)
+
+    def _get_series_by_join(
         self, required_columns: List[str], series_required_columns_mode: SeriesRequiredColumnsMode = "strict"
     ) -> pd.DataFrame:
-        logger.debug(f"{required_columns=}")
-        orders = [v.execution_order for _, v in self if v.series is not None]
-        if len(orders) != len(set(orders)):
-            raise KabutobashiBlockGlueError(f"{orders=} must be unique.")
         series_columns_list = [
             SeriesColumns(block_name=v.block_name, columns=v.series.columns, execution_order=v.execution_order)
             for _, v in self
@@ -79,11 +251,27 @@ class BlockGlue:
         series = initial_series.join(rest_series)
         if series_required_columns_mode == "strict":
             return series[required_columns]
+        elif series_required_columns_mode == "available":
+            return series[[c for c in required_columns if c in series.columns]]
         elif series_required_columns_mode == "all":
             return series
         else:
             raise ValueError()
 
+    def get_series_from_required_columns(
+        self, required_columns: List[str], series_required_columns_mode: SeriesRequiredColumnsMode = "strict"
+    ) -> pd.DataFrame:
+        logger.debug(f"{required_columns=}")
+        store = self.column_store()
+        if not store.is_aligned():
+            # duplicated index cannot be aligned by reindex
+            return self._get_series_by_join(
+                required_columns=required_columns, series_required_columns_mode=series_required_columns_mode
+            )
+        return store.select(
+            required_columns=required_columns, series_required_columns_mode=series_required_columns_mode
+        )
+
     def get_series(
         self,
         series_required_columns: Optional[list],
@@ -105,6 +293,12 @@ class BlockGlue:
             params.update(self.params.get(block_name, {}))
         if params_required_keys is not None and type(params_required_keys) is list:
             logger.debug(f"{params_required_keys=}")
+            merged_params = self.column_store().params
+            if merged_params is not None:
+                # `FLOW_INITIAL` is the first output
+                params = dict(self.block_outputs["FLOW_INITIAL"].params.get(block_name, {}))
+                params.update(merged_params)
+                return params
             params = {}
             for k, v in self:
                 if v.params is None:
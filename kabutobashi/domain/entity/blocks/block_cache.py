@@ -0,0 +1,187 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+from .basis_blocks import BlockOutput
+
+__all__ = ["BlockCache", "BlockCacheStats"]
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BlockCacheStats:
+    memory_hits: int
+    disk_hits: int
+    misses: int
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+
+def _update_hash(h, value: Any):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(type(value).__name__.encode())
+        if isinstance(value, pd.DataFrame):
+            h.update(repr([(str(c), str(t)) for c, t in value.dtypes.items()]).encode())
+        else:
+            h.update(f"{value.name}:{value.dtype}".encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for k in sorted(value.keys(), key=str):
+            h.update(repr(k).encode())
+            _update_hash(h, value[k])
+        h.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[")
+        for v in value:
+            _update_hash(h, v)
+        h.update(b"]")
+    else:
+        h.update(f"{type(value).__name__}:{value!r}".encode())
+
+
+class BlockCache:
+    """
+    Content-addressed cache of `BlockOutput`.
+
+    The key is a hash of the version of kabutobashi, the block name, the resolved params
+    and the input series of the block, so a block whose inputs did not change is not processed again.
+    Entries are kept in a bounded in-memory LRU, and written to `cache_dir` if it is given,
+    to be reused by another process or after a restart.
+    The files of the least recently used entries are removed beyond `max_disk_entries`,
+    and `clear(disk=True)` removes all of them, e.g. after a user-defined block is changed.
+
+    Args:
+        max_size: maximum number of entries in memory
+        cache_dir: directory of the on-disk tier
+        max_disk_entries: maximum number of entries in `cache_dir`, unbounded if None
+
+    Examples:
+        >>> from kabutobashi import Flow
+        >>> from kabutobashi.domain.entity.blocks import BlockCache
+        >>> cache = BlockCache(max_size=128, cache_dir="/tmp/kabutobashi_cache", max_disk_entries=4096)
+        >>> Flow.initialize(params=params, cache=cache).then(blocks)
+        >>> cache.stats()
+    """
+
+    def __init__(self, max_size: int = 128, cache_dir: Optional[str] = None, max_disk_entries: Optional[int] = None):
+        self.max_size = max_size
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries: OrderedDict[str, BlockOutput] = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(block_name: str, params: dict, series: Optional[pd.DataFrame]) -> Optional[str]:
+        # the outputs of the same inputs change with the implementation of the blocks
+        from kabutobashi import __version__
+
+        h = hashlib.sha256()
+        try:
+            h.update(__version__.encode())
+            h.update(block_name.encode())
+            _update_hash(h, params)
+            _update_hash(h, series)
+        except TypeError as e:
+            # e.g. unhashable objects in the series
+            logger.debug(f"{block_name} is not cached: {e}")
+            return None
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return Path(self.cache_dir) / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional[BlockOutput]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return self._entries[key]
+        if self.cache_dir is not None and self._path(key).exists():
+            try:
+                with open(self._path(key), "rb") as f:
+                    block_output = pickle.load(f)
+                # the modification time orders the files to evict
+                os.utime(self._path(key))
+            except FileNotFoundError:
+                # evicted by another process
+                block_output = None
+            if block_output is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._put_memory(key=key, block_output=block_output)
+                return block_output
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _put_memory(self, key: str, block_output: BlockOutput):
+        with self._lock:
+            self._entries[key] = block_output
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def put(self, key: str, block_output: BlockOutput):
+        self._put_memory(key=key, block_output=block_output)
+        if self.cache_dir is not None:
+            tmp_path = self._path(key).with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(block_output, f)
+            os.replace(tmp_path, self._path(key))
+            if self.max_disk_entries is not None:
+                self._evict_disk(max_entries=self.max_disk_entries)
+
+    def _evict_disk(self, max_entries: int):
+        paths = []
+        for path in Path(self.cache_dir).glob("*.pkl"):
+            try:
+                paths.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        paths.sort()
+        for _, path in paths[: max(len(paths) - max_entries, 0)]:
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> BlockCacheStats:
+        return BlockCacheStats(memory_hits=self.memory_hits, disk_hits=self.disk_hits, misses=self.misses)
+
+    def clear(self, disk: bool = False):
+        """
+        Args:
+            disk: if True, the files in `cache_dir` are also removed
+        """
+        with self._lock:
+            self._entries.clear()
+        if disk and self.cache_dir is not None:
+            self._evict_disk(max_entries=0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getstate__(self):
+        # the memory tier and the counters stay in the parent process, see `DagScheduler`
+        state = self.__dict__.copy()
+        state["_entries"] = OrderedDict()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
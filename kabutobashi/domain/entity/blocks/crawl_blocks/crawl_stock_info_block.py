@@ -6,7 +6,7 @@ from ..decorator import block
 from .abc_crawl_block import from_url
 
 
-@block(block_name="crawl_stock_info")
+@block(block_name="crawl_stock_info", params_output_keys=["code", "html_text"])
 class CrawlStockInfoBlock:
     code: str
 
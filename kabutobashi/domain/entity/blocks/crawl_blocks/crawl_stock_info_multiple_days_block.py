@@ -6,7 +6,7 @@ from ..decorator import block
 from .abc_crawl_block import from_url
 
 
-@block(block_name="crawl_stock_info_multiple_days")
+@block(block_name="crawl_stock_info_multiple_days", params_output_keys=["code", "main_html_text", "sub_html_text"])
 class CrawlStockInfoMultipleDaysBlock:
     code: str
 
@@ -22,7 +22,7 @@ class CrawlStockInfoMultipleDaysBlock:
         assert "sub_html_text" in keys, "StockInfoMultipleDaysCrawlBlockOutput must have 'sub_html_text' column"
 
 
-@block(block_name="crawl_stock_info_multiple_days_2")
+@block(block_name="crawl_stock_info_multiple_days_2", params_output_keys=["code", "main_html_text"])
 class CrawlStockInfoMultipleDays2Block:
     code: str
     page: int
@@ -6,7 +6,7 @@ from ..decorator import block
 from .abc_crawl_block import from_url
 
 
-@block(block_name="crawl_stock_ipo")
+@block(block_name="crawl_stock_ipo", params_output_keys=["year", "html_text"])
 class CrawlStockIpoBlock:
     year: str
 
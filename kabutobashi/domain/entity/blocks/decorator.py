@@ -1,12 +1,13 @@
 import re
+import time
 import warnings
-from dataclasses import dataclass
-from functools import partial
+from dataclasses import dataclass, replace
 from inspect import signature
 from logging import getLogger
 from types import FunctionType
-from typing import Iterator, List, NoReturn, Optional, Tuple, TypeAlias, Union
+from typing import Callable, Iterator, List, NoReturn, Optional, Tuple, TypeAlias, Union
 
+import numpy as np
 import pandas as pd
 
 from kabutobashi.domain.errors import (
@@ -16,7 +17,8 @@ from kabutobashi.domain.errors import (
     KabutobashiBlockDecoratorTypeError,
 )
 
-from .basis_blocks import BlockGlue, BlockOutput, SeriesRequiredColumnsMode
+from .basis_blocks import BlockGlue, BlockOutput, BlockProfile, SeriesRequiredColumnsMode
+from .feature_cache import compute_feature
 
 __all__ = ["block", "block_from"]
 
@@ -41,6 +43,36 @@ class ParamsRequiredKey:
     priority: int
 
 
+@dataclass(frozen=True)
+class BlockValidator:
+    function: Callable
+    arg_names: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class BlockMetadata:
+    """
+    Computed once by `@block`, so a block call does not inspect the class.
+
+    Args:
+        validators: `_validate*()` methods except `_validate_output()`, with the names of their arguments
+        param_names: annotated attributes of the class except `series`
+    """
+
+    validators: Tuple[BlockValidator, ...]
+    param_names: Tuple[str, ...]
+
+    @staticmethod
+    def from_class(cls) -> "BlockMetadata":
+        validators = []
+        for k, v in cls.__dict__.items():
+            if k.startswith("_validate") and not k.startswith("_validate_output"):
+                arg_names = tuple([name for name in signature(v).parameters.keys() if name != "self"])
+                validators.append(BlockValidator(function=v, arg_names=arg_names))
+        param_names = tuple([k for k in cls.__dict__.get("__annotations__", {}).keys() if k != "series"])
+        return BlockMetadata(validators=tuple(validators), param_names=param_names)
+
+
 def _to_snake_case(string: str) -> str:
     # see: https://qiita.com/munepi0713/items/82ce7a56aa1b8233fd30
     _PARSE_BY_SEP_PATTERN = re.compile(r"[ _-]+")
@@ -73,17 +105,14 @@ def _set_new_attribute(cls, name, value):
     return False
 
 
-def _inner_func_validate_input(self, *, functions: List[callable] = None) -> NoReturn:
+def _inner_func_validate_input(self) -> NoReturn:
     """
     The method is NOT intended to override by users.
     """
-    logger.debug(f"{self.params=}")
-    for f in functions:
-        sig = signature(f)
-        function_required_args = sig.parameters.keys()
-        function_args = {k: v for k, v in self.__dict__.items() if (k in function_required_args)}
-        logger.debug(f"{f} <= {function_args=}")
-        f(self, **function_args)
+    for validator in self._metadata.validators:
+        # params of the instance take precedence over the defaults of the class
+        function_args = {k: getattr(self, k) for k in validator.arg_names if hasattr(self, k)}
+        validator.function(self, **function_args)
 
 
 def _inner_func_validate_output(self, series: Optional[pd.DataFrame], params: Optional[dict]) -> NoReturn:
@@ -101,37 +130,19 @@ def _inner_func_private_validate_output(self, series: Optional[pd.DataFrame], pa
     pass
 
 
-def _inner_func_process(self) -> BlockGlue:
+def _inner_func_to_block_output(self, res: BlockProcessResultType, execution_order: int) -> BlockOutput:
     """
     The method is NOT intended to override by users.
-    The method can be called by `cls.process()`
-
-    Returns:
-        BlockGlue
     """
-    # initialize
     block_name = self.block_name
-    res_glue = BlockGlue()
-    if self._glue:
-        res_glue = self._glue
-    # validate_input
-    self.validate_input()
-    # process()
-    res: BlockProcessResultType = self._process()
-    execution_order = res_glue.get_max_execution_order() + 1
-
     if type(res) is tuple:
         if len(res) == 2:
             if type(res[0]) is dict and type(res[1]) is pd.DataFrame:
                 self.validate_output(series=res[1], params=res[0])
-                block_output = BlockOutput(
-                    series=res[1], params=res[0], block_name=block_name, execution_order=execution_order
-                )
+                return BlockOutput(series=res[1], params=res[0], block_name=block_name, execution_order=execution_order)
             elif type(res[1]) is dict and type(res[0]) is pd.DataFrame:
                 self.validate_output(series=res[0], params=res[1])
-                block_output = BlockOutput(
-                    series=res[0], params=res[1], block_name=block_name, execution_order=execution_order
-                )
+                return BlockOutput(series=res[0], params=res[1], block_name=block_name, execution_order=execution_order)
             else:
                 raise KabutobashiBlockDecoratorReturnError(
                     "The return values are limited to combinations of `dict` and `pd.DataFrame`."
@@ -140,22 +151,114 @@ def _inner_func_process(self) -> BlockGlue:
             raise KabutobashiBlockDecoratorReturnError("Please limit the number of return values to two or fewer.")
     elif type(res) is dict:
         self.validate_output(series=None, params=res)
-        block_output = BlockOutput(series=None, params=res, block_name=block_name, execution_order=execution_order)
+        return BlockOutput(series=None, params=res, block_name=block_name, execution_order=execution_order)
     elif type(res) is pd.DataFrame:
         self.validate_output(series=res, params=None)
-        block_output = BlockOutput(series=res, params=None, block_name=block_name, execution_order=execution_order)
+        return BlockOutput(series=res, params=None, block_name=block_name, execution_order=execution_order)
     else:
         raise KabutobashiBlockDecoratorReturnError(f"An unexpected return type {type(res)} was returned.")
-    block_outputs = res_glue.block_outputs if res_glue.block_outputs else {}
-    block_outputs.update({block_name: block_output})
-    return BlockGlue(
-        series=res_glue.series,
-        params=res_glue.params,
-        block_outputs=block_outputs,
-        execution_order=res_glue.execution_order + 1,
+
+
+def _inner_func_resolved_params(self) -> dict:
+    """
+    The method is NOT intended to override by users.
+
+    Returns:
+        class attributes overridden by the params from `factory()`
+    """
+    resolved_params = {k: getattr(self, k, None) for k in self._metadata.param_names}
+    resolved_params.update(self.params or {})
+    return resolved_params
+
+
+def _inner_func_profile(
+    self, block_output: BlockOutput, process_time: Tuple[float, float], cache_hit: bool
+) -> BlockProfile:
+    """
+    The method is NOT intended to override by users.
+    """
+    factory_wall_time, factory_cpu_time = getattr(self, "_factory_time", (0.0, 0.0))
+    process_wall_time, process_cpu_time = process_time
+    series = block_output.series
+    return BlockProfile(
+        block_name=self.block_name,
+        factory_wall_time=factory_wall_time,
+        factory_cpu_time=factory_cpu_time,
+        process_wall_time=process_wall_time,
+        process_cpu_time=process_cpu_time,
+        input_rows=len(self.series) if self.series is not None else None,
+        output_rows=len(series) if series is not None else None,
+        output_memory_bytes=int(series.memory_usage(deep=True).sum()) if series is not None else None,
+        cache_hit=cache_hit,
     )
 
 
+def _inner_func_feature(self, series: pd.Series, operation: str, window: Optional[int] = None) -> np.ndarray:
+    """
+    The method is NOT intended to override by users.
+    The method can be called by `self._feature()` in `_process()`
+
+    Args:
+        series: a column of the series, e.g. `self.series["close"]`
+        operation: one of `FEATURE_OPERATIONS`, e.g. `shift`, `rolling_mean` or `ewm_mean`
+        window: periods of `shift` and `diff`, window of `rolling_*` or span of `ewm_mean`
+
+    Returns:
+        the array memoized in the `FeatureCache` of the flow, which is shared by the blocks and read-only
+    """
+    features = self._glue.features if self._glue is not None else None
+    if features is None:
+        return compute_feature(series=series, operation=operation, window=window)
+    return features.get(series=series, operation=operation, window=window)
+
+
+def _inner_func_process(self) -> BlockGlue:
+    """
+    The method is NOT intended to override by users.
+    The method can be called by `cls.process()`
+
+    Returns:
+        BlockGlue
+    """
+    # initialize
+    block_name = self.block_name
+    res_glue = BlockGlue()
+    if self._glue:
+        res_glue = self._glue
+    # validate_input
+    self.validate_input()
+    execution_order = res_glue.get_max_execution_order() + 1
+
+    # cache
+    cache = res_glue.cache
+    cache_key = None
+    block_output = None
+    process_time = (0.0, 0.0)
+    if cache is not None and self.cacheable:
+        cache_key = cache.key(block_name=block_name, params=_inner_func_resolved_params(self), series=self.series)
+        if cache_key is not None:
+            block_output = cache.get(cache_key)
+    if block_output is not None:
+        logger.debug(f"{block_name} is restored from the cache")
+        block_output = replace(block_output, execution_order=execution_order)
+        cache_hit = True
+    else:
+        # process()
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        res: BlockProcessResultType = self._process()
+        process_time = (time.perf_counter() - wall_start, time.thread_time() - cpu_start)
+        block_output = _inner_func_to_block_output(self, res=res, execution_order=execution_order)
+        cache_hit = False
+        if cache_key is not None:
+            cache.put(cache_key, block_output)
+
+    # profile
+    if res_glue.profiling:
+        profile = _inner_func_profile(self, block_output=block_output, process_time=process_time, cache_hit=cache_hit)
+        block_output = replace(block_output, profile=profile)
+    return res_glue.add_block_output(block_output=block_output)
+
+
 def _inner_class_func_factory(cls, glue: BlockGlue):
     """
     The method is NOT intended to override by users.
@@ -164,12 +267,13 @@ def _inner_class_func_factory(cls, glue: BlockGlue):
     Returns:
         cls()
     """
-    setattr(cls, "_glue", glue)
     # get parameters from glue
     params = {}
     series = None
 
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
     res = cls._factory(glue)
+    factory_time = (time.perf_counter() - wall_start, time.thread_time() - cpu_start)
     if type(res) is tuple:
         if len(res) == 2:
             if type(res[0]) is dict:
@@ -189,11 +293,12 @@ def _inner_class_func_factory(cls, glue: BlockGlue):
     else:
         raise KabutobashiBlockDecoratorReturnError(f"An unexpected return type {type(res)} was returned.")
 
-    # set attributes
+    # params are set to the instance, not to the class shared by other threads
     logger.debug(f"@block._factory(): {cls.__name__}: {params.keys()}")
-    for k, v in params.items():
-        setattr(cls, k, v)
-    return cls(series=series, params=params)
+    block_instance = cls(series=series, params=params, glue=glue)
+    if glue is not None and glue.profiling:
+        block_instance._factory_time = factory_time
+    return block_instance
 
 
 def _inner_class_default_private_func_factory(cls, glue: BlockGlue) -> Tuple[pd.DataFrame, dict]:
@@ -205,22 +310,16 @@ def _inner_class_default_private_func_factory(cls, glue: BlockGlue) -> Tuple[pd.
     Returns:
         cls()
     """
-    cls_instance = cls()
-    block_name = cls_instance.block_name
-    series_required_columns = cls_instance.series_required_columns
-    params_required_keys = cls_instance.params_required_keys
-    series_required_columns_mode = cls_instance.series_required_columns_mode
-
     # params
     params = glue.get_params(
-        block_name=block_name,
-        params_required_keys=params_required_keys,
+        block_name=cls.block_name,
+        params_required_keys=cls.params_required_keys,
     )
 
     # series
     series = glue.get_series(
-        series_required_columns=series_required_columns,
-        series_required_columns_mode=series_required_columns_mode,
+        series_required_columns=cls.series_required_columns,
+        series_required_columns_mode=cls.series_required_columns_mode,
     )
     return series, params
 
@@ -237,10 +336,29 @@ def _inner_class_func_glue(cls, glue: BlockGlue) -> BlockGlue:
     return new_glue
 
 
-def _inner_init(self, series: Optional[pd.DataFrame] = None, params: Optional[dict] = None):
+def _inner_class_func_resolved_params(cls, params: Optional[dict] = None) -> dict:
     """
     The method is NOT intended to override by users.
+
+    Args:
+        params: params of the block in a flow
+
+    Returns:
+        class attributes overridden by `params`, as the params of the block when the flow is executed
     """
+    resolved_params = {k: getattr(cls, k, None) for k in cls._metadata.param_names}
+    resolved_params.update(params or {})
+    return resolved_params
+
+
+def _inner_init(self, series: Optional[pd.DataFrame] = None, params: Optional[dict] = None, glue: BlockGlue = None):
+    """
+    The method is NOT intended to override by users.
+    """
+    self._glue = glue
+    for k, v in (params or {}).items():
+        if k not in ("series", "params"):
+            setattr(self, k, v)
     self.series = series
     self.params = params
 
@@ -252,7 +370,7 @@ def _inner_repr(self):
     # block name
     repr = ["# block_name: {self.block_name}"]
     # attributes
-    repr.extend([f"+ {name}: {value}" for name, value in self.__dict__.items()])
+    repr.extend([f"+ {name}: {value}" for name, value in self.__dict__.items() if not name.startswith("_")])
     # repr.extend([f"+ {name}: {getattr(self, name)}" for name in self.__annotations__.keys()])
 
     return "\n".join(repr)
@@ -266,6 +384,9 @@ def _process_class(
     series_required_columns: List[str | SeriesRequiredColumn],
     series_required_columns_mode: SeriesRequiredColumnsMode,
     params_required_keys: List[str | ParamsRequiredKey],
+    series_output_columns: Optional[List[str]],
+    params_output_keys: Optional[List[str]],
+    cacheable: bool,
 ):
     cls_params = {}
     cls_annotations = cls.__dict__.get("__annotations__", {})
@@ -308,6 +429,11 @@ def _process_class(
     setattr(cls, "series_required_columns", series_required_columns)
     setattr(cls, "params_required_keys", params_required_keys)
     setattr(cls, "series_required_columns_mode", series_required_columns_mode)
+    setattr(cls, "series_output_columns", series_output_columns)
+    setattr(cls, "params_output_keys", params_output_keys)
+    setattr(cls, "cacheable", cacheable)
+    # `_factory()` defined by users can read anything from the glue
+    setattr(cls, "factory_overridden", "_factory" in cls_keys)
     # set-params
     setattr(cls, "params", cls_params)
     # process function
@@ -318,15 +444,13 @@ def _process_class(
         _set_new_attribute(cls=cls, name="_factory", value=classmethod(_inner_class_default_private_func_factory))
     # operate function
     _set_new_attribute(cls=cls, name="glue", value=classmethod(_inner_class_func_glue))
+    # params of the services which call the class methods of the blocks, such as `_lookback()`
+    _set_new_attribute(cls=cls, name="resolved_params", value=classmethod(_inner_class_func_resolved_params))
+    # derived arrays shared by the blocks of a flow
+    _set_new_attribute(cls=cls, name="_feature", value=_inner_func_feature)
     # validation functions
-    _inner_func_validate_input_partial = partial(
-        _inner_func_validate_input,
-        self=cls,
-        functions=[
-            v for k, v in cls.__dict__.items() if k.startswith("_validate") and not k.startswith("_validate_output")
-        ],
-    )
-    _set_new_attribute(cls=cls, name="validate_input", value=_inner_func_validate_input_partial)
+    setattr(cls, "_metadata", BlockMetadata.from_class(cls))
+    _set_new_attribute(cls=cls, name="validate_input", value=_inner_func_validate_input)
     _set_new_attribute(cls=cls, name="validate_output", value=_inner_func_validate_output)
     if "_validate_output" not in cls.__dict__:
         _set_new_attribute(cls=cls, name="_validate_output", value=_inner_func_private_validate_output)
@@ -348,6 +472,9 @@ def block(
     series_required_columns: List[str | SeriesRequiredColumn] = None,
     series_required_columns_mode: SeriesRequiredColumnsMode = "strict",
     params_required_keys: List[str | ParamsRequiredKey] = None,
+    series_output_columns: List[str] = None,
+    params_output_keys: List[str] = None,
+    cacheable: bool = False,
 ):
     """
 
@@ -357,8 +484,12 @@ def block(
         factory: True if _factory() method is required to implement.
         process: True if _process() method is required to implement.
         series_required_columns:
-        series_required_columns_mode:
+        series_required_columns_mode: "strict" requires all the `series_required_columns`,
+            "available" only the ones produced by the preceding blocks, and "all" selects all the columns.
         params_required_keys:
+        series_output_columns: columns of the series returned by _process(), used to resolve dependencies.
+        params_output_keys: keys of the params returned by _process(), used to resolve dependencies.
+        cacheable: True if the output depends only on the params and the series, i.e. no I/O.
 
     Returns:
         decorator
@@ -390,6 +521,9 @@ def block(
             series_required_columns=series_required_columns,
             series_required_columns_mode=series_required_columns_mode,
             params_required_keys=params_required_keys,
+            series_output_columns=series_output_columns,
+            params_output_keys=params_output_keys,
+            cacheable=cacheable,
         )
 
     # See if we're being called as @dataclass or @dataclass().
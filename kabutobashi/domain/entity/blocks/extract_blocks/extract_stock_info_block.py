@@ -26,12 +26,16 @@ class ExtractStockInfoBlock:
         pattern = r"\((?P<month>[0-9]+)/(?P<day>[0-9]+)\)|\((?P<hour>[0-9]+):(?P<minute>[0-9]+)\)"
         match_result = re.match(pattern=pattern, string=raw_dt)
         dt = datetime.now()
+        # the time of the price during the trading hours, None after the close
+        time = None
         if match_result:
             rep = match_result.groupdict()
             if rep.get("month"):
                 dt = dt.replace(month=int(rep["month"]))
             if rep.get("day"):
                 dt = dt.replace(day=int(rep["day"]))
+            if rep.get("hour") and rep.get("minute"):
+                time = f"{int(rep['hour']):02d}:{int(rep['minute']):02d}"
 
         # ページ上部の情報を取得
         stock_board = soup.find("div", {"class": stock_board_tag})
@@ -53,6 +57,7 @@ class ExtractStockInfoBlock:
         result.update(
             {
                 "dt": dt.strftime("%Y-%m-%d"),
+                "time": time,
                 "code": code,
                 "industry_type": PageDecoder(tag1="div", class1="ly_content_wrapper size_ss").decode(bs=stock_detail),
                 "market": market,
@@ -8,7 +8,7 @@ from kabutobashi.domain.values import DecodeHtmlPageStockIpo
 from ..decorator import block
 
 
-@block(block_name="extract_stock_ipo", params_required_keys=["html_text"])
+@block(block_name="extract_stock_ipo", params_required_keys=["html_text"], cacheable=True)
 class ExtractStockIpoBlock:
     html_text: str
 
@@ -0,0 +1,165 @@
+import threading
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .kernels import RollingKernel, shift
+
+__all__ = ["FeatureCache", "FeatureCacheStats", "FEATURE_OPERATIONS", "compute_feature"]
+
+logger = getLogger(__name__)
+
+# operations of the kernels, which share the prefix sums of a column
+_KERNEL_OPERATIONS = {
+    "rolling_sum": "sum",
+    "rolling_mean": "mean",
+    "rolling_max": "max",
+    "rolling_min": "min",
+}
+# operations of pandas, which the blocks compare with thresholds and must not change in the last bit
+_PANDAS_OPERATIONS = {
+    "rolling_std": lambda s, window: s.rolling(window).std(),
+    "ewm_mean": lambda s, span: s.ewm(span=span).mean(),
+}
+FEATURE_OPERATIONS = ("shift", "diff") + tuple(_KERNEL_OPERATIONS.keys()) + tuple(_PANDAS_OPERATIONS.keys())
+
+
+@dataclass(frozen=True)
+class FeatureCacheStats:
+    hits: int
+    misses: int
+    entries: int
+    memory_bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+def _compute(
+    series: pd.Series, values: np.ndarray, operation: str, window: Optional[int], kernel: Optional[RollingKernel]
+) -> np.ndarray:
+    if operation == "shift":
+        return shift(values, 1 if window is None else window)
+    if operation == "diff":
+        return values - shift(values, 1 if window is None else window)
+    if operation in _KERNEL_OPERATIONS:
+        kernel = kernel if kernel is not None else RollingKernel(values)
+        return getattr(kernel, _KERNEL_OPERATIONS[operation])(window)
+    if operation in _PANDAS_OPERATIONS:
+        return _PANDAS_OPERATIONS[operation](series, window).to_numpy(dtype=np.float64)
+    raise ValueError(f"{operation} is not supported, use one of {FEATURE_OPERATIONS}")
+
+
+def compute_feature(series: pd.Series, operation: str, window: Optional[int] = None) -> np.ndarray:
+    """
+    Compute a derived array of `series` without the cache.
+
+    Args:
+        series: a column of the series of a block
+        operation: one of `FEATURE_OPERATIONS`
+        window: periods of `shift` and `diff`, window of `rolling_*` or span of `ewm_mean`
+    """
+    return _compute(series, series.to_numpy(dtype=np.float64), operation, window, kernel=None)
+
+
+class FeatureCache:
+    """
+    Memoized derived arrays of the columns, such as `close` shifted by 1 or the rolling means of `close`,
+    which are requested by several blocks of a flow.
+
+    The key is (column, operation, window). The values of a column are kept to check that a block requests
+    the same column, and the entries of the column are dropped when the values are changed.
+    The arrays are read-only, since they are shared by the blocks.
+    A new cache is attached to the `BlockGlue` of each flow, see `Flow.initialize(feature_cache=...)`.
+
+    Examples:
+        >>> from kabutobashi import Flow
+        >>> flow = Flow.initialize(params=params).then(blocks)
+        >>> flow.block_glue.features.stats()
+        >>> # in `_process()` of a block
+        >>> prev_close = self._feature(self.series["close"], "shift", 1)
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str, Optional[int]], np.ndarray] = {}
+        self._sources: Dict[str, np.ndarray] = {}
+        self._kernels: Dict[str, RollingKernel] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _source(self, column: str, values: np.ndarray) -> Optional[RollingKernel]:
+        """
+        Returns:
+            the kernel of the column, after the entries of the column are dropped if the values are changed
+        """
+        with self._lock:
+            source = self._sources.get(column)
+            if source is not None and not np.array_equal(source, values, equal_nan=True):
+                logger.debug(f"values of {column} are changed, the features are computed again")
+                self._entries = {k: v for k, v in self._entries.items() if k[0] != column}
+                source = None
+            if source is None:
+                self._sources[column] = values
+                self._kernels[column] = RollingKernel(values)
+            return self._kernels[column]
+
+    def get(self, series: pd.Series, operation: str, window: Optional[int] = None) -> np.ndarray:
+        """
+        Args:
+            series: a column of the series of a block, whose name is the key
+            operation: one of `FEATURE_OPERATIONS`
+            window: periods of `shift` and `diff`, window of `rolling_*` or span of `ewm_mean`
+
+        Returns:
+            read-only array of the same length as `series`
+        """
+        values = series.to_numpy(dtype=np.float64)
+        kernel = self._source(column=series.name, values=values)
+        key = (series.name, operation, window)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                return self._entries[key]
+        feature = _compute(series, values, operation, window, kernel=kernel)
+        feature.flags.writeable = False
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = feature
+        return feature
+
+    def stats(self) -> FeatureCacheStats:
+        with self._lock:
+            return FeatureCacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                entries=len(self._entries),
+                memory_bytes=sum([v.nbytes for v in self._entries.values()]),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sources.clear()
+            self._kernels.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getstate__(self):
+        # a process of `DagScheduler` computes the features again
+        state = self.__dict__.copy()
+        state["_entries"] = {}
+        state["_sources"] = {}
+        state["_kernels"] = {}
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -0,0 +1,14 @@
+from .backend import KernelBackend, get_kernel_backend, kernel_backend, numba_available, set_kernel_backend
+from .incremental import EwmMeanState, KernelExtremumState, KernelSumState, PandasRollingState, ShiftState
+from .rolling import (
+    RollingKernel,
+    rolling_count,
+    rolling_max,
+    rolling_mean,
+    rolling_min,
+    rolling_std,
+    rolling_sum,
+    rolling_var,
+)
+from .shift import shift
+from .warmup import DEFAULT_EWM_TOLERANCE, ewm_warmup
@@ -0,0 +1,59 @@
+import importlib.util
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Iterator, Literal, TypeAlias
+
+__all__ = ["KernelBackend", "numba_available", "get_kernel_backend", "set_kernel_backend", "kernel_backend"]
+
+logger = getLogger(__name__)
+KernelBackend: TypeAlias = Literal["auto", "numpy", "numba"]
+
+_backend: KernelBackend = "auto"
+
+
+def numba_available() -> bool:
+    return importlib.util.find_spec("numba") is not None
+
+
+def set_kernel_backend(backend: KernelBackend):
+    """
+    Select the backend of the path-dependent kernels, such as `cross_signals()`,
+    the stochastics signal index and the directional movement of ADX.
+
+    Args:
+        backend: "numba" to compile the kernels with numba, "numpy" for the vectorized numpy kernels,
+            or "auto" to use numba only if it is installed
+    """
+    global _backend
+    if backend not in ("auto", "numpy", "numba"):
+        raise ValueError(f"backend must be `auto`, `numpy` or `numba`, but {backend}")
+    if backend == "numba" and not numba_available():
+        raise ValueError("numba is not installed")
+    logger.debug(f"kernel backend: {backend}")
+    _backend = backend
+
+
+def get_kernel_backend() -> Literal["numpy", "numba"]:
+    """
+    Returns:
+        the backend resolved from `set_kernel_backend()`
+    """
+    if _backend == "auto":
+        return "numba" if numba_available() else "numpy"
+    return _backend
+
+
+@contextmanager
+def kernel_backend(backend: KernelBackend) -> Iterator[None]:
+    """
+    Examples:
+        >>> from kabutobashi.domain.entity.blocks.kernels import kernel_backend
+        >>> with kernel_backend("numpy"):
+        >>>     flow = Flow.initialize(params=params).then(blocks)
+    """
+    previous = _backend
+    set_kernel_backend(backend)
+    try:
+        yield
+    finally:
+        set_kernel_backend(previous)
@@ -0,0 +1,254 @@
+import math
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+__all__ = [
+    "ShiftState",
+    "KernelSumState",
+    "KernelExtremumState",
+    "PandasRollingState",
+    "EwmMeanState",
+]
+
+
+def _prep_value(value: float) -> float:
+    # pandas converts inf to NaN before the rolling and ewm functions
+    value = float(value)
+    return np.nan if math.isinf(value) else value
+
+
+class ShiftState:
+    """
+    `shift(values, periods)` of a series, one value at a time.
+    """
+
+    def __init__(self, periods: int = 1, fill_value: float = np.nan):
+        self.fill_value = fill_value
+        self._values = deque(maxlen=periods)
+
+    def update(self, value: float) -> float:
+        shifted = self._values[0] if len(self._values) == self._values.maxlen else self.fill_value
+        self._values.append(value)
+        return shifted
+
+
+class KernelSumState:
+    """
+    `RollingKernel.sum()` and `RollingKernel.mean()` of a series, one value at a time.
+    The prefix sums of the deviations from the first value are kept as the kernel, so the results are the same.
+    """
+
+    def __init__(self, window: int, min_periods: Optional[int] = None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.first: Optional[float] = None
+        self.prefix = 0.0
+        self.count = 0
+        # the prefix sums and counts before the last `window` rows
+        self._prefixes = deque([0.0], maxlen=window + 1)
+        self._counts = deque([0], maxlen=window + 1)
+
+    def _update(self, value: float):
+        value = float(value)
+        if not math.isnan(value):
+            if self.first is None:
+                self.first = value
+            self.prefix = self.prefix + (value - self.first)
+            self.count += 1
+        self._prefixes.append(self.prefix)
+        self._counts.append(self.count)
+
+    def _window(self):
+        if len(self._prefixes) <= self.window:
+            return self.prefix, self.count
+        return self.prefix - self._prefixes[0], self.count - self._counts[0]
+
+    def sum(self, value: float) -> float:
+        self._update(value)
+        deviation, count = self._window()
+        if count < self.min_periods:
+            return np.nan
+        return np.float64(deviation) + np.float64(self.first or 0.0) * count
+
+    def mean(self, value: float) -> float:
+        self._update(value)
+        deviation, count = self._window()
+        if count < max(self.min_periods, 1):
+            return np.nan
+        return (np.float64(deviation) + np.float64(self.first or 0.0) * count) / np.float64(count)
+
+
+class KernelExtremumState:
+    """
+    `RollingKernel.max()` or `RollingKernel.min()` of a series, one value at a time.
+    """
+
+    def __init__(self, window: int, is_max: bool, min_periods: Optional[int] = None):
+        self.is_max = is_max
+        self.min_periods = window if min_periods is None else min_periods
+        self._values = deque(maxlen=window)
+
+    def update(self, value: float) -> float:
+        self._values.append(value)
+        values = [v for v in self._values if not math.isnan(v)]
+        if len(values) < max(self.min_periods, 1):
+            return np.nan
+        return np.float64(max(values) if self.is_max else min(values))
+
+
+class PandasRollingState:
+    """
+    `pd.Series.rolling(window).sum()`, `mean()`, `var()` or `std()`, one value at a time.
+    The online algorithms of pandas, i.e. Kahan summation and Welford's method, are followed step by step,
+    so the results are the same in the last bit.
+
+    Args:
+        window: window of the rolling, whose `min_periods` is the window as pandas
+        statistic: `sum`, `mean`, `var` or `std`
+    """
+
+    def __init__(self, window: int, statistic: str, ddof: int = 1):
+        if statistic not in ("sum", "mean", "var", "std"):
+            raise ValueError(f"statistic must be `sum`, `mean`, `var` or `std`, but {statistic}")
+        self.window = window
+        self.statistic = statistic
+        self.ddof = ddof
+        self.rows = 0
+        self._values = deque(maxlen=window)
+        self._reset()
+
+    def _reset(self):
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.neg_ct = 0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = np.nan
+
+    def _add(self, value: float):
+        if math.isnan(value):
+            return
+        self.nobs += 1
+        if value == self.prev_value:
+            self.num_consecutive_same_value += 1
+        else:
+            self.num_consecutive_same_value = 1
+        self.prev_value = value
+        if self.statistic in ("sum", "mean"):
+            y = value - self.compensation_add
+            t = self.sum_x + y
+            self.compensation_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, value) < 0:
+                self.neg_ct += 1
+        else:
+            prev_mean = self.mean_x - self.compensation_add
+            y = value - self.compensation_add
+            t = y - self.mean_x
+            self.compensation_add = t + self.mean_x - y
+            self.mean_x = self.mean_x + t / self.nobs
+            self.ssqdm_x = self.ssqdm_x + (value - prev_mean) * (value - self.mean_x)
+
+    def _remove(self, value: float):
+        if math.isnan(value):
+            return
+        self.nobs -= 1
+        if self.statistic in ("sum", "mean"):
+            y = -value - self.compensation_remove
+            t = self.sum_x + y
+            self.compensation_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, value) < 0:
+                self.neg_ct -= 1
+        elif self.nobs:
+            prev_mean = self.mean_x - self.compensation_remove
+            y = value - self.compensation_remove
+            t = y - self.mean_x
+            self.compensation_remove = t + self.mean_x - y
+            self.mean_x = self.mean_x - t / self.nobs
+            self.ssqdm_x = self.ssqdm_x - (value - prev_mean) * (value - self.mean_x)
+        else:
+            self.mean_x = 0.0
+            self.ssqdm_x = 0.0
+
+    def _result(self) -> float:
+        nobs, minp = self.nobs, self.window
+        if self.statistic == "sum":
+            if nobs < minp:
+                return np.nan
+            if self.num_consecutive_same_value >= nobs:
+                return self.prev_value * nobs
+            return self.sum_x
+        if self.statistic == "mean":
+            if nobs < minp or nobs == 0:
+                return np.nan
+            result = self.sum_x / nobs
+            if self.num_consecutive_same_value >= nobs:
+                return self.prev_value
+            if (self.neg_ct == 0 and result < 0) or (self.neg_ct == nobs and result > 0):
+                return 0.0
+            return result
+        if nobs < max(minp, 1) or nobs <= self.ddof:
+            return np.nan
+        var = 0.0 if nobs == 1 or self.num_consecutive_same_value >= nobs else self.ssqdm_x / (nobs - self.ddof)
+        if self.statistic == "var":
+            return var
+        # NaN is kept as `np.sqrt()`
+        return 0.0 if var < 0 else math.sqrt(var)
+
+    def update(self, value: float) -> float:
+        value = _prep_value(value)
+        if self.rows == 0 or self.window <= 1:
+            # the window does not overlap the previous one, so pandas starts again
+            self._reset()
+            self.prev_value = value
+            self.num_consecutive_same_value = 0
+        elif len(self._values) == self.window:
+            self._remove(self._values[0])
+        self._add(value)
+        self._values.append(value)
+        self.rows += 1
+        return np.float64(self._result())
+
+
+class EwmMeanState:
+    """
+    `pd.Series.ewm(span=span).mean()`, one value at a time, with the recurrence of pandas.
+    """
+
+    def __init__(self, span: int):
+        com = float((span - 1) / 2)
+        alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - alpha
+        self.new_wt = 1.0
+        self.rows = 0
+        self.nobs = 0
+        self.weighted = np.nan
+        self.old_wt = 1.0
+
+    def update(self, value: float) -> float:
+        value = _prep_value(value)
+        is_observation = not math.isnan(value)
+        if self.rows == 0:
+            self.weighted = value
+            self.nobs = int(is_observation)
+            self.old_wt = 1.0
+        else:
+            self.nobs += int(is_observation)
+            if not math.isnan(self.weighted):
+                self.old_wt *= self.old_wt_factor
+                if is_observation:
+                    # avoid numerical errors on constant series, as pandas
+                    if self.weighted != value:
+                        weighted = self.old_wt * self.weighted + self.new_wt * value
+                        self.weighted = weighted / (self.old_wt + self.new_wt)
+                    self.old_wt += self.new_wt
+            elif is_observation:
+                self.weighted = value
+        self.rows += 1
+        return np.float64(self.weighted if self.nobs >= 1 else np.nan)
@@ -0,0 +1,126 @@
+"""
+Kernels compiled with numba, which is imported at the first call.
+Each kernel returns the same values as the numpy one of the block it replaces.
+"""
+
+import math
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+__all__ = ["cross_signals", "stochastics_signal_index", "directional_movement"]
+
+
+@lru_cache(maxsize=None)
+def _compiled() -> dict:
+    import numba
+
+    @numba.njit
+    def _cross_signals(values, to_plus, to_minus):
+        rows, columns = values.shape
+        for i in range(1, rows):
+            for j in range(columns):
+                current = values[i, j]
+                prev = values[i - 1, j]
+                # NaN is never crossed, as the comparisons are False
+                if current * prev < 0:
+                    if current > prev:
+                        to_plus[i, j] = 1
+                    elif current < prev:
+                        to_minus[i, j] = 1
+
+    @numba.njit
+    def _stochastics_signal_index(k, d, sd, prev_k, prev_d, prev_sd, is_buy, out):
+        for i in range(k.shape[0]):
+            if is_buy:
+                if k[i] > 30 or d[i] > 30 or sd[i] > 30:
+                    out[i] = 0.0
+                    continue
+                if k[i] < 20 and d[i] < 20 and prev_d[i] > prev_k[i] and d[i] < k[i]:
+                    out[i] = k[i] - d[i]
+                    continue
+                if d[i] < 20 and sd[i] < 20 and prev_sd[i] > prev_d[i] and sd[i] < d[i]:
+                    out[i] = d[i] - sd[i]
+                    continue
+            else:
+                if k[i] < 70 or d[i] < 70 or sd[i] < 70:
+                    out[i] = 0.0
+                    continue
+                if k[i] > 80 and d[i] > 80 and prev_d[i] < prev_k[i] and d[i] > k[i]:
+                    out[i] = d[i] - k[i]
+                    continue
+                if d[i] > 80 and sd[i] > 80 and prev_sd[i] < prev_d[i] and sd[i] > d[i]:
+                    out[i] = d[i] - sd[i]
+                    continue
+            out[i] = 1 / math.exp(
+                math.pow(k[i] - 20, 2) / 100 + math.pow(d[i] - 20, 2) / 100 + math.pow(sd[i] - 20, 2) / 100
+            )
+
+    @numba.njit
+    def _directional_movement(high, low, prev_high, prev_low, prev_close, true_range, fixed_plus_dm, fixed_minus_dm):
+        rows, columns = high.shape
+        for i in range(rows):
+            for j in range(columns):
+                plus_dm = high[i, j] - prev_high[i, j]
+                minus_dm = prev_low[i, j] - low[i, j]
+                fixed_plus_dm[i, j] = plus_dm if plus_dm > 0 and plus_dm > minus_dm else 0.0
+                fixed_minus_dm[i, j] = minus_dm if minus_dm > 0 and minus_dm > plus_dm else 0.0
+                # `max(a, b)` of Python, which returns `a` unless `b > a`
+                a = high[i, j] - low[i, j]
+                b = high[i, j] - prev_close[i, j]
+                c = prev_close[i, j] - low[i, j]
+                max_ab = b if b > a else a
+                max_ac = c if c > a else a
+                true_range[i, j] = max_ac if max_ac > max_ab else max_ab
+
+    return {
+        "cross_signals": _cross_signals,
+        "stochastics_signal_index": _stochastics_signal_index,
+        "directional_movement": _directional_movement,
+    }
+
+
+def _as_2d(values) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    return np.ascontiguousarray(values[:, None] if values.ndim == 1 else values)
+
+
+def cross_signals(values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Same as `cross_signals()` of the process blocks.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values_2d = _as_2d(values)
+    to_plus = np.zeros(values_2d.shape, dtype=np.int8)
+    to_minus = np.zeros(values_2d.shape, dtype=np.int8)
+    _compiled()["cross_signals"](values_2d, to_plus, to_minus)
+    return to_plus.reshape(values.shape), to_minus.reshape(values.shape)
+
+
+def stochastics_signal_index(current_k, current_d, current_sd, prev_k, prev_d, prev_sd, is_buy: bool) -> np.ndarray:
+    """
+    Same as `_buy_signal_index()` or `_sell_signal_index()` of `ProcessStochasticsBlock`.
+    """
+    shape = np.shape(current_k)
+    args = [
+        np.ascontiguousarray(v, dtype=np.float64).ravel()
+        for v in [current_k, current_d, current_sd, prev_k, prev_d, prev_sd]
+    ]
+    out = np.empty(args[0].shape)
+    _compiled()["stochastics_signal_index"](*args, is_buy, out)
+    return out.reshape(shape)
+
+
+def directional_movement(high, low, prev_high, prev_low, prev_close) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Same as `_true_range()` and `_fixed_dm()` of `ProcessAdxBlock`.
+
+    Returns:
+        true range, fixed +DM and fixed -DM of the same shape as `high`
+    """
+    shape = np.shape(high)
+    args = [_as_2d(v) for v in [high, low, prev_high, prev_low, prev_close]]
+    outputs = tuple(np.empty(args[0].shape) for _ in range(3))
+    _compiled()["directional_movement"](*args, *outputs)
+    return tuple(v.reshape(shape) for v in outputs)
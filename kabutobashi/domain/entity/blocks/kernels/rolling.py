@@ -0,0 +1,254 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+__all__ = [
+    "RollingKernel",
+    "rolling_count",
+    "rolling_max",
+    "rolling_min",
+    "rolling_sum",
+    "rolling_mean",
+    "rolling_var",
+    "rolling_std",
+]
+
+
+def _as_2d(values) -> Tuple[np.ndarray, bool]:
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        return values[:, None], True
+    if values.ndim == 2:
+        return values, False
+    raise ValueError(f"values must be 1-D or 2-D, but {values.ndim}-D")
+
+
+def _window_diff(prefix: np.ndarray, window: int) -> np.ndarray:
+    """
+    Args:
+        prefix: prefix sums of (rows + 1, columns), starting with 0
+
+    Returns:
+        sums of the windows ending at each row, as `prefix[i + 1] - prefix[max(0, i + 1 - window)]`
+    """
+    rows = prefix.shape[0] - 1
+    out = prefix[1:].copy()
+    if window < rows:
+        out[window:] -= prefix[1 : rows + 1 - window]
+    return out
+
+
+def _first_values(values: np.ndarray, axis: int) -> np.ndarray:
+    # the first value which is not NaN along `axis`, or 0
+    if values.shape[axis] == 0:
+        return np.zeros(np.delete(values.shape, axis))
+    index = np.expand_dims(np.isnan(values).argmin(axis=axis), axis)
+    first = np.take_along_axis(values, index, axis=axis).squeeze(axis)
+    return np.where(np.isnan(first), 0.0, first)
+
+
+def _local_deviation_sums(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sums of the deviations and of the squared deviations in the windows ending at each row.
+    The rows are split into chunks of `window`, and the windows ending in a chunk are in the frame of
+    the chunk and the previous one, so the deviations are from the first value of the frame
+    and the prefix sums are accumulated over `2 * window` rows only.
+    """
+    rows, columns = values.shape
+    chunks = max(-(-rows // window), 1)
+    padded = np.full(((chunks + 1) * window, columns), np.nan)
+    padded[window : window + rows] = values
+    # (chunks, columns, 2 * window)
+    frames = np.lib.stride_tricks.sliding_window_view(padded, 2 * window, axis=0)[::window]
+    deviation = frames - _first_values(frames, axis=2)[:, :, None]
+    deviation[np.isnan(deviation)] = 0.0
+    sums = []
+    for terms in [deviation, deviation * deviation]:
+        prefix = np.zeros(terms.shape[:2] + (2 * window + 1,))
+        np.cumsum(terms, axis=2, out=prefix[:, :, 1:])
+        window_sums = prefix[:, :, window + 1 :] - prefix[:, :, 1 : window + 1]
+        sums.append(window_sums.transpose(0, 2, 1).reshape(-1, columns)[:rows])
+    return sums[0], sums[1]
+
+
+def _sliding_reduce(values: np.ndarray, window: int, ufunc: np.ufunc, fill: float) -> np.ndarray:
+    """
+    van Herk/Gil-Werman algorithm, O(n) regardless of `window`.
+    The rows are split into blocks of `window`, and the window ending at a row is
+    `ufunc(suffix of the block it starts in, prefix of the block it ends in)`.
+    The head is padded with `fill`, so the first rows are reduced over the partial windows.
+    """
+    rows = values.shape[0]
+    head = window - 1
+    tail = -(rows + head) % window
+    padded = np.concatenate(
+        [
+            np.full((head,) + values.shape[1:], fill),
+            values,
+            np.full((tail,) + values.shape[1:], fill),
+        ]
+    )
+    blocks = padded.reshape((-1, window) + values.shape[1:])
+    prefix = ufunc.accumulate(blocks, axis=1).reshape(padded.shape)
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+    return ufunc(suffix[:rows], prefix[head : head + rows])
+
+
+class RollingKernel:
+    """
+    Rolling statistics over the rows of a 1-D array, or of each column of a 2-D array such as (dates, codes).
+
+    The NaN are skipped, and a window with less than `min_periods` values is NaN, as `pd.Series.rolling()`.
+    The prefix sums and the NaN counts are computed once and shared by all windows and statistics,
+    and each (statistic, window, min_periods) is computed once.
+
+    - `max` and `min` are O(n) with the van Herk/Gil-Werman algorithm, and equal to pandas.
+    - `sum` and `mean` are the differences of prefix sums, which are equal to pandas for integer values
+      such as prices in yen, and within the rounding error otherwise.
+    - `var` and `std` are from the sums of the squared deviations from a local reference,
+      which are accumulated over `2 * window` rows only, so the error does not grow with the rows
+      as the online algorithm of Welford.
+
+    Args:
+        values: 1-D array, or 2-D array whose columns are series
+
+    Examples:
+        >>> kernel = RollingKernel(df["close"].to_numpy())
+        >>> sma_short = kernel.mean(5)
+        >>> sma_long = kernel.mean(70)
+        >>> band_width = kernel.std(12)
+    """
+
+    def __init__(self, values):
+        self._values, self._is_1d = _as_2d(values)
+        self._is_nan = np.isnan(self._values)
+        self._results: Dict[tuple, np.ndarray] = {}
+        self._prefix: Dict[str, np.ndarray] = {}
+
+    @property
+    def shape(self) -> tuple:
+        return self._values.shape[:1] if self._is_1d else self._values.shape
+
+    def _output(self, values: np.ndarray) -> np.ndarray:
+        return values[:, 0] if self._is_1d else values
+
+    def _prefix_sum(self, name: str) -> np.ndarray:
+        if name not in self._prefix:
+            if name == "count":
+                terms = (~self._is_nan).astype(np.int64)
+            else:
+                first = _first_values(self._values, axis=0)
+                self._prefix["first"] = first
+                deviation = np.where(self._is_nan, 0.0, self._values - first)
+                terms = deviation
+            prefix = np.zeros((terms.shape[0] + 1, terms.shape[1]), dtype=terms.dtype)
+            np.cumsum(terms, axis=0, out=prefix[1:])
+            self._prefix[name] = prefix
+        return self._prefix[name]
+
+    def _min_periods(self, window: int, min_periods: Optional[int]) -> int:
+        if window < 1:
+            raise ValueError(f"window must be positive, but {window}")
+        return window if min_periods is None else min_periods
+
+    def _memoize(self, key: tuple, func) -> np.ndarray:
+        if key not in self._results:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self._results[key] = func()
+        return self._results[key]
+
+    def _count(self, window: int) -> np.ndarray:
+        return self._memoize(("count", window), lambda: _window_diff(self._prefix_sum("count"), window))
+
+    def _masked(self, values: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+        values[self._count(window) < max(min_periods, 1)] = np.nan
+        return values
+
+    def _sum(self, window: int, min_periods: int) -> np.ndarray:
+        def _func():
+            count = self._count(window)
+            values = _window_diff(self._prefix_sum("deviation"), window) + self._prefix["first"] * count
+            values[count < min_periods] = np.nan
+            return values
+
+        return self._memoize(("sum", window, min_periods), _func)
+
+    def _mean(self, window: int, min_periods: int) -> np.ndarray:
+        def _func():
+            values = self._sum(window, min_periods) / self._count(window)
+            return self._masked(values, window, min_periods)
+
+        return self._memoize(("mean", window, min_periods), _func)
+
+    def _var(self, window: int, min_periods: int, ddof: int) -> np.ndarray:
+        def _func():
+            count = self._count(window)
+            deviation, squared = _local_deviation_sums(self._values, window)
+            # the rounding error may be negative
+            values = np.maximum((squared - deviation * deviation / count) / (count - ddof), 0.0)
+            values[count <= ddof] = np.nan
+            return self._masked(values, window, min_periods)
+
+        return self._memoize(("var", window, min_periods, ddof), _func)
+
+    def _reduce(self, name: str, window: int, min_periods: int) -> np.ndarray:
+        ufunc, fill = (np.maximum, -np.inf) if name == "max" else (np.minimum, np.inf)
+
+        def _func():
+            values = _sliding_reduce(np.where(self._is_nan, fill, self._values), window, ufunc, fill)
+            return self._masked(values, window, min_periods)
+
+        return self._memoize((name, window, min_periods), _func)
+
+    def count(self, window: int) -> np.ndarray:
+        return self._output(self._count(window))
+
+    def sum(self, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+        return self._output(self._sum(window, self._min_periods(window, min_periods)))
+
+    def mean(self, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+        return self._output(self._mean(window, self._min_periods(window, min_periods)))
+
+    def var(self, window: int, min_periods: Optional[int] = None, ddof: int = 1) -> np.ndarray:
+        return self._output(self._var(window, self._min_periods(window, min_periods), ddof))
+
+    def std(self, window: int, min_periods: Optional[int] = None, ddof: int = 1) -> np.ndarray:
+        min_periods = self._min_periods(window, min_periods)
+        values = self._memoize(
+            ("std", window, min_periods, ddof), lambda: np.sqrt(self._var(window, min_periods, ddof))
+        )
+        return self._output(values)
+
+    def max(self, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+        return self._output(self._reduce("max", window, self._min_periods(window, min_periods)))
+
+    def min(self, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+        return self._output(self._reduce("min", window, self._min_periods(window, min_periods)))
+
+
+def rolling_count(values, window: int) -> np.ndarray:
+    return RollingKernel(values).count(window)
+
+
+def rolling_max(values, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+    return RollingKernel(values).max(window, min_periods)
+
+
+def rolling_min(values, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+    return RollingKernel(values).min(window, min_periods)
+
+
+def rolling_sum(values, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+    return RollingKernel(values).sum(window, min_periods)
+
+
+def rolling_mean(values, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+    return RollingKernel(values).mean(window, min_periods)
+
+
+def rolling_var(values, window: int, min_periods: Optional[int] = None, ddof: int = 1) -> np.ndarray:
+    return RollingKernel(values).var(window, min_periods, ddof)
+
+
+def rolling_std(values, window: int, min_periods: Optional[int] = None, ddof: int = 1) -> np.ndarray:
+    return RollingKernel(values).std(window, min_periods, ddof)
@@ -0,0 +1,23 @@
+import numpy as np
+
+__all__ = ["shift"]
+
+
+def shift(values, periods: int = 1, fill_value: float = np.nan) -> np.ndarray:
+    """
+    `pd.Series.shift()` of a 1-D array, or of each column of a 2-D array.
+
+    Args:
+        values: 1-D array, or 2-D array whose columns are series
+        periods: positive to shift forward, negative to shift backward
+        fill_value: value of the rows shifted in
+    """
+    values = np.asarray(values, dtype=np.float64)
+    shifted = np.full(values.shape, fill_value, dtype=np.float64)
+    if abs(periods) >= len(values):
+        return shifted
+    if periods >= 0:
+        shifted[periods:] = values[: len(values) - periods]
+    else:
+        shifted[:periods] = values[-periods:]
+    return shifted
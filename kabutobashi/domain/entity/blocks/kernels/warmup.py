@@ -0,0 +1,25 @@
+import math
+
+__all__ = ["DEFAULT_EWM_TOLERANCE", "ewm_warmup"]
+
+DEFAULT_EWM_TOLERANCE = 1e-6
+
+
+def ewm_warmup(span: int, tolerance: float = DEFAULT_EWM_TOLERANCE) -> int:
+    """
+    Rows of `pd.Series.ewm(span=span).mean()` until the weight of the older values is below `tolerance`,
+    i.e. the EWM over the last rows differs from the one over the whole series by less than `tolerance`
+    times the range of the values.
+
+    Args:
+        span: span of the EWM
+        tolerance: relative error of the EWM of the last row
+    """
+    if span < 1:
+        raise ValueError(f"span must be positive, but {span}")
+    if not 0 < tolerance < 1:
+        raise ValueError(f"tolerance must be in (0, 1), but {tolerance}")
+    decay = 1 - 2 / (span + 1)
+    if decay <= 0:
+        return 1
+    return math.ceil(math.log(tolerance) / math.log(decay)) + 1
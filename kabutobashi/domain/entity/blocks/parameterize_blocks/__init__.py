@@ -1,5 +1,7 @@
+from .abc_parameterize_block import get_impacts
 from .parameterize_adx_block import ParameterizeAdxBlock
 from .parameterize_bollinger_bands_block import ParameterizeBollingerBandsBlock
+from .parameterize_impact_block import ParameterizeImpactBlock
 from .parameterize_macd_block import ParameterizeMacdBlock
 from .parameterize_momentum_block import ParameterizeMomentumBlock
 from .parameterize_pct_change import ParameterizePctChangeBlock
@@ -1,5 +1,66 @@
+from typing import Dict, List, Optional
+
 import pandas as pd
 
+from ..kernels import ewm_warmup
+
+# the impacts are rounded to 5 decimals, so the EWM over the bounded rows leaves them unchanged
+IMPACT_EWM_TOLERANCE = 1e-12
+BUY_SIGNAL_SUFFIX = "_buy_signal"
+SELL_SIGNAL_SUFFIX = "_sell_signal"
+
+
+def signal_prefixes(df: pd.DataFrame) -> List[str]:
+    """
+    Returns:
+        prefixes of the pairs of `{prefix}_buy_signal` and `{prefix}_sell_signal` columns
+    """
+    columns = set(df.columns)
+    prefixes = []
+    for column in df.columns:
+        if not column.endswith(BUY_SIGNAL_SUFFIX):
+            continue
+        prefix = column[: -len(BUY_SIGNAL_SUFFIX)]
+        if prefix and f"{prefix}{SELL_SIGNAL_SUFFIX}" in columns:
+            prefixes.append(prefix)
+    return prefixes
+
+
+def get_impacts(
+    df: pd.DataFrame,
+    influence: int = 2,
+    tail: int = 5,
+    prefixes: Optional[List[str]] = None,
+    ewm_tolerance: Optional[float] = IMPACT_EWM_TOLERANCE,
+) -> Dict[str, float]:
+    """
+    `get_impact()` of all the signals at once. The EWM of the buy and sell signals of every prefix are computed
+    together over the last `impact_lookback()` rows only, and the frame is not modified.
+
+    Args:
+        df: series with the `{prefix}_buy_signal` and `{prefix}_sell_signal` columns
+        influence: span of the EWM
+        tail: rows of the EWM to sum
+        prefixes: prefixes of the signals, all the pairs of the signal columns if None
+        ewm_tolerance: relative error of the EWM allowed by the bounded rows, all the rows are used if None
+
+    Returns:
+        `{prefix}_impact` of each prefix, in [-tail, tail]. -: sell, +: buy
+    """
+    if prefixes is None:
+        prefixes = signal_prefixes(df=df)
+    if not prefixes:
+        return {}
+    columns = [f"{p}{BUY_SIGNAL_SUFFIX}" for p in prefixes] + [f"{p}{SELL_SIGNAL_SUFFIX}" for p in prefixes]
+    signals = df[columns]
+    if ewm_tolerance is not None:
+        signals = signals.iloc[-impact_lookback(influence=influence, tail=tail, ewm_tolerance=ewm_tolerance) :]
+    impacts = signals.ewm(span=influence).mean().iloc[-tail:].sum()
+    return {
+        f"{prefix}_impact": round(impacts.iloc[idx] - impacts.iloc[idx + len(prefixes)], 5)
+        for idx, prefix in enumerate(prefixes)
+    }
+
 
 def get_impact(df: pd.DataFrame, influence: int, tail: int, prefix: str = "") -> float:
     """
@@ -19,16 +80,16 @@ def get_impact(df: pd.DataFrame, influence: int, tail: int, prefix: str = "") ->
     if "sell_signal" not in columns and f"{prefix}_sell_signal" not in columns:
         return 0
 
-    if "buy_signal" in columns:
-        df["buy_impact"] = df["buy_signal"].ewm(span=influence).mean()
-    elif f"{prefix}_buy_signal" in columns:
-        df["buy_impact"] = df[f"{prefix}_buy_signal"].ewm(span=influence).mean()
+    # the unprefixed signals take precedence
+    buy_column = "buy_signal" if "buy_signal" in columns else f"{prefix}_buy_signal"
+    sell_column = "sell_signal" if "sell_signal" in columns else f"{prefix}_sell_signal"
+    signals = df[[buy_column, sell_column]].set_axis(["_buy_signal", "_sell_signal"], axis=1)
+    return get_impacts(df=signals, influence=influence, tail=tail, prefixes=[""])["_impact"]
 
-    if "sell_signal" in columns:
-        df["sell_impact"] = df["sell_signal"].ewm(span=influence).mean()
-    elif f"{prefix}_sell_signal" in columns:
-        df["sell_impact"] = df[f"{prefix}_sell_signal"].ewm(span=influence).mean()
 
-    buy_impact_index = df["buy_impact"].iloc[-tail:].sum()
-    sell_impact_index = df["sell_impact"].iloc[-tail:].sum()
-    return round(buy_impact_index - sell_impact_index, 5)
+def impact_lookback(influence: int, tail: int, ewm_tolerance: float) -> int:
+    """
+    Returns:
+        rows of the signals required by `get_impact()`, i.e. the last `tail` rows and the warm-up of the EWM
+    """
+    return tail + ewm_warmup(influence, tolerance=ewm_tolerance) - 1
@@ -3,26 +3,35 @@ import pandas as pd
 from kabutobashi.domain.errors import KabutobashiBlockSeriesIsNoneError
 
 from ..decorator import block
-from .abc_parameterize_block import get_impact
+from .abc_parameterize_block import get_impacts, impact_lookback
 
 
 @block(
-    block_name="parameterize_adx", series_required_columns=["DX", "ADX", "ADXR", "adx_buy_signal", "adx_sell_signal"]
+    block_name="parameterize_adx",
+    series_required_columns=["DX", "ADX", "ADXR", "adx_buy_signal", "adx_sell_signal"],
+    params_output_keys=["adx_dx", "adx_adx", "adx_adxr", "adx_impact", "dt"],
+    cacheable=True,
 )
 class ParameterizeAdxBlock:
     series: pd.DataFrame
     influence: int = 2
     tail: int = 5
 
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # `tail(3)` of the indicators, and the signals of the impact
+        return max(3, impact_lookback(influence=params["influence"], tail=params["tail"], ewm_tolerance=ewm_tolerance))
+
     def _process(self) -> dict:
         df = self.series
         if df is None:
             raise KabutobashiBlockSeriesIsNoneError()
+        impacts = get_impacts(df=df, influence=self.influence, tail=self.tail, prefixes=["adx"])
         params = {
             "adx_dx": df["DX"].tail(3).mean(),
             "adx_adx": df["ADX"].tail(3).mean(),
             "adx_adxr": df["ADXR"].tail(3).mean(),
-            "adx_impact": get_impact(df=df, influence=self.influence, tail=self.tail, prefix="adx"),
+            "adx_impact": impacts["adx_impact"],
             "dt": max(df.index.to_list()),
         }
         return params
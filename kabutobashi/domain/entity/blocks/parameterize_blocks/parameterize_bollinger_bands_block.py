@@ -3,7 +3,7 @@ import pandas as pd
 from kabutobashi.domain.errors import KabutobashiBlockSeriesIsNoneError
 
 from ..decorator import block
-from .abc_parameterize_block import get_impact
+from .abc_parameterize_block import get_impacts, impact_lookback
 
 
 @block(
@@ -16,24 +16,37 @@ from .abc_parameterize_block import get_impact
         "bollinger_bands_buy_signal",
         "bollinger_bands_sell_signal",
     ],
+    params_output_keys=[
+        "upper_1_sigma",
+        "lower_1_sigma",
+        "upper_2_sigma",
+        "lower_2_sigma",
+        "bollinger_bands_impact",
+        "dt",
+    ],
+    cacheable=True,
 )
 class ParameterizeBollingerBandsBlock:
     series: pd.DataFrame
     influence: int = 2
     tail: int = 5
 
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # `tail(3)` of the indicators, and the signals of the impact
+        return max(3, impact_lookback(influence=params["influence"], tail=params["tail"], ewm_tolerance=ewm_tolerance))
+
     def _process(self) -> dict:
         df = self.series
         if df is None:
             raise KabutobashiBlockSeriesIsNoneError()
+        impacts = get_impacts(df=df, influence=self.influence, tail=self.tail, prefixes=["bollinger_bands"])
         params = {
             "upper_1_sigma": df["upper_1_sigma"].tail(3).mean(),
             "lower_1_sigma": df["lower_1_sigma"].tail(3).mean(),
             "upper_2_sigma": df["upper_2_sigma"].tail(3).mean(),
             "lower_2_sigma": df["lower_2_sigma"].tail(3).mean(),
-            "bollinger_bands_impact": get_impact(
-                df=df, influence=self.influence, tail=self.tail, prefix="bollinger_bands"
-            ),
+            "bollinger_bands_impact": impacts["bollinger_bands_impact"],
             "dt": max(df.index.to_list()),
         }
 
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from kabutobashi.domain.errors import KabutobashiBlockSeriesIsNoneError
+
+from ..decorator import block
+from .abc_parameterize_block import BUY_SIGNAL_SUFFIX, SELL_SIGNAL_SUFFIX, get_impacts, impact_lookback
+
+IMPACT_PREFIXES = ["sma", "macd", "adx", "bollinger_bands", "momentum", "psycho_logical", "stochastics"]
+
+
+@block(
+    block_name="parameterize_impact",
+    # the signals of the process blocks in the flow
+    series_required_columns=[
+        f"{prefix}{suffix}" for prefix in IMPACT_PREFIXES for suffix in [BUY_SIGNAL_SUFFIX, SELL_SIGNAL_SUFFIX]
+    ],
+    series_required_columns_mode="available",
+    params_output_keys=[f"{prefix}_impact" for prefix in IMPACT_PREFIXES] + ["dt"],
+    cacheable=True,
+)
+class ParameterizeImpactBlock:
+    """
+    `{prefix}_impact` of all the pairs of `{prefix}_buy_signal` and `{prefix}_sell_signal` in the flow at once,
+    see `get_impacts()`. The impacts are the same as the ones of the parameterize blocks of each indicator,
+    so a flow may use this block instead of the impacts of those blocks, e.g. the signals of a user-defined block.
+    """
+
+    series: pd.DataFrame
+    influence: int = 2
+    tail: int = 5
+
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        return impact_lookback(influence=params["influence"], tail=params["tail"], ewm_tolerance=ewm_tolerance)
+
+    def _process(self) -> dict:
+        df = self.series
+        if df is None:
+            raise KabutobashiBlockSeriesIsNoneError()
+        params = get_impacts(df=df, influence=self.influence, tail=self.tail)
+        params["dt"] = max(df.index.to_list())
+        return params
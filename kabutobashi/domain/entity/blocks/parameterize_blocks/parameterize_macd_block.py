@@ -3,26 +3,34 @@ import pandas as pd
 from kabutobashi.domain.errors import KabutobashiBlockSeriesIsNoneError
 
 from ..decorator import block
-from .abc_parameterize_block import get_impact
+from .abc_parameterize_block import get_impacts, impact_lookback
 
 
 @block(
     block_name="parameterize_macd",
     series_required_columns=["signal", "histogram", "macd_buy_signal", "macd_sell_signal"],
+    params_output_keys=["signal", "histogram", "macd_impact", "dt"],
+    cacheable=True,
 )
 class ParameterizeMacdBlock:
     series: pd.DataFrame
     influence: int = 2
     tail: int = 5
 
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # `tail(3)` of the indicators, and the signals of the impact
+        return max(3, impact_lookback(influence=params["influence"], tail=params["tail"], ewm_tolerance=ewm_tolerance))
+
     def _process(self) -> dict:
         df = self.series
         if df is None:
             raise KabutobashiBlockSeriesIsNoneError()
+        impacts = get_impacts(df=df, influence=self.influence, tail=self.tail, prefixes=["macd"])
         params = {
             "signal": df["signal"].tail(3).mean(),
             "histogram": df["histogram"].tail(3).mean(),
-            "macd_impact": get_impact(df=df, influence=self.influence, tail=self.tail, prefix="macd"),
+            "macd_impact": impacts["macd_impact"],
             "dt": max(df.index.to_list()),
         }
 
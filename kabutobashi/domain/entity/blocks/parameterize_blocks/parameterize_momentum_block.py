@@ -3,21 +3,31 @@ import pandas as pd
 from kabutobashi.domain.errors import KabutobashiBlockSeriesIsNoneError
 
 from ..decorator import block
-from .abc_parameterize_block import get_impact
+from .abc_parameterize_block import get_impacts, impact_lookback
 
 
-@block(block_name="parameterize_momentum", series_required_columns=["momentum_buy_signal", "momentum_sell_signal"])
+@block(
+    block_name="parameterize_momentum",
+    series_required_columns=["momentum_buy_signal", "momentum_sell_signal"],
+    params_output_keys=["momentum_impact", "dt"],
+    cacheable=True,
+)
 class ParameterizeMomentumBlock:
     series: pd.DataFrame
     influence: int = 2
     tail: int = 5
 
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        return impact_lookback(influence=params["influence"], tail=params["tail"], ewm_tolerance=ewm_tolerance)
+
     def _process(self) -> dict:
         df = self.series
         if df is None:
             raise KabutobashiBlockSeriesIsNoneError()
+        impacts = get_impacts(df=df, influence=self.influence, tail=self.tail, prefixes=["momentum"])
         params = {
-            "momentum_impact": get_impact(df=df, influence=self.influence, tail=self.tail, prefix="momentum"),
+            "momentum_impact": impacts["momentum_impact"],
             "dt": max(df.index.to_list()),
         }
 
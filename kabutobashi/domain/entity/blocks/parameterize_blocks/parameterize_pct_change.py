@@ -8,6 +8,8 @@ from ..decorator import block
 @block(
     block_name="parameterize_pct_change",
     series_required_columns=["close"],
+    params_output_keys=["pct_05", "pct_10", "pct_20", "pct_30", "pct_40", "dt"],
+    cacheable=True,
 )
 class ParameterizePctChangeBlock:
     """
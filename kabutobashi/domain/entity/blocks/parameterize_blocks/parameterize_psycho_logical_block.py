@@ -3,27 +3,33 @@ import pandas as pd
 from kabutobashi.domain.errors import KabutobashiBlockSeriesIsNoneError
 
 from ..decorator import block
-from .abc_parameterize_block import get_impact
+from .abc_parameterize_block import get_impacts, impact_lookback
 
 
 @block(
     block_name="parameterize_psycho_logical",
     series_required_columns=["psycho_line", "psycho_logical_buy_signal", "psycho_logical_sell_signal"],
+    params_output_keys=["psycho_line", "psycho_logical_impact", "dt"],
+    cacheable=True,
 )
 class ParameterizePsychoLogicalBlock:
     series: pd.DataFrame
     influence: int = 2
     tail: int = 5
 
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # `tail(3)` of the indicators, and the signals of the impact
+        return max(3, impact_lookback(influence=params["influence"], tail=params["tail"], ewm_tolerance=ewm_tolerance))
+
     def _process(self) -> dict:
         df = self.series
         if df is None:
             raise KabutobashiBlockSeriesIsNoneError()
+        impacts = get_impacts(df=df, influence=self.influence, tail=self.tail, prefixes=["psycho_logical"])
         params = {
             "psycho_line": df["psycho_line"].tail(3).mean(),
-            "psycho_logical_impact": get_impact(
-                df=df, influence=self.influence, tail=self.tail, prefix="psycho_logical"
-            ),
+            "psycho_logical_impact": impacts["psycho_logical_impact"],
             "dt": max(df.index.to_list()),
         }
 
@@ -3,18 +3,33 @@ import pandas as pd
 from kabutobashi.domain.errors import KabutobashiBlockSeriesIsNoneError
 
 from ..decorator import block
-from .abc_parameterize_block import get_impact
+from .abc_parameterize_block import get_impacts, impact_lookback
 
 
 @block(
     block_name="parameterize_sma",
     series_required_columns=["sma_short", "sma_medium", "sma_long", "close", "sma_buy_signal", "sma_sell_signal"],
+    params_output_keys=[
+        "sma_short_diff",
+        "sma_medium_diff",
+        "sma_long_diff",
+        "sma_long_short",
+        "sma_long_medium",
+        "sma_impact",
+        "dt",
+    ],
+    cacheable=True,
 )
 class ParameterizeSmaBlock:
     series: pd.DataFrame
     influence: int = 2
     tail: int = 5
 
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # `tail(3)` of the indicators, and the signals of the impact
+        return max(3, impact_lookback(influence=params["influence"], tail=params["tail"], ewm_tolerance=ewm_tolerance))
+
     def _process(self) -> dict:
         df = self.series
         if df is None:
@@ -25,13 +40,14 @@ class ParameterizeSmaBlock:
         # difference from sma_long
         df["sma_long_short"] = (df["sma_long"] - df["sma_short"]) / df["sma_long"]
         df["sma_long_medium"] = (df["sma_long"] - df["sma_medium"]) / df["sma_long"]
+        impacts = get_impacts(df=df, influence=self.influence, tail=self.tail, prefixes=["sma"])
         params = {
             "sma_short_diff": df["sma_short_diff"].tail(3).mean(),
             "sma_medium_diff": df["sma_medium_diff"].tail(3).mean(),
             "sma_long_diff": df["sma_long_diff"].tail(3).mean(),
             "sma_long_short": df["sma_long_short"].tail(3).mean(),
             "sma_long_medium": df["sma_long_medium"].tail(3).mean(),
-            "sma_impact": get_impact(df=df, influence=self.influence, tail=self.tail, prefix="sma"),
+            "sma_impact": impacts["sma_impact"],
             "dt": max(df.index.to_list()),
         }
 
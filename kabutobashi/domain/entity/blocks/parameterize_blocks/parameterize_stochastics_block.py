@@ -3,27 +3,35 @@ import pandas as pd
 from kabutobashi.domain.errors import KabutobashiBlockSeriesIsNoneError
 
 from ..decorator import block
-from .abc_parameterize_block import get_impact
+from .abc_parameterize_block import get_impacts, impact_lookback
 
 
 @block(
     block_name="parameterize_stochastics",
     series_required_columns=["K", "D", "SD", "stochastics_buy_signal", "stochastics_sell_signal"],
+    params_output_keys=["stochastics_k", "stochastics_d", "stochastics_sd", "stochastics_impact", "dt"],
+    cacheable=True,
 )
 class ParameterizeStochasticsBlock:
     series: pd.DataFrame
     influence: int = 2
     tail: int = 5
 
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # `tail(3)` of the indicators, and the signals of the impact
+        return max(3, impact_lookback(influence=params["influence"], tail=params["tail"], ewm_tolerance=ewm_tolerance))
+
     def _process(self) -> dict:
         df = self.series
         if df is None:
             raise KabutobashiBlockSeriesIsNoneError()
+        impacts = get_impacts(df=df, influence=self.influence, tail=self.tail, prefixes=["stochastics"])
         params = {
             "stochastics_k": df["K"].tail(3).mean(),
             "stochastics_d": df["D"].tail(3).mean(),
             "stochastics_sd": df["SD"].tail(3).mean(),
-            "stochastics_impact": get_impact(df=df, influence=self.influence, tail=self.tail, prefix="stochastics"),
+            "stochastics_impact": impacts["stochastics_impact"],
             "dt": max(df.index.to_list()),
         }
 
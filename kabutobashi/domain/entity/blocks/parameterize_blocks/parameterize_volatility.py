@@ -9,6 +9,8 @@ from .abc_parameterize_block import get_impact
 @block(
     block_name="parameterize_volatility",
     series_required_columns=["high", "low", "close"],
+    params_output_keys=["volatility", "close_volatility", "dt"],
+    cacheable=True,
 )
 class ParameterizeVolatilityBlock:
     """
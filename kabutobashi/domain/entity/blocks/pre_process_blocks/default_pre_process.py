@@ -14,6 +14,7 @@ from ..decorator import block
     block_name="default_pre_process",
     series_required_columns=["open", "high", "low", "close", "code", "volume"],
     series_required_columns_mode="all",
+    cacheable=True,
 )
 class DefaultPreProcessBlock:
     series: pd.DataFrame
@@ -52,6 +53,11 @@ class DefaultPreProcessBlock:
         if not missing_df.empty:
             raise KabutobashiBlockSeriesDtIsMissingError(code=str(list(set(df["code"]))[0]), dt=list(missing_df["dt"]))
 
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # the rows are kept, except the holidays
+        return rows
+
     def _process(self) -> Tuple[pd.DataFrame, dict]:
 
         df = self.series
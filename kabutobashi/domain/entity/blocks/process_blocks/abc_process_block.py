@@ -1,34 +1,100 @@
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 import pandas as pd
 
+from ..kernels import get_kernel_backend, jit
+
+
+def cross_signals(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    0を基準としてプラスかマイナスのどちらかに振れたかを判断する関数
+
+    Args:
+        values: 1-D array of a series, or 2-D array whose columns are series, e.g. (dates, codes)
+
+    Returns:
+        `to_plus` and `to_minus` as int8 arrays of the same shape; 1 at the points crossed 0.
+        A point next to NaN or exactly 0 is not crossed.
+    """
+    if get_kernel_backend() == "numba":
+        return jit.cross_signals(values)
+    values = np.asarray(values, dtype=np.float64)
+    shifted = np.empty_like(values)
+    if len(values) > 0:
+        shifted[0] = np.nan
+        shifted[1:] = values[:-1]
+    with np.errstate(invalid="ignore"):
+        is_cross = values * shifted < 0
+        to_plus = is_cross & (values > shifted)
+        to_minus = is_cross & (values < shifted)
+    return to_plus.astype(np.int8), to_minus.astype(np.int8)
+
+
+def cross_point(value: float, prev_value: float) -> Tuple[np.int8, np.int8]:
+    """
+    `cross_signals()` of the last point of a series, for the incremental update.
+
+    Args:
+        value: the value of the point
+        prev_value: the value of the previous point, NaN for the first point
+
+    Returns:
+        `to_plus` and `to_minus` as int8
+    """
+    with np.errstate(invalid="ignore"):
+        is_cross = value * prev_value < 0
+    return np.int8(is_cross and value > prev_value), np.int8(is_cross and value < prev_value)
+
 
-def cross(_s: pd.Series, to_plus_name=None, to_minus_name=None) -> pd.DataFrame:
+def cross(_s: Union[pd.Series, pd.DataFrame], to_plus_name: str = None, to_minus_name: str = None) -> pd.DataFrame:
     """
     0を基準としてプラスかマイナスのどちらかに振れたかを判断する関数
 
     Args:
-        _s: 対象のpd.Series
+        _s: 対象のpd.Series, or pd.DataFrame to detect the crossing of all the columns at once
         to_plus_name: 上抜けた場合のカラムの名前
         to_minus_name: 下抜けた場合のカラムの名前
+
+    Returns:
+        `to_plus` and `to_minus` int8 columns for pd.Series,
+        `{column}_to_plus` and `{column}_to_minus` int8 columns for pd.DataFrame
     """
-    # shorten variable name
-    col = "original"
-    shifted = "shifted"
+    to_plus, to_minus = cross_signals(_s.to_numpy(dtype=np.float64))
+    if isinstance(_s, pd.DataFrame):
+        data = {}
+        for idx, column in enumerate(_s.columns):
+            data[f"{column}_to_plus"] = to_plus[:, idx]
+            data[f"{column}_to_minus"] = to_minus[:, idx]
+        return pd.DataFrame(data, index=_s.index)
+    # 上抜けか下抜けかを判断している
+    return pd.DataFrame(
+        {to_plus_name or "to_plus": to_plus, to_minus_name or "to_minus": to_minus},
+        index=_s.index,
+    )
 
-    # shiftしたDataFrameの作成
-    shift_s = _s.shift(1)
-    df = pd.DataFrame({col: _s, shifted: shift_s})
 
-    # 正負が交差した点
-    df = df.assign(
-        is_cross=df.apply(lambda x: 1 if x[col] * x[shifted] < 0 else 0, axis=1),
-        is_higher=df.apply(lambda x: 1 if x[col] > x[shifted] else 0, axis=1),
-        is_lower=df.apply(lambda x: 1 if x[col] < x[shifted] else 0, axis=1),
-    )
+def max_window(*windows: Union[int, Sequence[int]]) -> int:
+    """
+    Returns:
+        the longest of the windows, which may be sequences of a sweep
+    """
+    return max([max(v) if not isinstance(v, (int, np.integer)) else v for v in windows])
 
-    # 上抜けか下抜けかを判断している
-    df = df.assign(to_plus=df["is_cross"] * df["is_higher"], to_minus=df["is_cross"] * df["is_lower"])
-    if to_plus_name is not None:
-        df = df.rename(columns={"to_plus": to_plus_name})
-    if to_minus_name is not None:
-        df = df.rename(columns={"to_minus": to_minus_name})
-    return df
+
+def sweep_windows(**windows: Union[int, Sequence[int]]) -> Optional[List[Dict[str, int]]]:
+    """
+    Combinations of the windows of a parameter sweep, such as `short_term=[5, 10, 20], long_term=70`.
+    The sequences are zipped, and an int is used for all the combinations.
+
+    Returns:
+        None if all the windows are int, else the combinations in order
+    """
+    if all(isinstance(v, (int, np.integer)) for v in windows.values()):
+        return None
+    lengths = {len(v) for v in windows.values() if not isinstance(v, (int, np.integer))}
+    if len(lengths) != 1:
+        raise ValueError(f"the sequences of the windows must have the same length, but {windows}")
+    length = lengths.pop()
+    expanded = {k: [v] * length if isinstance(v, (int, np.integer)) else list(v) for k, v in windows.items()}
+    return [dict(zip(expanded.keys(), values)) for values in zip(*expanded.values())]
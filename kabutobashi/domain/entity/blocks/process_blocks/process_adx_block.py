@@ -1,12 +1,21 @@
+from typing import Dict, Tuple
+
+import numpy as np
 import pandas as pd
 
 from ..decorator import block
-from .abc_process_block import cross
+from ..kernels import PandasRollingState, ShiftState, get_kernel_backend, jit
+from .abc_process_block import cross_point, cross_signals
 
 __all__ = ["ProcessAdxBlock"]
 
 
-@block(block_name="process_adx", series_required_columns=["high", "low", "close"])
+@block(
+    block_name="process_adx",
+    series_required_columns=["high", "low", "close"],
+    series_output_columns=["DX", "ADX", "ADXR", "adx_buy_signal", "adx_sell_signal"],
+    cacheable=True,
+)
 class ProcessAdxBlock:
     """
     相場のトレンドの強さを見るための指標である`ADX`を計算するクラス。
@@ -35,115 +44,114 @@ class ProcessAdxBlock:
     adxr_term: int = 28
 
     @staticmethod
-    def _true_range(x: pd.DataFrame):
+    def _max(a: np.ndarray, b: np.ndarray) -> np.ndarray:
         """
-
-        Args:
-            x (pd.DataFrame)
-
-        Returns:
-            maximum
+        element-wise `max(a, b)` of Python, which returns `a` unless `b > a`, even if either is NaN.
         """
-        if x["high"] is pd.NA or x["low"] is pd.NA or x["shift_close"] is pd.NA:
-            return 0
-        current_high = x["high"]
-        current_low = x["low"]
-        prev_close = x["shift_close"]
-        a = current_high - current_low
-        b = current_high - prev_close
-        c = prev_close - current_low
-        max_ab = max(a, b)
-        max_ac = max(a, c)
-        return max(max_ab, max_ac)
+        return np.where(b > a, b, a)
 
     @staticmethod
-    def _compute_dx(x: pd.DataFrame) -> float:
+    def _true_range(high: np.ndarray, low: np.ndarray, prev_close: np.ndarray) -> np.ndarray:
         """
 
         Args:
-            x (pd.DataFrame):
+            high: current high
+            low: current low
+            prev_close: close of the previous day
+
+        Returns:
+            maximum of `high - low`, `high - prev_close` and `prev_close - low`
         """
-        numerator = abs(x["plus_di"] - x["minus_di"])
-        denominator = x["plus_di"] + x["minus_di"]
-        try:
+        a = high - low
+        b = high - prev_close
+        c = prev_close - low
+        max_ab = ProcessAdxBlock._max(a, b)
+        max_ac = ProcessAdxBlock._max(a, c)
+        return ProcessAdxBlock._max(max_ab, max_ac)
+
+    @staticmethod
+    def _compute_dx(plus_di: np.ndarray, minus_di: np.ndarray) -> np.ndarray:
+        numerator = np.abs(plus_di - minus_di)
+        denominator = plus_di + minus_di
+        with np.errstate(divide="ignore", invalid="ignore"):
             return numerator / denominator * 100
-        except ZeroDivisionError:
-            return 0
 
     @staticmethod
-    def _fixed_plus_dm(x: pd.DataFrame) -> float:
-        if x["plus_dm"] is pd.NA or x["minus_dm"] is pd.NA:
-            return 0
-        if x["plus_dm"] > 0 and x["plus_dm"] > x["minus_dm"]:
-            return x["plus_dm"]
-        else:
-            return 0
+    def _fixed_dm(dm: np.ndarray, opposite_dm: np.ndarray) -> np.ndarray:
+        # NaN is not greater than any value, so it is fixed to 0
+        return np.where((dm > 0) & (dm > opposite_dm), dm, 0.0)
 
     @staticmethod
-    def _fixed_minus_dm(x: pd.DataFrame) -> float:
-        if x["plus_dm"] is pd.NA or x["minus_dm"] is pd.NA:
-            return 0
-        if x["minus_dm"] > 0 and x["minus_dm"] > x["plus_dm"]:
-            return x["minus_dm"]
-        else:
-            return 0
+    def _directional_movement(
+        high: np.ndarray, low: np.ndarray, shift_high: np.ndarray, shift_low: np.ndarray, shift_close: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+
+        Returns:
+            true range, fixed +DM and fixed -DM
+        """
+        if get_kernel_backend() == "numba":
+            return jit.directional_movement(
+                high=high, low=low, prev_high=shift_high, prev_low=shift_low, prev_close=shift_close
+            )
+        plus_dm = high - shift_high
+        minus_dm = shift_low - low
+        fixed_plus_dm = ProcessAdxBlock._fixed_dm(plus_dm, minus_dm)
+        fixed_minus_dm = ProcessAdxBlock._fixed_dm(minus_dm, plus_dm)
+        true_range = ProcessAdxBlock._true_range(high=high, low=low, prev_close=shift_close)
+        return true_range, fixed_plus_dm, fixed_minus_dm
 
     def _apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        high = df["high"].to_numpy(dtype=np.float64)
+        low = df["low"].to_numpy(dtype=np.float64)
+        close = df["close"].to_numpy(dtype=np.float64)
         # 利用する値をshift
-        df = df.assign(shift_high=df["high"].shift(1), shift_low=df["low"].shift(1), shift_close=df["close"].shift(1))
-        df = df.assign(
-            plus_dm=df.apply(lambda x: x["high"] - x["shift_high"], axis=1),
-            minus_dm=df.apply(lambda x: x["shift_low"] - x["low"], axis=1),
-        )
-        df = df.assign(
-            fixed_plus_dm=df.apply(lambda x: self._fixed_plus_dm(x), axis=1),
-            fixed_minus_dm=df.apply(lambda x: self._fixed_minus_dm(x), axis=1),
-        )
-        df = df.assign(
-            true_range=df.apply(lambda x: self._true_range(x), axis=1),
-            sum_tr=lambda x: x["true_range"].rolling(self.term).sum(),
-            sum_plus_dm=lambda x: x["fixed_plus_dm"].rolling(self.term).sum(),
-            sum_minus_dm=lambda x: x["fixed_minus_dm"].rolling(self.term).sum(),
+        shift_high = self._feature(df["high"], "shift", 1)
+        shift_low = self._feature(df["low"], "shift", 1)
+        shift_close = self._feature(df["close"], "shift", 1)
+
+        true_range, fixed_plus_dm, fixed_minus_dm = self._directional_movement(
+            high=high, low=low, shift_high=shift_high, shift_low=shift_low, shift_close=shift_close
         )
+        fixed_plus_dm = pd.Series(fixed_plus_dm, index=df.index)
+        fixed_minus_dm = pd.Series(fixed_minus_dm, index=df.index)
+        true_range = pd.Series(true_range, index=df.index)
+        sum_tr = true_range.rolling(self.term).sum().to_numpy()
+        sum_plus_dm = fixed_plus_dm.rolling(self.term).sum().to_numpy()
+        sum_minus_dm = fixed_minus_dm.rolling(self.term).sum().to_numpy()
 
         # +DI, -DI
-        df = df.assign(
-            plus_di=df.apply(lambda x: x["sum_plus_dm"] / x["sum_tr"] * 100, axis=1),
-            minus_di=df.apply(lambda x: x["sum_minus_dm"] / x["sum_tr"] * 100, axis=1),
-        )
-        df = df.assign(
-            DX=df.apply(self._compute_dx, axis=1),
-            ADX=lambda x: x["DX"].rolling(self.adx_term).mean(),
-            ADXR=lambda x: x["DX"].rolling(self.adxr_term).mean(),
+        with np.errstate(divide="ignore", invalid="ignore"):
+            plus_di = sum_plus_dm / sum_tr * 100
+            minus_di = sum_minus_dm / sum_tr * 100
+        dx = pd.Series(self._compute_dx(plus_di=plus_di, minus_di=minus_di), index=df.index)
+        return pd.DataFrame(
+            {
+                "true_range": true_range,
+                "plus_di": plus_di,
+                "minus_di": minus_di,
+                "DX": dx,
+                "ADX": dx.rolling(self.adx_term).mean(),
+                "ADXR": dx.rolling(self.adxr_term).mean(),
+            },
+            index=df.index,
         )
-        return df
 
     @staticmethod
-    def _buy_signal(x) -> float:
+    def _buy_signal(df: pd.DataFrame) -> np.ndarray:
         """
         DMIとADXを組み合わせた基本パターン
         """
-
         # +DIが-DIを上抜き、ADXが上昇傾向の上向きであれば新規買い
-        if x["ADX_trend"] > 0:
-            if x["to_plus"] > 0:
-                return 1
-        return 0
-
-        # +DIが-DIより上に位置している際に、
-        # ADXが下向きから上向きに転換した場合
-        # if x['diff'] > 0:
+        return ((df["ADX_trend"] > 0) & (df["to_plus"] > 0)).to_numpy(dtype=np.int8)
 
     @staticmethod
-    def _sell_signal(x) -> float:
+    def _sell_signal(df: pd.DataFrame) -> np.ndarray:
         """
         DMIとADXを組み合わせた基本パターン
         """
         # -DIが+DIを下抜き、ADXが下落傾向の下向きであれば新規空売り
-        if x["ADX_trend"] < 0:
-            if x["to_minus"] > 0:
-                return 1
-        return 0
+        return ((df["ADX_trend"] < 0) & (df["to_minus"] > 0)).to_numpy(dtype=np.int8)
 
     @staticmethod
     def _trend(_s: pd.Series) -> pd.Series:
@@ -151,29 +159,73 @@ class ProcessAdxBlock:
         ある系列_sのトレンドを計算する。
         差分のrolling_sumを返す
         """
-        # shorten variable name
-        col = "original"
-        shifted = "shifted"
-
-        # shiftしたDataFrameの作成
-        shift_s = _s.shift(1)
-        df = pd.DataFrame({col: _s, shifted: shift_s})
-        df["diff"] = df["original"] - df["shifted"]
-        df["diff_rolling_sum"] = df["diff"].rolling(5).sum()
-        return df["diff_rolling_sum"]
+        return (_s - _s.shift(1)).rolling(5).sum()
 
     def _signal(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         buy_signalとsell_signalを付与
         """
-        df["ADX_trend"] = self._trend(df["ADX"])
-        df["diff"] = df["plus_di"] - df["minus_di"]
-        df = df.join(cross(df["diff"]))
-
-        df["adx_buy_signal"] = df.apply(lambda x: self._buy_signal)
-        df["adx_sell_signal"] = df.apply(lambda x: self._sell_signal)
-
-        return df
+        to_plus, to_minus = cross_signals(df["plus_di"].to_numpy() - df["minus_di"].to_numpy())
+        signal_df = pd.DataFrame(
+            {"ADX_trend": self._trend(df["ADX"]), "to_plus": to_plus, "to_minus": to_minus}, index=df.index
+        )
+        return df.assign(adx_buy_signal=self._buy_signal(signal_df), adx_sell_signal=self._sell_signal(signal_df))
+
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # DX of the windows of ADXR, or of ADX and its trend of 5 rows,
+        # whose sums of the window `term` require the previous close
+        dx_rows = rows - 1 + max(params["adx_term"] + 5, params["adxr_term"])
+        return dx_rows + params["term"]
+
+    @classmethod
+    def _incremental_state(cls, params: dict) -> dict:
+        return {
+            "shift_high": ShiftState(1),
+            "shift_low": ShiftState(1),
+            "shift_close": ShiftState(1),
+            "sum_tr": PandasRollingState(params["term"], "sum"),
+            "sum_plus_dm": PandasRollingState(params["term"], "sum"),
+            "sum_minus_dm": PandasRollingState(params["term"], "sum"),
+            "ADX": PandasRollingState(params["adx_term"], "mean"),
+            "ADXR": PandasRollingState(params["adxr_term"], "mean"),
+            "ADX_trend": PandasRollingState(5, "sum"),
+            "prev_ADX": np.nan,
+            "prev_di": np.nan,
+        }
+
+    @classmethod
+    def _process_incremental(cls, state: dict, bar: Dict[str, float], params: dict) -> Dict[str, float]:
+        high, low, close = [np.float64(bar[c]) for c in ["high", "low", "close"]]
+        shift_high = np.float64(state["shift_high"].update(high))
+        shift_low = np.float64(state["shift_low"].update(low))
+        shift_close = np.float64(state["shift_close"].update(close))
+        # the numpy functions of `_directional_movement()`, which are the same for a scalar
+        plus_dm = high - shift_high
+        minus_dm = shift_low - low
+        fixed_plus_dm = float(cls._fixed_dm(plus_dm, minus_dm))
+        fixed_minus_dm = float(cls._fixed_dm(minus_dm, plus_dm))
+        true_range = float(cls._true_range(high=high, low=low, prev_close=shift_close))
+        sum_tr = state["sum_tr"].update(true_range)
+        sum_plus_dm = state["sum_plus_dm"].update(fixed_plus_dm)
+        sum_minus_dm = state["sum_minus_dm"].update(fixed_minus_dm)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            plus_di = sum_plus_dm / sum_tr * 100
+            minus_di = sum_minus_dm / sum_tr * 100
+        dx = np.float64(cls._compute_dx(plus_di=plus_di, minus_di=minus_di))
+        adx = state["ADX"].update(dx)
+        adxr = state["ADXR"].update(dx)
+        adx_trend = state["ADX_trend"].update(adx - state["prev_ADX"])
+        to_plus, to_minus = cross_point(plus_di - minus_di, state["prev_di"])
+        state["prev_ADX"] = adx
+        state["prev_di"] = plus_di - minus_di
+        return {
+            "DX": dx,
+            "ADX": adx,
+            "ADXR": adxr,
+            "adx_buy_signal": np.int8(adx_trend > 0 and to_plus > 0),
+            "adx_sell_signal": np.int8(adx_trend < 0 and to_minus > 0),
+        }
 
     def _process(self) -> pd.DataFrame:
         applied_df = self._apply(df=self.series)
@@ -1,54 +1,209 @@
+from typing import TYPE_CHECKING, Dict, List
+
+import numpy as np
 import pandas as pd
 
 from ..decorator import block
+from ..kernels import KernelSumState, PandasRollingState, rolling_sum
+from .abc_process_block import max_window, sweep_windows
+
+if TYPE_CHECKING:
+    from kabutobashi.domain.services.panel import PricePanel
 
 __all__ = ["ProcessBollingerBandsBlock"]
 
 
-@block(block_name="process_bollinger_bands", series_required_columns=["close"])
+@block(
+    block_name="process_bollinger_bands",
+    series_required_columns=["close"],
+    series_output_columns=[
+        "upper_1_sigma",
+        "lower_1_sigma",
+        "upper_2_sigma",
+        "lower_2_sigma",
+        "upper_3_sigma",
+        "lower_3_sigma",
+        "over_upper_continuity",
+        "over_lower_continuity",
+        "bollinger_bands_buy_signal",
+        "bollinger_bands_sell_signal",
+    ],
+    cacheable=True,
+)
 class ProcessBollingerBandsBlock:
+    """
+    Bollinger bands of `mean + k * std` for each k in `sigmas`, named `upper_{k}_sigma` and `lower_{k}_sigma`.
+    The buy and sell signals are the points where `close` is over the band of `signal_sigma`.
+
+    A sweep of the windows is computed at once when `band_term` is a list,
+    and all the columns are then suffixed by `_{band_term}`, such as `upper_2_sigma_20`.
+
+    Args:
+        band_term (int | list): window of the rolling mean and std
+        continuity_term (int): window to count the points over the band
+        sigmas (tuple): levels of the bands
+        signal_sigma (float): level of the band for the signals
+    """
+
     series: pd.DataFrame
     band_term: int = 12
     continuity_term: int = 10
+    sigmas: tuple = (1, 2, 3)
+    signal_sigma: float = 2
+
+    @staticmethod
+    def _band_name(side: str, sigma: float) -> str:
+        return f"{side}_{sigma:g}_sigma"
 
     def _apply(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.assign(mean=df["close"].rolling(self.band_term).mean(), std=df["close"].rolling(self.band_term).std())
-        df = df.assign(
-            upper_1_sigma=df.apply(lambda x: x["mean"] + x["std"] * 1, axis=1),
-            lower_1_sigma=df.apply(lambda x: x["mean"] - x["std"] * 1, axis=1),
-            upper_2_sigma=df.apply(lambda x: x["mean"] + x["std"] * 2, axis=1),
-            lower_2_sigma=df.apply(lambda x: x["mean"] - x["std"] * 2, axis=1),
-            upper_3_sigma=df.apply(lambda x: x["mean"] + x["std"] * 3, axis=1),
-            lower_3_sigma=df.apply(lambda x: x["mean"] - x["std"] * 3, axis=1),
-        )
-        return df
+        # pandas is kept for the bands, since its rounding of the variance differs from the kernels
+        rolling = df["close"].rolling(self.band_term)
+        mean = rolling.mean().to_numpy()
+        std = rolling.std().to_numpy()
+        # (rows, sigmas) at once
+        sigmas = np.asarray(list(self.sigmas), dtype=np.float64)
+        upper = mean[:, None] + std[:, None] * sigmas
+        lower = mean[:, None] - std[:, None] * sigmas
+        data = {}
+        for idx, sigma in enumerate(self.sigmas):
+            data[self._band_name("upper", sigma)] = upper[:, idx]
+            data[self._band_name("lower", sigma)] = lower[:, idx]
+        return df.assign(mean=mean, std=std, **data)
 
     def _signal(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.assign(
-            over_upper=df.apply(lambda x: 1 if x["close"] > x["upper_2_sigma"] else 0, axis=1),
-            over_lower=df.apply(lambda x: 1 if x["close"] < x["lower_2_sigma"] else 0, axis=1),
-            over_upper_continuity=lambda x: x["over_upper"].rolling(self.continuity_term).sum(),
-            over_lower_continuity=lambda x: x["over_lower"].rolling(self.continuity_term).sum(),
+        close = df["close"].to_numpy()
+        mean = df["mean"].to_numpy()
+        std = df["std"].to_numpy()
+        # NaN is not over the band
+        over_upper = close > mean + std * self.signal_sigma
+        over_lower = close < mean - std * self.signal_sigma
+        return df.assign(
+            over_upper_continuity=rolling_sum(over_upper, self.continuity_term),
+            over_lower_continuity=rolling_sum(over_lower, self.continuity_term),
+            bollinger_bands_buy_signal=over_upper.astype(np.int8),
+            bollinger_bands_sell_signal=over_lower.astype(np.int8),
         )
 
-        df["bollinger_bands_buy_signal"] = df["over_upper"].apply(lambda x: 1 if x > 0 else 0)
-        df["bollinger_bands_sell_signal"] = df["over_lower"].apply(lambda x: 1 if x > 0 else 0)
-        return df
+    def _sweep(self, combinations: List[Dict[str, int]]) -> pd.DataFrame:
+        close = self.series["close"]
+        terms = list(dict.fromkeys([c["band_term"] for c in combinations]))
+        # pandas is kept for the bands, as `_apply()`
+        rollings = [close.rolling(term) for term in terms]
+        mean = np.column_stack([rolling.mean().to_numpy() for rolling in rollings])
+        std = np.column_stack([rolling.std().to_numpy() for rolling in rollings])
+        # (rows, terms) at once
+        values = close.to_numpy(dtype=np.float64)[:, None]
+        over_upper = values > mean + std * self.signal_sigma
+        over_lower = values < mean - std * self.signal_sigma
+        over_upper_continuity = rolling_sum(over_upper, self.continuity_term)
+        over_lower_continuity = rolling_sum(over_lower, self.continuity_term)
+        data = {}
+        for idx, term in enumerate(terms):
+            for sigma in self.sigmas:
+                data[f"{self._band_name('upper', sigma)}_{term}"] = mean[:, idx] + std[:, idx] * sigma
+                data[f"{self._band_name('lower', sigma)}_{term}"] = mean[:, idx] - std[:, idx] * sigma
+            data[f"over_upper_continuity_{term}"] = over_upper_continuity[:, idx]
+            data[f"over_lower_continuity_{term}"] = over_lower_continuity[:, idx]
+            data[f"bollinger_bands_buy_signal_{term}"] = over_upper[:, idx].astype(np.int8)
+            data[f"bollinger_bands_sell_signal_{term}"] = over_lower[:, idx].astype(np.int8)
+        return pd.DataFrame(data, index=self.series.index)
 
-    def _process(self) -> pd.DataFrame:
+    @classmethod
+    def _series_output_columns(cls, params: dict) -> List[str]:
+        columns = []
+        for sigma in params["sigmas"]:
+            columns.extend([cls._band_name("upper", sigma), cls._band_name("lower", sigma)])
+        columns.extend(
+            [
+                "over_upper_continuity",
+                "over_lower_continuity",
+                "bollinger_bands_buy_signal",
+                "bollinger_bands_sell_signal",
+            ]
+        )
+        combinations = sweep_windows(band_term=params["band_term"])
+        if combinations is None:
+            return columns
+        terms = dict.fromkeys([c["band_term"] for c in combinations])
+        return [f"{column}_{term}" for term in terms for column in columns]
 
+    @classmethod
+    def _process_panel(cls, panel: "PricePanel", params: dict) -> Dict[str, np.ndarray]:
+        if sweep_windows(band_term=params["band_term"]) is not None:
+            raise ValueError("a sweep of the windows is not supported by the panel")
+        close = panel["close"]
+        # pandas computes each column as a series
+        rolling = pd.DataFrame(close).rolling(params["band_term"])
+        mean = rolling.mean().to_numpy()
+        std = rolling.std().to_numpy()
+        outputs = {}
+        for sigma in params["sigmas"]:
+            outputs[cls._band_name("upper", sigma)] = mean + std * sigma
+            outputs[cls._band_name("lower", sigma)] = mean - std * sigma
+        over_upper = close > mean + std * params["signal_sigma"]
+        over_lower = close < mean - std * params["signal_sigma"]
+        outputs.update(
+            {
+                "over_upper_continuity": rolling_sum(over_upper, params["continuity_term"]),
+                "over_lower_continuity": rolling_sum(over_lower, params["continuity_term"]),
+                "bollinger_bands_buy_signal": over_upper.astype(np.int8),
+                "bollinger_bands_sell_signal": over_lower.astype(np.int8),
+            }
+        )
+        return outputs
+
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # the window of the bands, and that of the continuity over the bands
+        return rows + max_window(params["band_term"]) - 1 + params["continuity_term"] - 1
+
+    @classmethod
+    def _incremental_state(cls, params: dict) -> dict:
+        if sweep_windows(band_term=params["band_term"]) is not None:
+            raise ValueError("a sweep of the windows is not supported by the incremental update")
+        return {
+            "mean": PandasRollingState(params["band_term"], "mean"),
+            "std": PandasRollingState(params["band_term"], "std"),
+            "over_upper_continuity": KernelSumState(params["continuity_term"]),
+            "over_lower_continuity": KernelSumState(params["continuity_term"]),
+        }
+
+    @classmethod
+    def _process_incremental(cls, state: dict, bar: Dict[str, float], params: dict) -> Dict[str, float]:
+        close = np.float64(bar["close"])
+        mean = state["mean"].update(close)
+        std = state["std"].update(close)
+        outputs = {}
+        for sigma in params["sigmas"]:
+            outputs[cls._band_name("upper", sigma)] = mean + std * np.float64(sigma)
+            outputs[cls._band_name("lower", sigma)] = mean - std * np.float64(sigma)
+        over_upper = close > mean + std * params["signal_sigma"]
+        over_lower = close < mean - std * params["signal_sigma"]
+        outputs.update(
+            {
+                "over_upper_continuity": state["over_upper_continuity"].sum(float(over_upper)),
+                "over_lower_continuity": state["over_lower_continuity"].sum(float(over_lower)),
+                "bollinger_bands_buy_signal": np.int8(over_upper),
+                "bollinger_bands_sell_signal": np.int8(over_lower),
+            }
+        )
+        return outputs
+
+    def _process(self) -> pd.DataFrame:
+        combinations = sweep_windows(band_term=self.band_term)
+        if combinations is not None:
+            return self._sweep(combinations=combinations)
         applied_df = self._apply(df=self.series)
         signal_df = self._signal(df=applied_df)
-        required_columns = [
-            "upper_1_sigma",
-            "lower_1_sigma",
-            "upper_2_sigma",
-            "lower_2_sigma",
-            "upper_3_sigma",
-            "lower_3_sigma",
-            "over_upper_continuity",
-            "over_lower_continuity",
-            "bollinger_bands_buy_signal",
-            "bollinger_bands_sell_signal",
-        ]
+        required_columns = []
+        for sigma in self.sigmas:
+            required_columns.extend([self._band_name("upper", sigma), self._band_name("lower", sigma)])
+        required_columns.extend(
+            [
+                "over_upper_continuity",
+                "over_lower_continuity",
+                "bollinger_bands_buy_signal",
+                "bollinger_bands_sell_signal",
+            ]
+        )
         return signal_df[required_columns]
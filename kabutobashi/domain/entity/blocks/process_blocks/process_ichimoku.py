@@ -1,11 +1,23 @@
+from typing import TYPE_CHECKING, Dict
+
+import numpy as np
 import pandas as pd
 
 from ..decorator import block
+from ..kernels import KernelExtremumState, ShiftState, shift
+
+if TYPE_CHECKING:
+    from kabutobashi.domain.services.panel import PricePanel
 
 __all__ = ["ProcessIchimokuBlock"]
 
 
-@block(block_name="process_ichimoku", series_required_columns=["high", "low", "close"])
+@block(
+    block_name="process_ichimoku",
+    series_required_columns=["high", "low", "close"],
+    series_output_columns=["line_change", "line_base", "proceeding_span_1", "proceeding_span_2", "delayed_span"],
+    cacheable=True,
+)
 class ProcessIchimokuBlock:
     """
 
@@ -19,16 +31,17 @@ class ProcessIchimokuBlock:
     long_term: int = 52
 
     def _apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        close = df["close"]
         df = df.assign(
             # 短期の線
-            short_max=lambda x: x["close"].rolling(self.short_term).max(),
-            short_min=lambda x: x["close"].rolling(self.short_term).min(),
+            short_max=self._feature(close, "rolling_max", self.short_term),
+            short_min=self._feature(close, "rolling_min", self.short_term),
             # 中期の線
-            medium_max=lambda x: x["close"].rolling(self.medium_term).max(),
-            medium_min=lambda x: x["close"].rolling(self.medium_term).min(),
+            medium_max=self._feature(close, "rolling_max", self.medium_term),
+            medium_min=self._feature(close, "rolling_min", self.medium_term),
             # 長期線
-            long_max=lambda x: x["close"].rolling(self.long_term).max(),
-            long_min=lambda x: x["close"].rolling(self.long_term).min(),
+            long_max=self._feature(close, "rolling_max", self.long_term),
+            long_min=self._feature(close, "rolling_min", self.long_term),
         )
 
         # 指標の計算
@@ -51,6 +64,50 @@ class ProcessIchimokuBlock:
     def _signal(self, df: pd.DataFrame) -> pd.DataFrame:
         return df
 
+    @classmethod
+    def _process_panel(cls, panel: "PricePanel", params: dict) -> Dict[str, np.ndarray]:
+        close = panel.kernel("close")
+        line_change = (close.max(params["short_term"]) + close.min(params["short_term"])) / 2
+        line_base = (close.max(params["medium_term"]) + close.min(params["medium_term"])) / 2
+        proceeding_span_1 = (line_change + line_base) / 2
+        proceeding_span_2 = (close.max(params["long_term"]) + close.min(params["long_term"])) / 2
+        return {
+            "line_change": line_change,
+            "line_base": line_base,
+            "proceeding_span_1": shift(proceeding_span_1, 26),
+            "proceeding_span_2": shift(proceeding_span_2, 26),
+            "delayed_span": shift(panel["close"], 26),
+        }
+
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # the shift of 26, and the longest window
+        return rows + 26 + max(params["short_term"], params["medium_term"], params["long_term"]) - 1
+
+    @classmethod
+    def _incremental_state(cls, params: dict) -> dict:
+        state = {}
+        for name in ["short", "medium", "long"]:
+            state[f"{name}_max"] = KernelExtremumState(params[f"{name}_term"], is_max=True)
+            state[f"{name}_min"] = KernelExtremumState(params[f"{name}_term"], is_max=False)
+        for name in ["proceeding_span_1", "proceeding_span_2", "delayed_span"]:
+            state[name] = ShiftState(26)
+        return state
+
+    @classmethod
+    def _process_incremental(cls, state: dict, bar: Dict[str, float], params: dict) -> Dict[str, float]:
+        close = np.float64(bar["close"])
+        line_change = (state["short_max"].update(close) + state["short_min"].update(close)) / 2
+        line_base = (state["medium_max"].update(close) + state["medium_min"].update(close)) / 2
+        proceeding_span_2 = (state["long_max"].update(close) + state["long_min"].update(close)) / 2
+        return {
+            "line_change": line_change,
+            "line_base": line_base,
+            "proceeding_span_1": np.float64(state["proceeding_span_1"].update((line_change + line_base) / 2)),
+            "proceeding_span_2": np.float64(state["proceeding_span_2"].update(proceeding_span_2)),
+            "delayed_span": np.float64(state["delayed_span"].update(close)),
+        }
+
     def _process(self) -> pd.DataFrame:
         applied_df = self._apply(df=self.series)
         signal_df = self._signal(df=applied_df)
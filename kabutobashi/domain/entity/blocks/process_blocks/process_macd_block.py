@@ -1,13 +1,46 @@
+from typing import TYPE_CHECKING, Dict, List
+
+import numpy as np
 import pandas as pd
 
 from ..decorator import block
-from .abc_process_block import cross
+from ..kernels import EwmMeanState, ewm_warmup
+from .abc_process_block import cross, cross_point, cross_signals, max_window, sweep_windows
+
+if TYPE_CHECKING:
+    from kabutobashi.domain.services.panel import PricePanel
 
 __all__ = ["ProcessMacdBlock"]
 
 
-@block(block_name="process_macd", series_required_columns=["close"])
+@block(
+    block_name="process_macd",
+    series_required_columns=["close"],
+    series_output_columns=[
+        "ema_short",
+        "ema_long",
+        "macd",
+        "signal",
+        "histogram",
+        "macd_buy_signal",
+        "macd_sell_signal",
+    ],
+    cacheable=True,
+)
 class ProcessMacdBlock:
+    """
+    MACD of `close`, and the signals where the histogram crosses 0.
+
+    A sweep of the windows is computed at once when the terms are lists, which are zipped as `sweep_windows()`.
+    The EMAs are then named `ema_short_{term}` and `ema_long_{term}`, and the other columns are suffixed by
+    `_{short_term}_{long_term}_{macd_span}`, such as `histogram_12_26_9`.
+
+    Args:
+        short_term (int | list):
+        long_term (int | list):
+        macd_span (int | list):
+    """
+
     series: pd.DataFrame
     short_term: int = 12
     long_term: int = 26
@@ -16,8 +49,8 @@ class ProcessMacdBlock:
     def _apply(self, df: pd.DataFrame) -> pd.DataFrame:
         df = df.assign(
             # MACDの計算
-            ema_short=lambda x: x["close"].ewm(span=self.short_term).mean(),
-            ema_long=lambda x: x["close"].ewm(span=self.long_term).mean(),
+            ema_short=self._feature(df["close"], "ewm_mean", self.short_term),
+            ema_long=self._feature(df["close"], "ewm_mean", self.long_term),
             macd=lambda x: x["ema_short"] - x["ema_long"],
             signal=lambda x: x["macd"].ewm(span=self.macd_span).mean(),
             # ヒストグラム値
@@ -27,11 +60,110 @@ class ProcessMacdBlock:
 
     def _signal(self, df: pd.DataFrame) -> pd.DataFrame:
         # 正負が交差した点
-        df = df.join(cross(df["histogram"]))
-        df = df.rename(columns={"to_plus": "macd_buy_signal", "to_minus": "macd_sell_signal"})
-        return df
+        return df.join(cross(df["histogram"], to_plus_name="macd_buy_signal", to_minus_name="macd_sell_signal"))
+
+    def _sweep(self, combinations: List[Dict[str, int]]) -> pd.DataFrame:
+        close = self.series["close"]
+        data = {}
+        for combination in combinations:
+            for name in ["short", "long"]:
+                term = combination[f"{name}_term"]
+                if f"ema_{name}_{term}" not in data:
+                    data[f"ema_{name}_{term}"] = self._feature(close, "ewm_mean", term)
+        keys = list(dict.fromkeys([(c["short_term"], c["long_term"], c["macd_span"]) for c in combinations]))
+        # (rows, keys) at once
+        macd = np.column_stack([data[f"ema_short_{short}"] - data[f"ema_long_{long}"] for short, long, _ in keys])
+        signal = np.empty_like(macd)
+        for span in dict.fromkeys([k[2] for k in keys]):
+            idx = [i for i, k in enumerate(keys) if k[2] == span]
+            signal[:, idx] = pd.DataFrame(macd[:, idx]).ewm(span=span).mean().to_numpy()
+        histogram = macd - signal
+        macd_buy_signal, macd_sell_signal = cross_signals(histogram)
+        for idx, (short, long, span) in enumerate(keys):
+            suffix = f"{short}_{long}_{span}"
+            data[f"macd_{suffix}"] = macd[:, idx]
+            data[f"signal_{suffix}"] = signal[:, idx]
+            data[f"histogram_{suffix}"] = histogram[:, idx]
+            data[f"macd_buy_signal_{suffix}"] = macd_buy_signal[:, idx]
+            data[f"macd_sell_signal_{suffix}"] = macd_sell_signal[:, idx]
+        return pd.DataFrame(data, index=self.series.index)
+
+    @classmethod
+    def _series_output_columns(cls, params: dict) -> List[str]:
+        combinations = sweep_windows(**{k: params[k] for k in ["short_term", "long_term", "macd_span"]})
+        if combinations is None:
+            return cls.series_output_columns
+        columns = []
+        for combination in combinations:
+            columns.extend([f"ema_{name}_{combination[f'{name}_term']}" for name in ["short", "long"]])
+            suffix = f"{combination['short_term']}_{combination['long_term']}_{combination['macd_span']}"
+            for name in ["macd", "signal", "histogram", "macd_buy_signal", "macd_sell_signal"]:
+                columns.append(f"{name}_{suffix}")
+        return list(dict.fromkeys(columns))
+
+    @classmethod
+    def _process_panel(cls, panel: "PricePanel", params: dict) -> Dict[str, np.ndarray]:
+        if sweep_windows(**{k: params[k] for k in ["short_term", "long_term", "macd_span"]}) is not None:
+            raise ValueError("a sweep of the windows is not supported by the panel")
+        # pandas computes each column as a series
+        close = pd.DataFrame(panel["close"])
+        ema_short = close.ewm(span=params["short_term"]).mean().to_numpy()
+        ema_long = close.ewm(span=params["long_term"]).mean().to_numpy()
+        macd = ema_short - ema_long
+        signal = pd.DataFrame(macd).ewm(span=params["macd_span"]).mean().to_numpy()
+        histogram = macd - signal
+        macd_buy_signal, macd_sell_signal = cross_signals(histogram)
+        return {
+            "ema_short": ema_short,
+            "ema_long": ema_long,
+            "macd": macd,
+            "signal": signal,
+            "histogram": histogram,
+            "macd_buy_signal": macd_buy_signal,
+            "macd_sell_signal": macd_sell_signal,
+        }
+
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # the warm-up of the EMAs, that of the signal over the MACD, and the previous row of the cross signals
+        ema_warmup = ewm_warmup(max_window(params["short_term"], params["long_term"]), tolerance=ewm_tolerance)
+        signal_warmup = ewm_warmup(max_window(params["macd_span"]), tolerance=ewm_tolerance)
+        return rows + ema_warmup + signal_warmup
+
+    @classmethod
+    def _incremental_state(cls, params: dict) -> dict:
+        if sweep_windows(**{k: params[k] for k in ["short_term", "long_term", "macd_span"]}) is not None:
+            raise ValueError("a sweep of the windows is not supported by the incremental update")
+        return {
+            "ema_short": EwmMeanState(params["short_term"]),
+            "ema_long": EwmMeanState(params["long_term"]),
+            "signal": EwmMeanState(params["macd_span"]),
+            "histogram": np.nan,
+        }
+
+    @classmethod
+    def _process_incremental(cls, state: dict, bar: Dict[str, float], params: dict) -> Dict[str, float]:
+        ema_short = state["ema_short"].update(bar["close"])
+        ema_long = state["ema_long"].update(bar["close"])
+        macd = ema_short - ema_long
+        signal = state["signal"].update(macd)
+        histogram = macd - signal
+        macd_buy_signal, macd_sell_signal = cross_point(histogram, state["histogram"])
+        state["histogram"] = histogram
+        return {
+            "ema_short": ema_short,
+            "ema_long": ema_long,
+            "macd": macd,
+            "signal": signal,
+            "histogram": histogram,
+            "macd_buy_signal": macd_buy_signal,
+            "macd_sell_signal": macd_sell_signal,
+        }
 
     def _process(self) -> pd.DataFrame:
+        combinations = sweep_windows(short_term=self.short_term, long_term=self.long_term, macd_span=self.macd_span)
+        if combinations is not None:
+            return self._sweep(combinations=combinations)
         applied_df = self._apply(df=self.series)
         signal_df = self._signal(df=applied_df)
         return signal_df[
@@ -1,10 +1,22 @@
+from typing import TYPE_CHECKING, Dict
+
+import numpy as np
 import pandas as pd
 
 from ..decorator import block
-from .abc_process_block import cross
+from ..kernels import PandasRollingState, ShiftState, shift
+from .abc_process_block import cross, cross_point, cross_signals
+
+if TYPE_CHECKING:
+    from kabutobashi.domain.services.panel import PricePanel
 
 
-@block(block_name="process_momentum", series_required_columns=["close"])
+@block(
+    block_name="process_momentum",
+    series_required_columns=["close"],
+    series_output_columns=["momentum", "sma_momentum", "momentum_buy_signal", "momentum_sell_signal"],
+    cacheable=True,
+)
 class ProcessMomentumBlock:
     series: pd.DataFrame
     term: int = 12
@@ -12,15 +24,55 @@ class ProcessMomentumBlock:
     def _apply(self, df: pd.DataFrame) -> pd.DataFrame:
 
         df = df.assign(
-            momentum=df["close"].shift(10),
+            momentum=self._feature(df["close"], "shift", 10),
         ).fillna(0)
         df = df.assign(sma_momentum=lambda x: x["momentum"].rolling(self.term).mean())
         return df
 
     def _signal(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.join(cross(df["sma_momentum"]))
-        df = df.rename(columns={"to_plus": "momentum_buy_signal", "to_minus": "momentum_sell_signal"})
-        return df
+        return df.join(
+            cross(df["sma_momentum"], to_plus_name="momentum_buy_signal", to_minus_name="momentum_sell_signal")
+        )
+
+    @classmethod
+    def _process_panel(cls, panel: "PricePanel", params: dict) -> Dict[str, np.ndarray]:
+        momentum = shift(panel["close"], 10, fill_value=0)
+        sma_momentum = pd.DataFrame(momentum).rolling(params["term"]).mean().to_numpy()
+        momentum_buy_signal, momentum_sell_signal = cross_signals(sma_momentum)
+        return {
+            "momentum": momentum,
+            "sma_momentum": sma_momentum,
+            "momentum_buy_signal": momentum_buy_signal,
+            "momentum_sell_signal": momentum_sell_signal,
+        }
+
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # the shift of 10, the window, and the previous row of the cross signals
+        return rows + 10 + params["term"]
+
+    @classmethod
+    def _incremental_state(cls, params: dict) -> dict:
+        return {
+            "momentum": ShiftState(10, fill_value=0.0),
+            "sma_momentum": PandasRollingState(params["term"], "mean"),
+            "prev_sma_momentum": np.nan,
+        }
+
+    @classmethod
+    def _process_incremental(cls, state: dict, bar: Dict[str, float], params: dict) -> Dict[str, float]:
+        momentum = np.float64(state["momentum"].update(bar["close"]))
+        # NaN are filled with 0, as `_apply()`
+        momentum = np.float64(0.0) if np.isnan(momentum) else momentum
+        sma_momentum = state["sma_momentum"].update(momentum)
+        momentum_buy_signal, momentum_sell_signal = cross_point(sma_momentum, state["prev_sma_momentum"])
+        state["prev_sma_momentum"] = sma_momentum
+        return {
+            "momentum": momentum,
+            "sma_momentum": sma_momentum,
+            "momentum_buy_signal": momentum_buy_signal,
+            "momentum_sell_signal": momentum_sell_signal,
+        }
 
     def _process(self) -> pd.DataFrame:
 
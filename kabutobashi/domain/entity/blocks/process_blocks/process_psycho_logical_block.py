@@ -1,9 +1,27 @@
+from typing import TYPE_CHECKING, Dict
+
+import numpy as np
 import pandas as pd
 
 from ..decorator import block
+from ..kernels import KernelSumState, ShiftState, rolling_sum, shift
+
+if TYPE_CHECKING:
+    from kabutobashi.domain.services.panel import PricePanel
 
 
-@block(block_name="process_psycho_logical", series_required_columns=["close"])
+@block(
+    block_name="process_psycho_logical",
+    series_required_columns=["close"],
+    series_output_columns=[
+        "psycho_line",
+        "bought_too_much",
+        "sold_too_much",
+        "psycho_logical_buy_signal",
+        "psycho_logical_sell_signal",
+    ],
+    cacheable=True,
+)
 class ProcessPsychoLogicalBlock:
     series: pd.DataFrame
     psycho_term: int = 12
@@ -11,25 +29,82 @@ class ProcessPsychoLogicalBlock:
     lower_threshold: float = 0.25
 
     def _apply(self, df: pd.DataFrame) -> pd.DataFrame:
-        df_ = df.copy()
-        df_["shift_close"] = df_["close"].shift(1)
-        df_ = df_.fillna(0)
-        df_["diff"] = df_.apply(lambda x: x["close"] - x["shift_close"], axis=1)
+        outputs = self._psycho_logical(
+            close=df["close"].to_numpy(dtype=np.float64),
+            shift_close=self._feature(df["close"], "shift", 1),
+            psycho_term=self.psycho_term,
+            upper_threshold=self.upper_threshold,
+            lower_threshold=self.lower_threshold,
+        )
+        return pd.DataFrame(outputs, index=df.index)
 
-        df_["is_raise"] = df_["diff"].apply(lambda x: 1 if x > 0 else 0)
+    @staticmethod
+    def _psycho_logical(
+        close: np.ndarray, shift_close: np.ndarray, psycho_term: int, upper_threshold: float, lower_threshold: float
+    ) -> Dict[str, np.ndarray]:
+        """
+        Args:
+            close: 1-D array, or 2-D array whose columns are series
+            shift_close: the close of the previous day
 
-        df_["psycho_sum"] = df_["is_raise"].rolling(self.psycho_term).sum()
-        df_["psycho_line"] = df_["psycho_sum"].apply(lambda x: x / self.psycho_term)
-
-        df_["bought_too_much"] = df_["psycho_line"].apply(lambda x: 1 if x > self.upper_threshold else 0)
-        df_["sold_too_much"] = df_["psycho_line"].apply(lambda x: 1 if x < self.lower_threshold else 0)
-        return df_
+        Returns:
+            `psycho_line`, `bought_too_much` and `sold_too_much` of the same shape as `close`
+        """
+        # NaN are filled with 0 before the diff
+        diff = np.where(np.isnan(close), 0, close) - np.where(np.isnan(shift_close), 0, shift_close)
+        is_raise = (diff > 0).astype(np.int64)
+        psycho_line = rolling_sum(is_raise, psycho_term) / psycho_term
+        return {
+            "psycho_line": psycho_line,
+            "bought_too_much": (psycho_line > upper_threshold).astype(np.int64),
+            "sold_too_much": (psycho_line < lower_threshold).astype(np.int64),
+        }
 
     def _signal(self, df: pd.DataFrame) -> pd.DataFrame:
         df["psycho_logical_buy_signal"] = df["sold_too_much"]
         df["psycho_logical_sell_signal"] = df["bought_too_much"]
         return df
 
+    @classmethod
+    def _process_panel(cls, panel: "PricePanel", params: dict) -> Dict[str, np.ndarray]:
+        close = panel["close"]
+        outputs = cls._psycho_logical(
+            close=close,
+            shift_close=shift(close, 1),
+            psycho_term=params["psycho_term"],
+            upper_threshold=params["upper_threshold"],
+            lower_threshold=params["lower_threshold"],
+        )
+        outputs["psycho_logical_buy_signal"] = outputs["sold_too_much"]
+        outputs["psycho_logical_sell_signal"] = outputs["bought_too_much"]
+        return outputs
+
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # the previous close, and the window
+        return rows + params["psycho_term"]
+
+    @classmethod
+    def _incremental_state(cls, params: dict) -> dict:
+        return {"shift_close": ShiftState(1), "is_raise": KernelSumState(params["psycho_term"])}
+
+    @classmethod
+    def _process_incremental(cls, state: dict, bar: Dict[str, float], params: dict) -> Dict[str, float]:
+        close = np.float64(bar["close"])
+        shift_close = np.float64(state["shift_close"].update(close))
+        # NaN are filled with 0 before the diff, as `_psycho_logical()`
+        diff = (0.0 if np.isnan(close) else close) - (0.0 if np.isnan(shift_close) else shift_close)
+        psycho_line = state["is_raise"].sum(float(diff > 0)) / params["psycho_term"]
+        bought_too_much = np.int64(psycho_line > params["upper_threshold"])
+        sold_too_much = np.int64(psycho_line < params["lower_threshold"])
+        return {
+            "psycho_line": psycho_line,
+            "bought_too_much": bought_too_much,
+            "sold_too_much": sold_too_much,
+            "psycho_logical_buy_signal": sold_too_much,
+            "psycho_logical_sell_signal": bought_too_much,
+        }
+
     def _process(self) -> pd.DataFrame:
 
         applied_df = self._apply(df=self.series)
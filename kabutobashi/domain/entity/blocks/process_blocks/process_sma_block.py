@@ -1,35 +1,140 @@
+from typing import TYPE_CHECKING, Dict, List
+
+import numpy as np
 import pandas as pd
 
 from ..decorator import block
-from .abc_process_block import cross
+from ..kernels import KernelSumState
+from .abc_process_block import cross, cross_point, cross_signals, max_window, sweep_windows
+
+if TYPE_CHECKING:
+    from kabutobashi.domain.services.panel import PricePanel
 
 __all__ = ["ProcessSmaBlock"]
 
 
-@block(block_name="process_sma", series_required_columns=["close"])
+@block(
+    block_name="process_sma",
+    series_required_columns=["close"],
+    series_output_columns=["sma_short", "sma_medium", "sma_long", "sma_buy_signal", "sma_sell_signal"],
+    cacheable=True,
+)
 class ProcessSmaBlock:
+    """
+    Simple moving averages of `close`, and the signals where the short one crosses the long one.
+
+    A sweep of the windows is computed at once when the terms are lists, which are zipped as `sweep_windows()`.
+    The averages are then named `sma_short_{term}`, `sma_medium_{term}` and `sma_long_{term}`,
+    and the signals `sma_buy_signal_{short_term}_{long_term}` and `sma_sell_signal_{short_term}_{long_term}`.
+
+    Args:
+        short_term (int | list):
+        medium_term (int | list):
+        long_term (int | list):
+    """
+
     series: pd.DataFrame
     short_term: int = 5
     medium_term: int = 21
     long_term: int = 70
 
     def _apply(self, df: pd.DataFrame) -> pd.DataFrame:
-
-        df = df.assign(
-            sma_short=df["close"].rolling(self.short_term).mean(),
-            sma_medium=df["close"].rolling(self.medium_term).mean(),
-            sma_long=df["close"].rolling(self.long_term).mean(),
+        return pd.DataFrame(
+            {
+                "sma_short": self._feature(df["close"], "rolling_mean", self.short_term),
+                "sma_medium": self._feature(df["close"], "rolling_mean", self.medium_term),
+                "sma_long": self._feature(df["close"], "rolling_mean", self.long_term),
+            },
+            index=df.index,
         )
-        return df
 
     def _signal(self, df: pd.DataFrame) -> pd.DataFrame:
-        df["diff"] = df.apply(lambda x: x["sma_long"] - x["sma_short"], axis=1)
+        diff = df["sma_long"] - df["sma_short"]
         # 正負が交差した点
-        df = df.join(cross(df["diff"]))
-        df = df.rename(columns={"to_plus": "sma_buy_signal", "to_minus": "sma_sell_signal"})
-        return df
+        return df.join(cross(diff, to_plus_name="sma_buy_signal", to_minus_name="sma_sell_signal"))
+
+    def _sweep(self, combinations: List[Dict[str, int]]) -> pd.DataFrame:
+        close = self.series["close"]
+        data = {}
+        for combination in combinations:
+            for name in ["short", "medium", "long"]:
+                term = combination[f"{name}_term"]
+                if f"sma_{name}_{term}" not in data:
+                    data[f"sma_{name}_{term}"] = self._feature(close, "rolling_mean", term)
+        pairs = list(dict.fromkeys([(c["short_term"], c["long_term"]) for c in combinations]))
+        # (rows, pairs) at once
+        diff = np.column_stack([data[f"sma_long_{long}"] - data[f"sma_short_{short}"] for short, long in pairs])
+        sma_buy_signal, sma_sell_signal = cross_signals(diff)
+        for idx, (short, long) in enumerate(pairs):
+            data[f"sma_buy_signal_{short}_{long}"] = sma_buy_signal[:, idx]
+            data[f"sma_sell_signal_{short}_{long}"] = sma_sell_signal[:, idx]
+        return pd.DataFrame(data, index=self.series.index)
+
+    @classmethod
+    def _series_output_columns(cls, params: dict) -> List[str]:
+        combinations = sweep_windows(**{k: params[k] for k in ["short_term", "medium_term", "long_term"]})
+        if combinations is None:
+            return cls.series_output_columns
+        columns = []
+        for combination in combinations:
+            columns.extend([f"sma_{name}_{combination[f'{name}_term']}" for name in ["short", "medium", "long"]])
+            suffix = f"{combination['short_term']}_{combination['long_term']}"
+            columns.extend([f"sma_buy_signal_{suffix}", f"sma_sell_signal_{suffix}"])
+        return list(dict.fromkeys(columns))
+
+    @classmethod
+    def _process_panel(cls, panel: "PricePanel", params: dict) -> Dict[str, np.ndarray]:
+        if sweep_windows(**{k: params[k] for k in ["short_term", "medium_term", "long_term"]}) is not None:
+            raise ValueError("a sweep of the windows is not supported by the panel")
+        close = panel.kernel("close")
+        sma_short = close.mean(params["short_term"])
+        sma_medium = close.mean(params["medium_term"])
+        sma_long = close.mean(params["long_term"])
+        sma_buy_signal, sma_sell_signal = cross_signals(sma_long - sma_short)
+        return {
+            "sma_short": sma_short,
+            "sma_medium": sma_medium,
+            "sma_long": sma_long,
+            "sma_buy_signal": sma_buy_signal,
+            "sma_sell_signal": sma_sell_signal,
+        }
+
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # the window, and the previous row of the cross signals
+        return rows + max_window(params["short_term"], params["medium_term"], params["long_term"])
+
+    @classmethod
+    def _incremental_state(cls, params: dict) -> dict:
+        if sweep_windows(**{k: params[k] for k in ["short_term", "medium_term", "long_term"]}) is not None:
+            raise ValueError("a sweep of the windows is not supported by the incremental update")
+        return {
+            "sma_short": KernelSumState(params["short_term"]),
+            "sma_medium": KernelSumState(params["medium_term"]),
+            "sma_long": KernelSumState(params["long_term"]),
+            "diff": np.nan,
+        }
+
+    @classmethod
+    def _process_incremental(cls, state: dict, bar: Dict[str, float], params: dict) -> Dict[str, float]:
+        sma_short = state["sma_short"].mean(bar["close"])
+        sma_medium = state["sma_medium"].mean(bar["close"])
+        sma_long = state["sma_long"].mean(bar["close"])
+        diff = sma_long - sma_short
+        sma_buy_signal, sma_sell_signal = cross_point(diff, state["diff"])
+        state["diff"] = diff
+        return {
+            "sma_short": sma_short,
+            "sma_medium": sma_medium,
+            "sma_long": sma_long,
+            "sma_buy_signal": sma_buy_signal,
+            "sma_sell_signal": sma_sell_signal,
+        }
 
     def _process(self) -> pd.DataFrame:
+        combinations = sweep_windows(short_term=self.short_term, medium_term=self.medium_term, long_term=self.long_term)
+        if combinations is not None:
+            return self._sweep(combinations=combinations)
         applied_df = self._apply(df=self.series)
         signal_df = self._signal(df=applied_df)
         return signal_df[["sma_short", "sma_medium", "sma_long", "sma_buy_signal", "sma_sell_signal"]]
@@ -1,17 +1,30 @@
 import math
+from typing import TYPE_CHECKING, Dict
 
+import numpy as np
 import pandas as pd
 
 from ..decorator import block
+from ..kernels import KernelExtremumState, PandasRollingState, get_kernel_backend, jit, shift
 
+if TYPE_CHECKING:
+    from kabutobashi.domain.services.panel import PricePanel
 
-@block(block_name="process_stochastics", series_required_columns=["close", "low", "high"])
+
+@block(
+    block_name="process_stochastics",
+    series_required_columns=["close", "low", "high"],
+    series_output_columns=["K", "D", "SD", "stochastics_buy_signal", "stochastics_sell_signal"],
+    cacheable=True,
+)
 class ProcessStochasticsBlock:
     series: pd.DataFrame
 
     def _apply(self, df: pd.DataFrame) -> pd.DataFrame:
         df_ = df.copy()
-        df_["K"] = self._fast_stochastic_k(df_["close"], df_["low"], df_["high"], 9)
+        lowest = self._feature(df_["low"], "rolling_min", 9)
+        highest = self._feature(df_["high"], "rolling_max", 9)
+        df_["K"] = self._fast_stochastic_k(df_["close"], lowest, highest)
         df_["D"] = self._fast_stochastic_d(df_["K"])
         df_["SD"] = self._slow_stochastic_d(df_["D"])
         return df_
@@ -26,17 +39,15 @@ class ProcessStochasticsBlock:
             shift_SD=lambda x: x["SD"].shift(1),
         ).fillna(0)
 
-        # 複数引数は関数を利用することで吸収
-        df["stochastics_buy_signal"] = df.apply(self._buy_signal_index_internal, axis=1)
-        df["stochastics_sell_signal"] = df.apply(self._sell_signal_index_internal, axis=1)
+        args = [df[c].to_numpy() for c in ["K", "D", "SD", "shift_K", "shift_D", "shift_SD"]]
+        df["stochastics_buy_signal"] = self._buy_signal_index(*args)
+        df["stochastics_sell_signal"] = self._sell_signal_index(*args)
         return df
 
     @staticmethod
-    def _fast_stochastic_k(close, low, high, n):
-        return (
-            (close - low.rolling(window=n, center=False).min())
-            / (high.rolling(window=n, center=False).max() - low.rolling(window=n, center=False).min())
-        ) * 100
+    def _fast_stochastic_k(close, lowest, highest):
+        # lowest and highest are the rolling min of low and max of high
+        return ((close - lowest) / (highest - lowest)) * 100
 
     @staticmethod
     def _fast_stochastic_d(stochastic_k):
@@ -49,53 +60,110 @@ class ProcessStochasticsBlock:
         return stochastic_d.rolling(window=3, center=False).mean()
 
     @staticmethod
-    def _buy_signal_index_internal(x: pd.Series) -> float:
-        return ProcessStochasticsBlock._buy_signal_index(
-            x["K"], x["D"], x["SD"], x["shift_K"], x["shift_D"], x["shift_SD"]
-        )
+    def _default_signal_index(current_k, current_d, current_sd, where: np.ndarray) -> np.ndarray:
+        # only the elements of `where`, by `math` since the last bits of `np.exp` and of the squares differ
+        default = np.zeros(where.shape)
+        default[where] = [
+            1 / math.exp(math.pow(k - 20, 2) / 100 + math.pow(d - 20, 2) / 100 + math.pow(sd - 20, 2) / 100)
+            for k, d, sd in zip(current_k[where].tolist(), current_d[where].tolist(), current_sd[where].tolist())
+        ]
+        return default
 
     @staticmethod
-    def _buy_signal_index(current_k, current_d, current_sd, prev_k, prev_d, prev_sd) -> float:
-        if (current_k > 30) | (current_d > 30) | (current_sd > 30):
-            return 0
-
-        # %K・%D共に20％以下の時に、%Kが%Dを下から上抜いた時
-        if current_k < 20 and current_d < 20:
-            if (prev_d > prev_k) and (current_d < current_k):
-                return current_k - current_d
-
-        # %D・スロー%D共に20％以下の時に、%Dがスロー%Dを下から上抜いた時
-        if current_d < 20 and current_sd < 20:
-            if (prev_sd > prev_d) and (current_sd < current_d):
-                return current_d - current_sd
-        return 1 / math.exp(
-            math.pow(current_k - 20, 2) / 100 + math.pow(current_d - 20, 2) / 100 + math.pow(current_sd - 20, 2) / 100
-        )
+    def _buy_signal_index(current_k, current_d, current_sd, prev_k, prev_d, prev_sd) -> np.ndarray:
+        """
+        Args:
+            current_k, current_d, current_sd, prev_k, prev_d, prev_sd: arrays of the same shape
 
-    @staticmethod
-    def _sell_signal_index_internal(x: pd.Series) -> float:
-        return ProcessStochasticsBlock._sell_signal_index(
-            x["K"], x["D"], x["SD"], x["shift_K"], x["shift_D"], x["shift_SD"]
-        )
+        Returns:
+            the index of each element, the conditions are evaluated in order as early returns
+        """
+        if get_kernel_backend() == "numba":
+            return jit.stochastics_signal_index(current_k, current_d, current_sd, prev_k, prev_d, prev_sd, is_buy=True)
+        out_of_range = (current_k > 30) | (current_d > 30) | (current_sd > 30)
+        condlist = [
+            out_of_range,
+            # %K・%D共に20％以下の時に、%Kが%Dを下から上抜いた時
+            (current_k < 20) & (current_d < 20) & (prev_d > prev_k) & (current_d < current_k),
+            # %D・スロー%D共に20％以下の時に、%Dがスロー%Dを下から上抜いた時
+            (current_d < 20) & (current_sd < 20) & (prev_sd > prev_d) & (current_sd < current_d),
+        ]
+        choicelist = [0.0, current_k - current_d, current_d - current_sd]
+        default = ProcessStochasticsBlock._default_signal_index(current_k, current_d, current_sd, ~out_of_range)
+        return np.select(condlist, choicelist, default=default)
 
     @staticmethod
-    def _sell_signal_index(current_k, current_d, current_sd, prev_k, prev_d, prev_sd) -> float:
-        if (current_k < 70) | (current_d < 70) | (current_sd < 70):
-            return 0
-
-        # %K・%D共に80％以上の時に、%Kが%Dを上から下抜いた時
-        if current_k > 80 and current_d > 80:
-            if (prev_d < prev_k) and (current_d > current_k):
-                return current_d - current_k
-
-        # %D・スロー%D共に80％以上の時に、%Dがスロー%Dを上から下抜いた時
-        # %D・スロー%D共に20％以下の時に、%Dがスロー%Dを下から上抜いた時
-        if current_d > 80 and current_sd > 80:
-            if (prev_sd < prev_d) and (current_sd > current_d):
-                return current_d - current_sd
-        return 1 / math.exp(
-            math.pow(current_k - 20, 2) / 100 + math.pow(current_d - 20, 2) / 100 + math.pow(current_sd - 20, 2) / 100
-        )
+    def _sell_signal_index(current_k, current_d, current_sd, prev_k, prev_d, prev_sd) -> np.ndarray:
+        """
+        Args:
+            current_k, current_d, current_sd, prev_k, prev_d, prev_sd: arrays of the same shape
+
+        Returns:
+            the index of each element, the conditions are evaluated in order as early returns
+        """
+        if get_kernel_backend() == "numba":
+            return jit.stochastics_signal_index(current_k, current_d, current_sd, prev_k, prev_d, prev_sd, is_buy=False)
+        out_of_range = (current_k < 70) | (current_d < 70) | (current_sd < 70)
+        condlist = [
+            out_of_range,
+            # %K・%D共に80％以上の時に、%Kが%Dを上から下抜いた時
+            (current_k > 80) & (current_d > 80) & (prev_d < prev_k) & (current_d > current_k),
+            # %D・スロー%D共に80％以上の時に、%Dがスロー%Dを上から下抜いた時
+            (current_d > 80) & (current_sd > 80) & (prev_sd < prev_d) & (current_sd > current_d),
+        ]
+        choicelist = [0.0, current_d - current_k, current_d - current_sd]
+        default = ProcessStochasticsBlock._default_signal_index(current_k, current_d, current_sd, ~out_of_range)
+        return np.select(condlist, choicelist, default=default)
+
+    @classmethod
+    def _process_panel(cls, panel: "PricePanel", params: dict) -> Dict[str, np.ndarray]:
+        lowest = panel.kernel("low").min(9)
+        highest = panel.kernel("high").max(9)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k = cls._fast_stochastic_k(panel["close"], lowest, highest)
+        d = pd.DataFrame(k).rolling(window=3).mean().to_numpy()
+        sd = pd.DataFrame(d).rolling(window=3).mean().to_numpy()
+        # NaN are filled with 0 before the signals, as `_signal()`
+        k, d, sd = [np.where(np.isnan(v), 0.0, v) for v in (k, d, sd)]
+        args = (k, d, sd, shift(k, 1, fill_value=0), shift(d, 1, fill_value=0), shift(sd, 1, fill_value=0))
+        buy_signal = cls._buy_signal_index(*args)
+        sell_signal = cls._sell_signal_index(*args)
+        return {"K": k, "D": d, "SD": sd, "stochastics_buy_signal": buy_signal, "stochastics_sell_signal": sell_signal}
+
+    @classmethod
+    def _lookback(cls, params: dict, rows: int, ewm_tolerance: float) -> int:
+        # the previous row of the signals, the windows of 3 of %SD and %D, and the window of 9 of %K
+        return rows + 1 + 2 + 2 + 8
+
+    @classmethod
+    def _incremental_state(cls, params: dict) -> dict:
+        return {
+            "lowest": KernelExtremumState(9, is_max=False),
+            "highest": KernelExtremumState(9, is_max=True),
+            "D": PandasRollingState(3, "mean"),
+            "SD": PandasRollingState(3, "mean"),
+            "prev": (0.0, 0.0, 0.0),
+        }
+
+    @classmethod
+    def _process_incremental(cls, state: dict, bar: Dict[str, float], params: dict) -> Dict[str, float]:
+        lowest = state["lowest"].update(bar["low"])
+        highest = state["highest"].update(bar["high"])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k = cls._fast_stochastic_k(np.float64(bar["close"]), lowest, highest)
+        d = state["D"].update(k)
+        sd = state["SD"].update(d)
+        # NaN are filled with 0 before the signals, as `_signal()`
+        current = tuple(0.0 if np.isnan(v) else v for v in (k, d, sd))
+        args = [np.array([v], dtype=np.float64) for v in current + state["prev"]]
+        state["prev"] = current
+        return {
+            "K": current[0],
+            "D": current[1],
+            "SD": current[2],
+            "stochastics_buy_signal": cls._buy_signal_index(*args)[0],
+            "stochastics_sell_signal": cls._sell_signal_index(*args)[0],
+        }
 
     def _process(self) -> pd.DataFrame:
         applied_df = self._apply(df=self.series)
@@ -13,12 +13,21 @@ DATA_PATH = f"{PACKAGE_ROOT}/data"
 
 @block(block_name="read_example")
 class ReadExampleBlock:
+    """
+    Args:
+        code (str | int):
+        lookback (int | None): if given, only the latest rows are read, as `ReadSqlite3Block`
+    """
+
     code: str | int
+    lookback: int | None = None
 
     def _process(self) -> Tuple[pd.DataFrame, dict]:
         file_name = "example.csv.gz"
         df = pd.read_csv(f"{DATA_PATH}/{file_name}")
         df = df[df["code"] == self.code]
+        if self.lookback is not None:
+            df = df.sort_values("dt").tail(self.lookback)
         df.index = df["dt"]
         return df, {"code": self.code}
 
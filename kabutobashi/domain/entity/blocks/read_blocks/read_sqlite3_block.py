@@ -9,11 +9,20 @@ from ..decorator import block
 
 @block(block_name="read_sqlite3")
 class ReadSqlite3Block:
+    """
+    Args:
+        code (str | int):
+        database_dir (str):
+        lookback (int | None): if given, only the latest rows are read, see `required_lookback()`
+    """
+
     code: str | int
     database_dir: str
+    lookback: int | None = None
 
     def _process(self) -> Tuple[pd.DataFrame, dict]:
-        df = KabutobashiDatabase(database_dir=self.database_dir).select_stock_df(code=self.code)
+        database = KabutobashiDatabase(database_dir=self.database_dir)
+        df = database.select_stock_df(code=self.code, limit=self.lookback)
         df.index = df["dt"]
         return df, {"code": self.code}
 
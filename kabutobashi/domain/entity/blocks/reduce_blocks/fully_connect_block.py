@@ -18,6 +18,9 @@ from ..decorator import block
         "psycho_logical_impact",
         "stochastics_impact",
     ],
+    series_output_columns=["code", "dt", "impact"],
+    params_output_keys=["impact"],
+    cacheable=True,
 )
 class FullyConnectBlock:
 
@@ -10,6 +10,7 @@ from ..decorator import block
     series_required_columns=["code", "dt", "name", "open", "close", "high", "low", "volume"],
     series_required_columns_mode="all",
     params_required_keys=["database_dir"],
+    params_output_keys=["status"],
 )
 class WriteStockSqlite3Block:
     series: pd.DataFrame
@@ -25,6 +26,7 @@ class WriteStockSqlite3Block:
     series_required_columns=["code", "dt", "impact"],
     series_required_columns_mode="strict",
     params_required_keys=["database_dir"],
+    params_output_keys=["status"],
 )
 class WriteImpactSqlite3Block:
     series: pd.DataFrame
@@ -40,6 +42,7 @@ class WriteImpactSqlite3Block:
     series_required_columns=["code", "name", "market", "industry_type"],
     series_required_columns_mode="strict",
     params_required_keys=["database_dir"],
+    params_output_keys=["status"],
 )
 class WriteBrandSqlite3Block:
     series: pd.DataFrame
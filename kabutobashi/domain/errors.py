@@ -11,6 +11,7 @@ class KabutobashiPageError(KabutobashiBaseError):
     """
 
     def __init__(self, url: str = ""):
+        super().__init__(url)
         self.url = url
 
     def __str__(self):
@@ -39,6 +40,7 @@ class KabutobashiBlockSeriesIsNoneError(KabutobashiBlockError):
 
 class KabutobashiBlockSeriesDtIsMissingError(KabutobashiBlockError):
     def __init__(self, code: str, dt: List[str]):
+        super().__init__(code, dt)
         self.code = code
         self.dt = dt
 
@@ -1 +1,9 @@
+from .batch import FlowBatchResult
+from .block_graph import BlockDependencyGraph
+from .checkpoint import FlowCheckpoint
 from .flow import Flow, FlowPath
+from .lookback import required_lookback
+from .plan import FlowPlan
+from .profile import FlowProfile
+from .scheduler import DagScheduler
+from .stream import FlowStreamResult
@@ -0,0 +1,92 @@
+import copy
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from logging import getLogger
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from kabutobashi.domain.entity.blocks.basis_blocks import BlockGlue
+
+__all__ = ["FlowBatchResult", "execute_batch"]
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FlowBatchResult:
+    """
+    Results of a flow template executed for each code.
+
+    Args:
+        results: `BlockGlue` of the codes which succeeded
+        errors: exception raised by the codes which failed
+    """
+
+    results: Dict[Union[str, int], BlockGlue] = field(default_factory=dict)
+    errors: Dict[Union[str, int], Exception] = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self.results) + len(self.errors)
+
+
+def _params_list_for(params_list: List[dict], code: Union[str, int]) -> List[dict]:
+    code_params_list = copy.deepcopy(params_list)
+    for params in code_params_list:
+        block_params = params.get("params", {})
+        if "code" in block_params:
+            block_params["code"] = code
+    return code_params_list
+
+
+def _execute_code(
+    params_list: List[dict],
+    checkpoint_dir: Optional[str],
+    code: Union[str, int],
+    keep_outputs: Union[bool, List[str]] = True,
+) -> Tuple[Union[str, int], Optional[BlockGlue], Optional[Exception]]:
+    # module level function to be picklable for `ProcessPoolExecutor`
+    from .checkpoint import FlowCheckpoint
+    from .flow import Flow
+
+    checkpoint = None
+    if checkpoint_dir is not None:
+        checkpoint = FlowCheckpoint(checkpoint_dir=str(Path(checkpoint_dir) / str(code)))
+    try:
+        flow = Flow.from_json(
+            params_list=_params_list_for(params_list=params_list, code=code),
+            checkpoint=checkpoint,
+            keep_outputs=keep_outputs,
+        )
+        return code, flow.block_glue, None
+    except Exception as e:
+        logger.warning(f"flow of {code=} failed: {e}")
+        return code, None, e
+
+
+def execute_batch(
+    params_list: List[dict],
+    codes: List[Union[str, int]],
+    max_workers: Optional[int] = None,
+    chunksize: int = 1,
+    checkpoint_dir: Optional[str] = None,
+) -> FlowBatchResult:
+    """
+    Execute the flow template `params_list` for each code on a `ProcessPoolExecutor`.
+    The `code` of every block which has `code` in its params is replaced.
+    With `checkpoint_dir`, the blocks each code completed in a previous batch are restored, not executed.
+    """
+    if not any(["code" in params.get("params", {}) for params in params_list]):
+        raise ValueError("at least one block in the params_list must have `code` in its params")
+
+    results = {}
+    errors = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for code, glue, error in executor.map(
+            partial(_execute_code, params_list, checkpoint_dir), codes, chunksize=max(chunksize, 1)
+        ):
+            if error is None:
+                results[code] = glue
+            else:
+                errors[code] = error
+    return FlowBatchResult(results=results, errors=errors)
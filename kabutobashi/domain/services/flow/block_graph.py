@@ -0,0 +1,180 @@
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Literal, Optional, Set, Tuple, TypeAlias
+
+from kabutobashi.domain.entity.blocks.basis_blocks import IBlock
+
+__all__ = ["BlockDependencyGraph", "DependencyKind"]
+
+DependencyKind: TypeAlias = Literal["all", "series", "params"]
+
+
+@dataclass(frozen=True)
+class BlockDependencyGraph:
+    """
+    Dependencies between the blocks of a flow, resolved from the declarations of `@block`.
+
+    A block depends on the latest preceding block which produces each of its `series_required_columns`
+    and `params_required_keys`.
+    A block may declare `_series_output_columns(params)` instead of `series_output_columns`,
+    when its columns depend on the params of the flow, such as a sweep of the windows.
+    A block without `series_output_columns` and `params_output_keys` may produce anything,
+    so it is a candidate producer for every requirement of the following blocks,
+    and so are the blocks preceding it until a block which declares the requirement.
+    A column of `series_required_columns_mode="available"` without producer is not required.
+    When no candidate is found, or the requirements cannot be resolved statically
+    (`series_required_columns_mode="all"` or a user-defined `_factory()`),
+    the block conservatively depends on all preceding blocks.
+
+    Nodes are the positions of the blocks in the list.
+    `series_dependencies` and `params_dependencies` are the dependencies on the series and on the params,
+    and `dependencies` is the union of them.
+    """
+
+    blocks: List[type[IBlock]]
+    dependencies: Dict[int, FrozenSet[int]]
+    series_dependencies: Dict[int, FrozenSet[int]] = field(default_factory=dict)
+    params_dependencies: Dict[int, FrozenSet[int]] = field(default_factory=dict)
+
+    @staticmethod
+    def from_blocks(blocks: List[type[IBlock]], params: Optional[Dict[str, dict]] = None) -> "BlockDependencyGraph":
+        """
+        Args:
+            blocks: blocks of the flow
+            params: params of each block keyed by `block_name`, which override the defaults as `Flow.initialize()`
+        """
+        flow_params = params or {}
+        dependencies = {}
+        series_dependencies = {}
+        params_dependencies = {}
+        for idx, block in enumerate(blocks):
+            series, params = BlockDependencyGraph._resolve(blocks=blocks, idx=idx, flow_params=flow_params)
+            series_dependencies[idx] = frozenset(series)
+            params_dependencies[idx] = frozenset(params)
+            dependencies[idx] = frozenset(series | params)
+        return BlockDependencyGraph(
+            blocks=blocks,
+            dependencies=dependencies,
+            series_dependencies=series_dependencies,
+            params_dependencies=params_dependencies,
+        )
+
+    @staticmethod
+    def _is_declared(block: type[IBlock]) -> bool:
+        return (
+            getattr(block, "series_output_columns", None) is not None
+            or getattr(block, "params_output_keys", None) is not None
+        )
+
+    @staticmethod
+    def series_output_columns(block: type[IBlock], params: Optional[dict] = None) -> Optional[List[str]]:
+        """
+        Args:
+            block: block of the flow
+            params: params of the block, which override the defaults
+
+        Returns:
+            columns of the series output by `block` with `params`
+        """
+        if hasattr(block, "_series_output_columns"):
+            return block._series_output_columns(params=block.resolved_params(params=params))
+        return block.series_output_columns
+
+    @staticmethod
+    def _produces(block: type[IBlock], key: str, kind: str, flow_params: Dict[str, dict]) -> bool:
+        if kind == "series":
+            params = flow_params.get(block.block_name)
+            return key in (BlockDependencyGraph.series_output_columns(block=block, params=params) or [])
+        return key in (block.params_output_keys or [])
+
+    @staticmethod
+    def _find_producer(
+        blocks: List[type[IBlock]], idx: int, key, kind: str, flow_params: Dict[str, dict]
+    ) -> Optional[Set[int]]:
+        # `SeriesRequiredColumn` and `ParamsRequiredKey` name the producer explicitly
+        if hasattr(key, "block_name"):
+            producers = {j for j in range(idx) if blocks[j].block_name == key.block_name}
+            return {max(producers)} if producers else None
+        candidates = set()
+        for j in reversed(range(idx)):
+            if not BlockDependencyGraph._is_declared(blocks[j]):
+                # the key may or may not be produced, so the preceding blocks are also candidates
+                candidates.add(j)
+            elif BlockDependencyGraph._produces(blocks[j], key=key, kind=kind, flow_params=flow_params):
+                return candidates | {j}
+        return candidates or None
+
+    @staticmethod
+    def _resolve(blocks: List[type[IBlock]], idx: int, flow_params: Dict[str, dict]) -> Tuple[Set[int], Set[int]]:
+        block = blocks[idx]
+        all_preceding = set(range(idx))
+        if getattr(block, "factory_overridden", False):
+            return all_preceding, all_preceding
+        series_required_columns = block.series_required_columns
+        params_required_keys = block.params_required_keys
+
+        series = set()
+        params = set()
+        if type(series_required_columns) is list:
+            if block.series_required_columns_mode == "all":
+                return all_preceding, all_preceding
+            for column in series_required_columns:
+                producer = BlockDependencyGraph._find_producer(
+                    blocks=blocks, idx=idx, key=column, kind="series", flow_params=flow_params
+                )
+                if producer is None and block.series_required_columns_mode == "available":
+                    continue
+                if producer is None:
+                    return all_preceding, all_preceding
+                series |= producer
+        if type(params_required_keys) is list:
+            for key in params_required_keys:
+                producer = BlockDependencyGraph._find_producer(
+                    blocks=blocks, idx=idx, key=key, kind="params", flow_params=flow_params
+                )
+                if producer is None:
+                    return all_preceding, all_preceding
+                params |= producer
+        return series, params
+
+    def _kind_dependencies(self, kind: DependencyKind) -> Dict[int, FrozenSet[int]]:
+        if kind == "all":
+            return self.dependencies
+        elif kind == "series":
+            return self.series_dependencies
+        elif kind == "params":
+            return self.params_dependencies
+        raise ValueError(f"kind must be 'all', 'series' or 'params', not {kind}")
+
+    def ancestors(self, idx: int) -> List[int]:
+        """
+        Returns:
+            all blocks required directly or transitively by `idx`, in the order of the flow.
+        """
+        visited = set()
+        stack = list(self.dependencies[idx])
+        while stack:
+            node = stack.pop()
+            if node in visited:
+                continue
+            visited.add(node)
+            stack.extend(self.dependencies[node])
+        return sorted(visited)
+
+    def dependents(self, idx: int, kind: DependencyKind = "all") -> List[int]:
+        """
+        Returns:
+            blocks which directly depend on `idx`, in the order of the flow.
+        """
+        return sorted([k for k, v in self._kind_dependencies(kind=kind).items() if idx in v])
+
+    def releasable_after(self, idx: int, kind: DependencyKind = "all") -> List[int]:
+        """
+        Returns:
+            blocks whose outputs (or series / params by `kind`) are no longer required once `idx` is executed,
+            i.e. `idx` is the last of their dependents. Blocks without dependents are the results of the flow.
+        """
+        dependencies = self._kind_dependencies(kind=kind)
+        return sorted([node for node in dependencies[idx] if max(self.dependents(node, kind=kind)) == idx])
+
+    def __len__(self):
+        return len(self.blocks)
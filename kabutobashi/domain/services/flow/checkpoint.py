@@ -0,0 +1,201 @@
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from kabutobashi.domain.entity.blocks.basis_blocks import BlockGlue, BlockOutput, IBlock
+
+from .scheduler import DagScheduler
+
+__all__ = ["FlowCheckpoint"]
+
+logger = getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+
+def _to_json_value(value: Any):
+    # numpy scalars and timestamps are the usual values of params
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(value)
+    raise TypeError(f"{type(value)} is not JSON serializable")
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+@dataclass(frozen=True)
+class FlowCheckpoint:
+    """
+    Persist each `BlockOutput` to `checkpoint_dir`, so a flow restarted with the same directory
+    restores the completed blocks and executes only the rest.
+
+    The series is written as parquet if `pyarrow` is installed, otherwise as pickle.
+    The params are written as json, or as pickle if they are not JSON serializable.
+    `manifest.json` lists the completed blocks in the order of execution and is updated after each block.
+
+    Args:
+        checkpoint_dir: directory of a single flow, e.g. one directory per code
+
+    Examples:
+        >>> from kabutobashi import Flow
+        >>> from kabutobashi.domain.services.flow import FlowCheckpoint
+        >>> checkpoint = FlowCheckpoint(checkpoint_dir="/tmp/kabutobashi/1375")
+        >>> # the blocks completed by a previous run are restored, not executed
+        >>> Flow.initialize(params=params).then(blocks, checkpoint=checkpoint)
+    """
+
+    checkpoint_dir: str
+
+    @property
+    def path(self) -> Path:
+        return Path(self.checkpoint_dir)
+
+    @staticmethod
+    def series_format() -> str:
+        return "parquet" if importlib.util.find_spec("pyarrow") is not None else "pickle"
+
+    @staticmethod
+    def params_key(glue: BlockGlue) -> str:
+        """
+        Returns:
+            hash of the params of `Flow.initialize()`, to detect a checkpoint of another flow
+        """
+        params = glue.params or {}
+        return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _load_manifest(self) -> dict:
+        manifest_path = self.path / MANIFEST_FILE
+        if not manifest_path.exists():
+            return {"params_key": None, "blocks": []}
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: dict):
+        _write_atomic(self.path / MANIFEST_FILE, json.dumps(manifest, indent=2).encode())
+
+    def completed_blocks(self) -> List[str]:
+        return [v["block_name"] for v in self._load_manifest()["blocks"]]
+
+    def _write_series(self, series: pd.DataFrame, prefix: str) -> str:
+        if self.series_format() == "parquet":
+            file_name = f"{prefix}.series.parquet"
+            # the bytes of parquet without a path
+            _write_atomic(self.path / file_name, series.to_parquet())
+        else:
+            file_name = f"{prefix}.series.pkl"
+            _write_atomic(self.path / file_name, pickle.dumps(series))
+        return file_name
+
+    def _read_series(self, file_name: str) -> pd.DataFrame:
+        if file_name.endswith(".parquet"):
+            return pd.read_parquet(self.path / file_name)
+        with open(self.path / file_name, "rb") as f:
+            return pickle.load(f)
+
+    def _write_params(self, params: dict, prefix: str) -> str:
+        try:
+            data = json.dumps(params, default=_to_json_value).encode()
+            file_name = f"{prefix}.params.json"
+        except (TypeError, ValueError):
+            logger.debug(f"params of {prefix} are not JSON serializable, written as pickle")
+            data = pickle.dumps(params)
+            file_name = f"{prefix}.params.pkl"
+        _write_atomic(self.path / file_name, data)
+        return file_name
+
+    def _read_params(self, file_name: str) -> dict:
+        if file_name.endswith(".json"):
+            with open(self.path / file_name) as f:
+                return json.load(f)
+        with open(self.path / file_name, "rb") as f:
+            return pickle.load(f)
+
+    def save(self, glue: BlockGlue, block_output: BlockOutput, position: int):
+        """
+        Args:
+            glue: glue of the flow, to record its params
+            block_output: output of the completed block
+            position: number of blocks executed before the block in the flow
+        """
+        os.makedirs(self.path, exist_ok=True)
+        prefix = f"{position:04d}_{block_output.block_name}"
+        entry = {
+            "block_name": block_output.block_name,
+            "execution_order": block_output.execution_order,
+            "series": None,
+            "params": None,
+        }
+        if block_output.series is not None:
+            entry["series"] = self._write_series(series=block_output.series, prefix=prefix)
+        if block_output.params is not None:
+            entry["params"] = self._write_params(params=block_output.params, prefix=prefix)
+        manifest = self._load_manifest()
+        # entries after `position` are from a previous run which diverged
+        manifest["blocks"] = manifest["blocks"][:position] + [entry]
+        manifest["params_key"] = self.params_key(glue=glue)
+        self._save_manifest(manifest=manifest)
+
+    def restore(self, glue: BlockGlue, blocks: List[type[IBlock]]) -> Tuple[BlockGlue, int]:
+        """
+        Args:
+            glue: glue before `blocks` are executed
+            blocks: blocks to execute
+
+        Returns:
+            glue with the outputs restored from the checkpoint, and the number of restored blocks
+        """
+        manifest = self._load_manifest()
+        position = glue.execution_order - 1
+        entries = manifest["blocks"][position:]
+        if not entries:
+            return glue, 0
+        if manifest["params_key"] != self.params_key(glue=glue):
+            raise ValueError(f"{self.checkpoint_dir} is a checkpoint of a flow with other params")
+
+        restored = 0
+        for block, entry in zip(blocks, entries):
+            if block.block_name != entry["block_name"]:
+                break
+            block_output = BlockOutput(
+                series=self._read_series(entry["series"]) if entry["series"] is not None else None,
+                params=self._read_params(entry["params"]) if entry["params"] is not None else None,
+                block_name=entry["block_name"],
+                execution_order=entry["execution_order"],
+            )
+            glue = glue.add_block_output(block_output=block_output)
+            restored += 1
+        logger.info(f"{restored} blocks are restored from {self.checkpoint_dir}")
+        return glue, restored
+
+    def run(self, glue: BlockGlue, blocks: List[type[IBlock]], scheduler: Optional[DagScheduler] = None) -> BlockGlue:
+        """
+        Restore the completed blocks and execute the rest, saving the output of each block.
+        With `scheduler`, the outputs are saved after all the remaining blocks are finished.
+        """
+        position = glue.execution_order - 1
+        glue, restored = self.restore(glue=glue, blocks=blocks)
+        rest_blocks = blocks[restored:]
+        if scheduler is not None and rest_blocks:
+            glue = scheduler.run(glue=glue, blocks=rest_blocks)
+            for idx, b in enumerate(rest_blocks):
+                self.save(glue=glue, block_output=glue[b.block_name], position=position + restored + idx)
+            return glue
+        for idx, b in enumerate(rest_blocks):
+            glue = b.glue(glue=glue)
+            self.save(glue=glue, block_output=glue[b.block_name], position=position + restored + idx)
+        return glue
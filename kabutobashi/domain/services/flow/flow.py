@@ -1,8 +1,23 @@
 from dataclasses import dataclass, field, replace
-from typing import List, Union
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Union
 
 from kabutobashi.domain.entity.blocks.basis_blocks import BlockGlue, BlockOutput, IBlock
+from kabutobashi.domain.entity.blocks.block_cache import BlockCache
 from kabutobashi.domain.entity.blocks.decorator import block_from
+from kabutobashi.domain.entity.blocks.feature_cache import FeatureCache
+from kabutobashi.domain.entity.blocks.kernels import DEFAULT_EWM_TOLERANCE
+from kabutobashi.infrastructure.repository import KabutobashiDatabase
+
+from .batch import FlowBatchResult, execute_batch
+from .block_graph import BlockDependencyGraph
+from .checkpoint import FlowCheckpoint
+from .lookback import required_lookback
+from .profile import FlowProfile
+from .scheduler import DagScheduler
+from .stream import FlowStreamResult, execute_stream
+
+if TYPE_CHECKING:
+    from .plan import FlowPlan
 
 
 @dataclass(frozen=True)
@@ -10,37 +25,198 @@ class Flow:
     block_glue: BlockGlue
 
     @staticmethod
-    def from_json(params_list: List[dict]) -> "Flow":
+    def from_json(
+        params_list: List[dict],
+        cache: Optional[BlockCache] = None,
+        profiling: bool = False,
+        checkpoint: Optional[FlowCheckpoint] = None,
+        keep_outputs: Union[bool, List[str]] = True,
+        feature_cache: bool = True,
+    ) -> "Flow":
         flow_params = {}
         block_list = []
         for params in params_list:
             block = block_from(params["block_name"])
             block_list.append(block)
             flow_params.update({params["block_name"]: params.get("params", {})})
-        return Flow.initialize(params=flow_params).then(block=block_list)
+        flow = Flow.initialize(
+            params=flow_params,
+            cache=cache,
+            profiling=profiling,
+            keep_outputs=keep_outputs,
+            feature_cache=feature_cache,
+        )
+        return flow.then(block=block_list, checkpoint=checkpoint)
+
+    @staticmethod
+    def map(
+        params_list: List[dict],
+        codes: List[Union[str, int]],
+        max_workers: Optional[int] = None,
+        chunksize: int = 1,
+        checkpoint_dir: Optional[str] = None,
+    ) -> FlowBatchResult:
+        """
+        Execute the flow template for each code over a process pool.
+        A code that fails is collected in `FlowBatchResult.errors` without aborting the others.
+
+        Args:
+            params_list: flow template in the same format as `Flow.from_json()`
+            codes: the `code` params of the template are replaced with each of them
+            max_workers: number of processes
+            chunksize: number of codes sent to a process at once
+            checkpoint_dir: if given, each code is checkpointed to `{checkpoint_dir}/{code}`,
+                so a batch executed again resumes the codes which have not finished
+
+        Examples:
+            >>> from kabutobashi import Flow, FlowPath
+            >>> template = FlowPath().read_sqlite3(code=None, database_dir="...").apply_default_pre_process().sma()
+            >>> res = Flow.map(params_list=template.dumps(), codes=["1375", "1439"], max_workers=4)
+            >>> res.results["1375"]["parameterize_sma"].params
+        """
+        return execute_batch(
+            params_list=params_list,
+            codes=codes,
+            max_workers=max_workers,
+            chunksize=chunksize,
+            checkpoint_dir=checkpoint_dir,
+        )
+
+    @staticmethod
+    def stream(
+        params_list: List[dict],
+        database_dir: str,
+        chunk_size: int = 100,
+        max_in_flight_rows: Optional[int] = 100_000,
+        max_workers: Optional[int] = None,
+        keep_outputs: Union[bool, List[str]] = True,
+    ) -> Iterator[FlowStreamResult]:
+        """
+        Execute the flow template for each code of the brand table, and yield the results as they complete.
+        The codes are paged out of the database `chunk_size` at a time, and the rows of the codes in flight
+        are bounded by `max_in_flight_rows`, so the memory does not grow with the number of the codes.
+
+        Args:
+            params_list: flow template in the same format as `Flow.from_json()`
+            database_dir: directory of the database with the brand table
+            chunk_size: number of codes read from the brand table at once
+            max_in_flight_rows: maximum rows of the codes executed and not yet yielded, unbounded if None
+            max_workers: number of processes
+            keep_outputs: see `Flow.initialize()`, e.g. only the results of the flow with False
+
+        Examples:
+            >>> from kabutobashi import Flow, FlowPath
+            >>> template = FlowPath().read_sqlite3(code=None, database_dir="...").apply_default_pre_process().sma()
+            >>> for res in Flow.stream(params_list=template.with_lookback().dumps(), database_dir="..."):
+            ...     if res.succeeded:
+            ...         res.block_glue["parameterize_sma"].params
+        """
+        database = KabutobashiDatabase(database_dir=database_dir)
+        return execute_stream(
+            params_list=params_list,
+            code_chunks=database.iter_brand_codes(chunk_size=chunk_size),
+            row_counts=database.select_stock_row_counts,
+            max_in_flight_rows=max_in_flight_rows,
+            max_workers=max_workers,
+            keep_outputs=keep_outputs,
+        )
 
     @staticmethod
-    def initialize(params: dict) -> "Flow":
+    def initialize(
+        params: dict,
+        cache: Optional[BlockCache] = None,
+        profiling: bool = False,
+        keep_outputs: Union[bool, List[str]] = True,
+        feature_cache: bool = True,
+    ) -> "Flow":
+        """
+        Args:
+            params: params of each block, keyed by `block_name`
+            cache: if given, outputs of `cacheable` blocks are restored from it when their inputs are unchanged
+            profiling: if True, each `BlockOutput` has its `BlockProfile`, see `Flow.profile()`
+            keep_outputs: True keeps all outputs. Otherwise the output of a block is replaced with a stub
+                as soon as the blocks which require it in `Flow.then()` are executed,
+                except the results of the flow and the block names in the list.
+            feature_cache: if True, the derived arrays requested by `self._feature()` of the blocks,
+                such as `close` shifted by 1, are computed once in the flow, see `FeatureCache`
+        """
         initial_output = BlockOutput(series=None, params=params, block_name="initial_output", execution_order=1)
-        glue = BlockGlue(series=None, params=params, block_outputs={"FLOW_INITIAL": initial_output})
+        glue = BlockGlue(
+            series=None,
+            params=params,
+            block_outputs={"FLOW_INITIAL": initial_output},
+            cache=cache,
+            profiling=profiling,
+            keep_outputs=keep_outputs,
+            features=FeatureCache() if feature_cache else None,
+        )
         return Flow(block_glue=glue)
 
-    def then(self, block: Union[type[IBlock], List[type[IBlock]]]) -> "Flow":
-        if type(block) is list:
+    def then(
+        self,
+        block: Union[type[IBlock], List[type[IBlock]]],
+        scheduler: Optional[DagScheduler] = None,
+        checkpoint: Optional[FlowCheckpoint] = None,
+    ) -> "Flow":
+        """
+        Args:
+            block: a block or list of blocks to execute
+            scheduler: if given, independent blocks in the list are executed concurrently
+            checkpoint: if given, the output of each block is persisted,
+                and the blocks completed by a previous run are restored instead of executed
+        """
+        graph = self._liveness_graph(block=block)
+        if checkpoint is not None:
+            blocks = block if type(block) is list else [block]
+            new_glue = checkpoint.run(glue=self.block_glue, blocks=blocks, scheduler=scheduler)
+            return replace(self, block_glue=self._release(glue=new_glue, graph=graph, executed=range(len(blocks))))
+        elif type(block) is list and scheduler is not None:
+            new_glue = scheduler.run(glue=self.block_glue, blocks=block)
+            return replace(self, block_glue=self._release(glue=new_glue, graph=graph, executed=range(len(block))))
+        elif type(block) is list:
             flow = self
             glue: BlockGlue = self.block_glue
-            for b in block:
+            for idx, b in enumerate(block):
                 glue = b.glue(glue=glue)
+                glue = self._release(glue=glue, graph=graph, executed=[idx])
                 flow = replace(flow, block_glue=glue)
             return flow
         else:
             new_glue = block.glue(glue=self.block_glue)
             return replace(self, block_glue=new_glue)
 
+    def _liveness_graph(self, block: Union[type[IBlock], List[type[IBlock]]]) -> Optional[BlockDependencyGraph]:
+        if self.block_glue.keep_outputs is True or type(block) is not list:
+            return None
+        block_names = [b.block_name for b in block]
+        if len(block_names) != len(set(block_names)):
+            # the output of the same name is overwritten, so it cannot be released by name
+            return None
+        return BlockDependencyGraph.from_blocks(blocks=block, params=self.block_glue.params)
+
+    @staticmethod
+    def _release(glue: BlockGlue, graph: Optional[BlockDependencyGraph], executed: Iterable[int]) -> BlockGlue:
+        if graph is None:
+            return glue
+        for idx in executed:
+            released = [graph.blocks[node].block_name for node in graph.releasable_after(idx)]
+            glue = glue.release(block_names=released)
+            # the params of the blocks are still required, e.g. `code` of the read blocks
+            series_released = [graph.blocks[node].block_name for node in graph.releasable_after(idx, kind="series")]
+            glue = glue.release(block_names=[k for k in series_released if k not in released], params=False)
+        return glue
+
     def reduce(self, block: IBlock) -> BlockGlue:
         new_glue = block.glue(glue=self.block_glue)
         return new_glue
 
+    def profile(self) -> FlowProfile:
+        """
+        Returns:
+            report of the blocks executed with `Flow.initialize(..., profiling=True)`
+        """
+        return FlowProfile.from_glue(glue=self.block_glue)
+
 
 @dataclass(frozen=True)
 class FlowPath:
@@ -190,6 +366,19 @@ class FlowPath:
         flow_params_list.extend([parameterize])
         return replace(self, next_sequence_no=next_sequence_no + 1, flow_params_list=flow_params_list)
 
+    def impact(self, influence: int = 2, tail: int = 5) -> "FlowPath":
+        next_sequence_no = self.next_sequence_no
+        flow_params_list = self.flow_params_list
+
+        parameterize = {
+            "id": "parameterize_impact",
+            "block_name": "parameterize_impact",
+            "sequence_no": next_sequence_no + 1,
+            "params": {"influence": influence, "tail": tail},
+        }
+        flow_params_list.extend([parameterize])
+        return replace(self, next_sequence_no=next_sequence_no + 1, flow_params_list=flow_params_list)
+
     def read_example(self, code: int) -> "FlowPath":
         next_sequence_no = self.next_sequence_no
         flow_params_list = self.flow_params_list
@@ -203,7 +392,7 @@ class FlowPath:
         )
         return replace(self, next_sequence_no=next_sequence_no + 1, flow_params_list=flow_params_list)
 
-    def read_sqlite3(self, code: int, database_dir) -> "FlowPath":
+    def read_sqlite3(self, code: int, database_dir, lookback: Optional[int] = None) -> "FlowPath":
         next_sequence_no = self.next_sequence_no
         flow_params_list = self.flow_params_list
         flow_params_list.append(
@@ -211,7 +400,7 @@ class FlowPath:
                 "id": "read_sqlite3",
                 "block_name": "read_sqlite3",
                 "sequence_no": next_sequence_no,
-                "params": {"code": code, "database_dir": database_dir},
+                "params": {"code": code, "database_dir": database_dir, "lookback": lookback},
             }
         )
         return replace(self, next_sequence_no=next_sequence_no + 1, flow_params_list=flow_params_list)
@@ -224,8 +413,61 @@ class FlowPath:
         )
         return replace(self, next_sequence_no=next_sequence_no + 1, flow_params_list=flow_params_list)
 
+    def with_lookback(self, ewm_tolerance: float = DEFAULT_EWM_TOLERANCE) -> "FlowPath":
+        """
+        Set `lookback` of the read block, the first one, to the rows required by the other blocks.
+
+        Examples:
+            >>> from kabutobashi import FlowPath
+            >>> template = FlowPath().read_sqlite3(code=None, database_dir="...").apply_default_pre_process().sma()
+            >>> # the latest 88 rows are read, for the 70 rows of `sma_long` and the 18 rows of `parameterize_sma`
+            >>> template.with_lookback().dumps()
+        """
+        params = {p["block_name"]: p.get("params", {}) for p in self.flow_params_list}
+        blocks = [block_from(p["block_name"]) for p in self.flow_params_list]
+        lookback = required_lookback(blocks=blocks, params=params, ewm_tolerance=ewm_tolerance)
+        read_params = {**self.flow_params_list[0], "params": {**params[blocks[0].block_name], "lookback": lookback}}
+        return replace(self, flow_params_list=[read_params] + self.flow_params_list[1:])
+
     def dumps(self) -> List[dict]:
         return self.flow_params_list
 
     def execute(self) -> Flow:
         return Flow.from_json(params_list=self.flow_params_list)
+
+    def plan(self) -> "FlowPlan":
+        from .plan import FlowPlan
+
+        return FlowPlan.from_json(params_list=self.flow_params_list)
+
+    def map(
+        self,
+        codes: List[Union[str, int]],
+        max_workers: Optional[int] = None,
+        chunksize: int = 1,
+        checkpoint_dir: Optional[str] = None,
+    ) -> FlowBatchResult:
+        return Flow.map(
+            params_list=self.flow_params_list,
+            codes=codes,
+            max_workers=max_workers,
+            chunksize=chunksize,
+            checkpoint_dir=checkpoint_dir,
+        )
+
+    def stream(
+        self,
+        database_dir: str,
+        chunk_size: int = 100,
+        max_in_flight_rows: Optional[int] = 100_000,
+        max_workers: Optional[int] = None,
+        keep_outputs: Union[bool, List[str]] = True,
+    ) -> Iterator[FlowStreamResult]:
+        return Flow.stream(
+            params_list=self.flow_params_list,
+            database_dir=database_dir,
+            chunk_size=chunk_size,
+            max_in_flight_rows=max_in_flight_rows,
+            max_workers=max_workers,
+            keep_outputs=keep_outputs,
+        )
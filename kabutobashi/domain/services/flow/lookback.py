@@ -0,0 +1,70 @@
+from logging import getLogger
+from typing import Dict, List, Optional
+
+from kabutobashi.domain.entity.blocks.basis_blocks import IBlock
+from kabutobashi.domain.entity.blocks.kernels import DEFAULT_EWM_TOLERANCE
+
+from .block_graph import BlockDependencyGraph
+
+__all__ = ["required_lookback"]
+
+logger = getLogger(__name__)
+
+
+def _max_rows(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    # None is all the rows
+    if a is None or b is None:
+        return None
+    return max(a, b)
+
+
+def required_lookback(
+    blocks: List[type[IBlock]],
+    params: Optional[Dict[str, dict]] = None,
+    ewm_tolerance: float = DEFAULT_EWM_TOLERANCE,
+) -> Optional[int]:
+    """
+    Minimum rows of the series of the first block, i.e. the read block, for the results of the flow.
+
+    Each block declares `_lookback(params, rows, ewm_tolerance)`, the rows of its input series
+    required for the last `rows` of its output series, such as `rows + long_term - 1` of `ProcessSmaBlock`.
+    The rows are propagated backward along the series dependencies of `BlockDependencyGraph`.
+    All the rows of a result of the flow are required, except a block which outputs only params.
+    The EWM has no finite window, so its warm-up is the rows until the weight of the older values
+    is below `ewm_tolerance`, see `ewm_warmup()`.
+
+    Args:
+        blocks: blocks of the flow, starting with the read block
+        params: params of each block keyed by `block_name`, which override the defaults as `Flow.initialize()`
+        ewm_tolerance: relative error of the EWM allowed by the lookback
+
+    Returns:
+        rows to read, or None if a block requires all the rows or does not declare `_lookback()`
+    """
+    if not blocks:
+        return None
+    params = params or {}
+    graph = BlockDependencyGraph.from_blocks(blocks=blocks, params=params)
+    # rows of the output series of each block required by the following blocks
+    required: Dict[int, Optional[int]] = {idx: 0 for idx in range(len(blocks))}
+    for idx in reversed(range(len(blocks))):
+        block = blocks[idx]
+        if not graph.dependents(idx):
+            series_output_columns = BlockDependencyGraph.series_output_columns(
+                block=block, params=params.get(block.block_name)
+            )
+            params_only = series_output_columns is None and block.params_output_keys is not None
+            required[idx] = 0 if params_only else None
+        if not graph.series_dependencies[idx]:
+            continue
+        if required[idx] is None:
+            input_rows = None
+        elif hasattr(block, "_lookback"):
+            block_params = block.resolved_params(params=params.get(block.block_name))
+            input_rows = block._lookback(params=block_params, rows=required[idx], ewm_tolerance=ewm_tolerance)
+        else:
+            logger.debug(f"{block.block_name} does not declare the lookback, all the rows are required")
+            input_rows = None
+        for dependency in graph.series_dependencies[idx]:
+            required[dependency] = _max_rows(required[dependency], input_rows)
+    return required[0]
@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Set, Union
+
+from kabutobashi.domain.entity.blocks.basis_blocks import IBlock
+from kabutobashi.domain.entity.blocks.block_cache import BlockCache
+from kabutobashi.domain.entity.blocks.decorator import block_from
+
+from .block_graph import BlockDependencyGraph
+from .flow import Flow
+from .scheduler import DagScheduler
+
+__all__ = ["FlowPlan"]
+
+
+@dataclass(frozen=True)
+class FlowPlan:
+    """
+    Lazy counterpart of `Flow`, which only records the blocks.
+    When executed with `outputs`, the blocks those outputs do not depend on are not executed.
+
+    Examples:
+        >>> from kabutobashi import FlowPath
+        >>> plan = FlowPath().read_example(code=1439).apply_default_pre_process().sma().macd().adx().plan()
+        >>> # only read_example, default_pre_process and process_sma are executed
+        >>> flow = plan.execute(outputs=["sma_short"])
+        >>> flow.block_glue["process_sma"].series
+    """
+
+    params: dict
+    blocks: List[type[IBlock]] = field(default_factory=list)
+    cache: Optional[BlockCache] = None
+
+    @staticmethod
+    def initialize(params: dict, cache: Optional[BlockCache] = None) -> "FlowPlan":
+        return FlowPlan(params=params, blocks=[], cache=cache)
+
+    @staticmethod
+    def from_json(params_list: List[dict], cache: Optional[BlockCache] = None) -> "FlowPlan":
+        flow_params = {}
+        block_list = []
+        for params in params_list:
+            block_list.append(block_from(params["block_name"]))
+            flow_params.update({params["block_name"]: params.get("params", {})})
+        return FlowPlan(params=flow_params, blocks=block_list, cache=cache)
+
+    def then(self, block: Union[type[IBlock], List[type[IBlock]]]) -> "FlowPlan":
+        if type(block) is list:
+            return replace(self, blocks=self.blocks + block)
+        return replace(self, blocks=self.blocks + [block])
+
+    def _producers(self, output: str) -> Set[int]:
+        # block names take precedence over the names of columns and keys
+        for idx in reversed(range(len(self.blocks))):
+            if self.blocks[idx].block_name == output:
+                return {idx}
+        # resolved as a requirement of a block following the plan, see `BlockDependencyGraph`
+        producers = set()
+        for kind in ["series", "params"]:
+            producers |= (
+                BlockDependencyGraph._find_producer(
+                    blocks=self.blocks, idx=len(self.blocks), key=output, kind=kind, flow_params=self.params
+                )
+                or set()
+            )
+        if not producers:
+            raise KeyError(f"{output} is not produced by any block")
+        return producers
+
+    def required_blocks(self, outputs: Optional[List[str]] = None) -> List[type[IBlock]]:
+        """
+        Args:
+            outputs: block names, columns of series or keys of params
+
+        Returns:
+            blocks to execute to get `outputs`, in the order of the plan.
+        """
+        if outputs is None:
+            return self.blocks
+        graph = BlockDependencyGraph.from_blocks(blocks=self.blocks, params=self.params)
+        required = set()
+        for output in outputs:
+            for idx in self._producers(output=output):
+                required.add(idx)
+                required.update(graph.ancestors(idx))
+        return [self.blocks[idx] for idx in sorted(required)]
+
+    def execute(
+        self,
+        outputs: Optional[List[str]] = None,
+        scheduler: Optional[DagScheduler] = None,
+        profiling: bool = False,
+        keep_outputs: Union[bool, List[str]] = True,
+        feature_cache: bool = True,
+    ) -> Flow:
+        """
+        Args:
+            outputs: block names, columns of series or keys of params, all the blocks are executed if None
+            scheduler: see `Flow.then()`
+            profiling: see `Flow.initialize()`
+            keep_outputs: see `Flow.initialize()`
+            feature_cache: see `Flow.initialize()`
+        """
+        blocks = self.required_blocks(outputs=outputs)
+        flow = Flow.initialize(
+            params=self.params,
+            cache=self.cache,
+            profiling=profiling,
+            keep_outputs=keep_outputs,
+            feature_cache=feature_cache,
+        )
+        return flow.then(blocks, scheduler=scheduler)
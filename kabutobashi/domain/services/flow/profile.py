@@ -0,0 +1,77 @@
+import json
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+import pandas as pd
+
+from kabutobashi.domain.entity.blocks.basis_blocks import BlockGlue, BlockProfile
+
+__all__ = ["FlowProfile"]
+
+
+@dataclass(frozen=True)
+class FlowProfile:
+    """
+    Report of the `BlockProfile` of each block, in the order of execution.
+
+    Args:
+        profiles: profiles of the blocks executed with `profiling=True`
+
+    Examples:
+        >>> from kabutobashi import Flow
+        >>> flow = Flow.initialize(params=params, profiling=True).then(blocks)
+        >>> report = flow.profile()
+        >>> report.to_frame().sort_values("process_wall_time", ascending=False)
+        >>> report.to_json("profile.json")
+    """
+
+    profiles: List[BlockProfile] = field(default_factory=list)
+
+    @staticmethod
+    def from_glue(glue: BlockGlue) -> "FlowProfile":
+        block_outputs = sorted([v for _, v in glue if v.profile is not None], key=lambda v: v.execution_order)
+        return FlowProfile(profiles=[v.profile for v in block_outputs])
+
+    @property
+    def total_wall_time(self) -> float:
+        return sum([p.factory_wall_time + p.process_wall_time for p in self.profiles])
+
+    @property
+    def total_cpu_time(self) -> float:
+        return sum([p.factory_cpu_time + p.process_cpu_time for p in self.profiles])
+
+    def to_frame(self) -> pd.DataFrame:
+        columns = list(BlockProfile.__dataclass_fields__.keys())
+        return pd.DataFrame([asdict(p) for p in self.profiles], columns=columns)
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """
+        Args:
+            path: if given, the report is also written to the file
+
+        Returns:
+            the report as json
+        """
+        data = {
+            "total_wall_time": self.total_wall_time,
+            "total_cpu_time": self.total_cpu_time,
+            "profiles": [asdict(p) for p in self.profiles],
+        }
+        report = json.dumps(data, indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(report)
+        return report
+
+    def to_csv(self, path: Optional[str] = None) -> Optional[str]:
+        """
+        Args:
+            path: if given, the report is written to the file instead of returned
+
+        Returns:
+            the report as csv if `path` is None
+        """
+        return self.to_frame().to_csv(path, index=False)
+
+    def __len__(self):
+        return len(self.profiles)
@@ -0,0 +1,101 @@
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from logging import getLogger
+from typing import Dict, List, Literal, Optional, TypeAlias
+
+from kabutobashi.domain.entity.blocks.basis_blocks import BlockGlue, BlockOutput, IBlock
+
+from .block_graph import BlockDependencyGraph
+
+__all__ = ["DagScheduler", "ExecutorType"]
+
+logger = getLogger(__name__)
+ExecutorType: TypeAlias = Literal["thread", "process"]
+
+
+def _glue_block(block: type[IBlock], glue: BlockGlue) -> BlockOutput:
+    # module level function to be picklable for `ProcessPoolExecutor`
+    new_glue = block.glue(glue=glue)
+    return new_glue[block.block_name]
+
+
+@dataclass(frozen=True)
+class DagScheduler:
+    """
+    Run blocks as soon as the blocks they depend on are finished.
+
+    Each block receives a glue which contains only the outputs of its ancestors,
+    and its output is stamped with the `execution_order` it would have in `Flow.then()`,
+    so the resulting `BlockGlue` is the same as the one from sequential execution
+    as long as the blocks keep the index of their input series.
+
+    Args:
+        executor_type: "thread" or "process"
+        max_workers: passed to the executor
+
+    Examples:
+        >>> from kabutobashi import Flow
+        >>> from kabutobashi.domain.services.flow import DagScheduler
+        >>> Flow.initialize(params=params).then(blocks, scheduler=DagScheduler(executor_type="thread"))
+    """
+
+    executor_type: ExecutorType = "thread"
+    max_workers: Optional[int] = None
+
+    def _executor(self) -> Executor:
+        if self.executor_type == "thread":
+            return ThreadPoolExecutor(max_workers=self.max_workers)
+        elif self.executor_type == "process":
+            return ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            raise ValueError(f"executor_type must be 'thread' or 'process', not {self.executor_type}")
+
+    @staticmethod
+    def _ancestors_glue(
+        glue: BlockGlue, blocks: List[type[IBlock]], ancestors: List[int], outputs: Dict[int, BlockOutput]
+    ) -> BlockGlue:
+        block_outputs = dict(glue.block_outputs)
+        for idx in ancestors:
+            block_outputs[blocks[idx].block_name] = outputs[idx]
+        return replace(glue, block_outputs=block_outputs, execution_order=glue.execution_order + len(ancestors))
+
+    def run(self, glue: BlockGlue, blocks: List[type[IBlock]]) -> BlockGlue:
+        block_names = [b.block_name for b in blocks]
+        if len(block_names) != len(set(block_names)):
+            # the later block overwrites the output of the same name, so the order matters
+            logger.info(f"{block_names=} are not unique, executed sequentially")
+            for b in blocks:
+                glue = b.glue(glue=glue)
+            return glue
+
+        graph = BlockDependencyGraph.from_blocks(blocks=blocks, params=glue.params)
+        base_execution_order = glue.get_max_execution_order()
+        outputs: Dict[int, BlockOutput] = {}
+        pending = list(range(len(blocks)))
+        running: Dict[Future, int] = {}
+
+        with self._executor() as executor:
+            while pending or running:
+                ready = [idx for idx in pending if graph.dependencies[idx] <= outputs.keys()]
+                for idx in ready:
+                    pending.remove(idx)
+                    ancestors_glue = self._ancestors_glue(
+                        glue=glue, blocks=blocks, ancestors=graph.ancestors(idx), outputs=outputs
+                    )
+                    logger.debug(f"submit {block_names[idx]}")
+                    running[executor.submit(_glue_block, blocks[idx], ancestors_glue)] = idx
+                done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = running.pop(future)
+                    try:
+                        block_output = future.result()
+                    except Exception:
+                        for f in running.keys():
+                            f.cancel()
+                        raise
+                    outputs[idx] = replace(block_output, execution_order=base_execution_order + idx + 1)
+
+        block_outputs = dict(glue.block_outputs)
+        for idx in range(len(blocks)):
+            block_outputs[block_names[idx]] = outputs[idx]
+        return replace(glue, block_outputs=block_outputs, execution_order=glue.execution_order + len(blocks))
@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from functools import partial
+from logging import getLogger
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from kabutobashi.domain.entity.blocks.basis_blocks import BlockGlue
+
+from .batch import _execute_code
+
+__all__ = ["FlowStreamResult", "execute_stream"]
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FlowStreamResult:
+    """
+    Result of a flow template executed for a code of a stream.
+
+    Args:
+        code: code of the stock
+        block_glue: `BlockGlue` of the code, None if it failed
+        error: exception raised by the code, None if it succeeded
+        rows: rows of the code counted against `max_in_flight_rows`
+    """
+
+    code: Union[str, int]
+    block_glue: Optional[BlockGlue]
+    error: Optional[Exception]
+    rows: int
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def _template_lookback(params_list: List[dict]) -> Optional[int]:
+    # the read block has `code`, and reads at most `lookback` rows
+    for params in params_list:
+        block_params = params.get("params", {})
+        if "code" in block_params and block_params.get("lookback") is not None:
+            return int(block_params["lookback"])
+    return None
+
+
+def execute_stream(
+    params_list: List[dict],
+    code_chunks: Iterable[List[Union[str, int]]],
+    row_counts: Callable[[List[Union[str, int]]], Dict[Union[str, int], int]],
+    max_in_flight_rows: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    keep_outputs: Union[bool, List[str]] = True,
+) -> Iterator[FlowStreamResult]:
+    """
+    Execute the flow template `params_list` for each code on a `ProcessPoolExecutor`, and yield the results
+    as they complete. The chunks of codes are pulled only when the pool has room for them,
+    and the codes are submitted while the rows of the codes in flight are within `max_in_flight_rows`.
+    A code with more rows than `max_in_flight_rows` is executed alone.
+
+    Args:
+        params_list: flow template in the same format as `Flow.from_json()`
+        code_chunks: chunks of codes, such as `KabutobashiDatabase.iter_brand_codes()`
+        row_counts: rows to read of each code in a chunk, bounded by the `lookback` of the read block
+        max_in_flight_rows: if given, maximum rows of the codes submitted and not yet yielded
+        max_workers: number of processes
+        keep_outputs: see `Flow.initialize()`
+    """
+    if not any(["code" in params.get("params", {}) for params in params_list]):
+        raise ValueError("at least one block in the params_list must have `code` in its params")
+    if max_in_flight_rows is not None and max_in_flight_rows < 1:
+        raise ValueError(f"max_in_flight_rows must be positive, but {max_in_flight_rows}")
+    return _stream(
+        params_list=params_list,
+        code_chunks=code_chunks,
+        row_counts=row_counts,
+        max_in_flight_rows=max_in_flight_rows,
+        max_workers=max_workers or os.cpu_count() or 1,
+        keep_outputs=keep_outputs,
+    )
+
+
+def _stream(
+    params_list: List[dict],
+    code_chunks: Iterable[List[Union[str, int]]],
+    row_counts: Callable[[List[Union[str, int]]], Dict[Union[str, int], int]],
+    max_in_flight_rows: Optional[int],
+    max_workers: int,
+    keep_outputs: Union[bool, List[str]],
+) -> Iterator[FlowStreamResult]:
+    lookback = _template_lookback(params_list=params_list)
+    execute_code = partial(_execute_code, params_list, None, keep_outputs=keep_outputs)
+    # twice the workers, so that the pool is not idle while the results are consumed
+    max_in_flight_codes = 2 * max_workers
+    in_flight: Dict[Future, Tuple[Union[str, int], int]] = {}
+    in_flight_rows = 0
+
+    def _has_room(rows: int) -> bool:
+        if not in_flight:
+            return True
+        if len(in_flight) >= max_in_flight_codes:
+            return False
+        return max_in_flight_rows is None or in_flight_rows + rows <= max_in_flight_rows
+
+    def _completed() -> Iterator[FlowStreamResult]:
+        nonlocal in_flight_rows
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            code, rows = in_flight.pop(future)
+            in_flight_rows -= rows
+            _, glue, error = future.result()
+            yield FlowStreamResult(code=code, block_glue=glue, error=error, rows=rows)
+
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        for codes in code_chunks:
+            counts = row_counts(codes)
+            for code in codes:
+                rows = counts.get(code, 0)
+                if lookback is not None:
+                    rows = min(rows, lookback)
+                while not _has_room(rows):
+                    yield from _completed()
+                in_flight[executor.submit(execute_code, code)] = (code, rows)
+                in_flight_rows += rows
+            logger.debug(f"{len(codes)} codes submitted, {in_flight_rows} rows in flight")
+        while in_flight:
+            yield from _completed()
+    finally:
+        # the codes not yet started are discarded when the stream is closed early
+        executor.shutdown(wait=True, cancel_futures=True)
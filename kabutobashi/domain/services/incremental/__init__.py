@@ -0,0 +1,3 @@
+from .incremental_indicators import DEFAULT_INCREMENTAL_BLOCKS, IncrementalIndicators
+from .intraday import INTRADAY_MINUTES, IntradayBarBuilder, queue_snapshots, read_snapshots
+from .state_store import IndicatorStateStore
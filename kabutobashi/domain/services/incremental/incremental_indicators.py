@@ -0,0 +1,139 @@
+import hashlib
+import json
+import math
+from logging import getLogger
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from kabutobashi.domain.entity.blocks.basis_blocks import IBlock
+from kabutobashi.domain.entity.blocks.process_blocks import (
+    ProcessAdxBlock,
+    ProcessBollingerBandsBlock,
+    ProcessMacdBlock,
+    ProcessMomentumBlock,
+    ProcessPsychoLogicalBlock,
+    ProcessSmaBlock,
+    ProcessStochasticsBlock,
+)
+from kabutobashi.domain.services.panel.price_panel import PRICE_FIELDS
+
+__all__ = ["IncrementalIndicators", "DEFAULT_INCREMENTAL_BLOCKS"]
+
+logger = getLogger(__name__)
+
+# the process blocks of `analysis()`
+DEFAULT_INCREMENTAL_BLOCKS = [
+    ProcessSmaBlock,
+    ProcessMacdBlock,
+    ProcessAdxBlock,
+    ProcessBollingerBandsBlock,
+    ProcessMomentumBlock,
+    ProcessPsychoLogicalBlock,
+    ProcessStochasticsBlock,
+]
+
+
+class IncrementalIndicators:
+    """
+    Recurrence state of the process blocks of a code, to compute the outputs of a new bar
+    without the history, such as the rolling sums and the EWM accumulators.
+
+    The outputs of each bar are the same in the last bit as `_process()` of the blocks over the whole series,
+    since the state follows the same arithmetic as the kernels and pandas.
+    The bars are cleaned as `DefaultPreProcessBlock`, i.e. the prices of a bar without volume are the previous ones.
+    The state is built once by `update_frame()` over the history, then updated by `update()` for each new bar,
+    and persisted per code with `IndicatorStateStore`.
+
+    Args:
+        blocks: process blocks which implement `_incremental_state()` and `_process_incremental()`
+        params: params of each block keyed by `block_name`, which override the defaults as `Flow.initialize()`
+        code: code of the bars
+
+    Examples:
+        >>> from kabutobashi.domain.services.incremental import IncrementalIndicators
+        >>> # the prices of `default_pre_process`, indexed by `dt`
+        >>> indicators = IncrementalIndicators(code="1375")
+        >>> history_df = indicators.update_frame(df)
+        >>> bar = {"open": 1500, "high": 1520, "low": 1490, "close": 1510, "volume": 12000}
+        >>> indicators.update(bar, dt="2024-01-05")
+    """
+
+    def __init__(
+        self,
+        blocks: Optional[List[type[IBlock]]] = None,
+        params: Optional[Dict[str, dict]] = None,
+        code: Optional[str] = None,
+    ):
+        self.blocks = list(blocks or DEFAULT_INCREMENTAL_BLOCKS)
+        params = params or {}
+        self.code = code
+        self.params = {}
+        for b in self.blocks:
+            if not hasattr(b, "_process_incremental"):
+                raise ValueError(f"{b.block_name} does not support the incremental update")
+            self.params[b.block_name] = b.resolved_params(params=params.get(b.block_name))
+        self.states = {b.block_name: b._incremental_state(params=self.params[b.block_name]) for b in self.blocks}
+        self.last_bar: Optional[Dict[str, float]] = None
+        self.last_dt: Optional[str] = None
+        self.rows = 0
+
+    @property
+    def params_key(self) -> str:
+        """
+        Returns:
+            hash of the blocks and their params, to detect a state of other params
+        """
+        params = {b.block_name: self.params[b.block_name] for b in self.blocks}
+        return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _clean_bar(self, bar: Dict[str, Any]) -> Dict[str, float]:
+        volume = bar.get("volume")
+        has_volume = volume is None or volume > 0
+        cleaned = {}
+        for name in PRICE_FIELDS:
+            value = float(bar[name]) if name in bar and bar[name] is not None else np.nan
+            # the previous value, as `ffill` of `DefaultPreProcessBlock`
+            if (not has_volume or math.isnan(value)) and self.last_bar is not None:
+                value = self.last_bar[name]
+            cleaned[name] = value
+        return cleaned
+
+    def update(self, bar: Union[Dict[str, Any], pd.Series], dt: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Args:
+            bar: `open`, `high`, `low`, `close` and `volume` of the new bar
+            dt: date of the new bar, which must be after the last one
+
+        Returns:
+            the outputs of all the blocks for the new bar
+        """
+        if dt is not None and self.last_dt is not None and str(dt) <= self.last_dt:
+            raise ValueError(f"dt of the new bar must be after {self.last_dt}, but {dt}")
+        cleaned = self._clean_bar(bar=dict(bar))
+        outputs = {}
+        for b in self.blocks:
+            outputs.update(
+                b._process_incremental(state=self.states[b.block_name], bar=cleaned, params=self.params[b.block_name])
+            )
+        self.last_bar = cleaned
+        self.last_dt = str(dt) if dt is not None else self.last_dt
+        self.rows += 1
+        return outputs
+
+    def update_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Update the state with the bars of `df` in order, e.g. to build the state from the history of a code.
+
+        Args:
+            df: bars indexed by `dt` in ascending order
+
+        Returns:
+            the outputs of all the blocks, indexed as `df`
+        """
+        rows = [self.update(bar=bar, dt=dt) for dt, bar in zip(df.index, df.to_dict(orient="records"))]
+        if not rows:
+            return pd.DataFrame(index=df.index)
+        logger.debug(f"state of {self.code} is updated with {len(rows)} bars")
+        return pd.DataFrame({k: np.asarray([row[k] for row in rows]) for k in rows[0].keys()}, index=df.index)
@@ -0,0 +1,232 @@
+import queue
+from collections import deque
+from logging import getLogger
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from kabutobashi.domain.entity.blocks.basis_blocks import IBlock
+from kabutobashi.utilities import convert_float, convert_int
+
+from .incremental_indicators import IncrementalIndicators
+
+__all__ = ["IntradayBarBuilder", "INTRADAY_MINUTES", "read_snapshots", "queue_snapshots"]
+
+logger = getLogger(__name__)
+
+INTRADAY_MINUTES = (1, 5, 15)
+
+
+def _to_float(value: Any) -> float:
+    # the values extracted from the page are strings such as "1,234"
+    return convert_float(value) if isinstance(value, str) else float(value)
+
+
+def _to_int(value: Any) -> int:
+    return convert_int(value) if isinstance(value, str) else int(value)
+
+
+def _snapshot_timestamp(snapshot: Dict[str, Any]) -> pd.Timestamp:
+    if snapshot.get("timestamp") is not None:
+        return pd.Timestamp(snapshot["timestamp"])
+    # the output of `ExtractStockInfoBlock`
+    if snapshot.get("dt") is not None and snapshot.get("time") is not None:
+        return pd.Timestamp(f"{snapshot['dt']} {snapshot['time']}")
+    raise ValueError(f"snapshot must have `timestamp`, or `dt` and `time`, but {snapshot}")
+
+
+def read_snapshots(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Snapshots of a local csv file with `code`, `timestamp` (or `dt` and `time`), `close` and optionally `volume`.
+    """
+    for chunk in pd.read_csv(path, dtype={"code": str}, chunksize=10_000):
+        yield from chunk.to_dict(orient="records")
+
+
+def queue_snapshots(snapshot_queue: queue.Queue, sentinel: Any = None) -> Iterator[Dict[str, Any]]:
+    """
+    Snapshots put into `snapshot_queue` by a producer, until `sentinel` is put.
+    """
+    while True:
+        snapshot = snapshot_queue.get()
+        if snapshot is sentinel:
+            return
+        yield snapshot
+
+
+class IntradayBarBuilder:
+    """
+    Aggregate the price snapshots of codes into OHLCV bars of `minutes`,
+    and update `IncrementalIndicators` of each code when a bar closes.
+    The latest `buffer_size` bars of each code and the outputs of the indicators are kept in memory.
+
+    A bar closes when the first snapshot of a later bar arrives, or by `flush()`, e.g. at the end of the session.
+    The minutes without snapshots have no bar.
+    The `volume` of the snapshots is the cumulative volume of the day, as the stock info page,
+    so the volume of a bar is the difference from the last snapshot of the previous bar in the same day.
+
+    Args:
+        minutes: minutes of a bar, one of `INTRADAY_MINUTES`
+        buffer_size: number of the bars kept per code
+        blocks: process blocks of `IncrementalIndicators`
+        params: params of each block of `IncrementalIndicators`
+
+    Examples:
+        >>> from kabutobashi.domain.services.incremental import IntradayBarBuilder, read_snapshots
+        >>> builder = IntradayBarBuilder(minutes=5)
+        >>> for bar in builder.consume(read_snapshots("snapshots.csv")):
+        ...     bar["code"], bar["dt"], bar["macd_buy_signal"]
+        >>> builder.flush()
+        >>> builder.bars(code="1375")
+    """
+
+    def __init__(
+        self,
+        minutes: int = 5,
+        buffer_size: int = 500,
+        blocks: Optional[List[type[IBlock]]] = None,
+        params: Optional[Dict[str, dict]] = None,
+    ):
+        if minutes not in INTRADAY_MINUTES:
+            raise ValueError(f"minutes must be one of {INTRADAY_MINUTES}, but {minutes}")
+        if buffer_size < 1:
+            raise ValueError(f"buffer_size must be positive, but {buffer_size}")
+        self.minutes = minutes
+        self._bar_ns = minutes * 60 * 1_000_000_000
+        self.buffer_size = buffer_size
+        self.blocks = blocks
+        self.params = params
+        # the indicators of a code may be built beforehand, e.g. by `update_frame()` of the previous bars
+        self.indicators: Dict[str, IncrementalIndicators] = {}
+        self.buffers: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._open_bars: Dict[str, Dict[str, Any]] = {}
+        # the cumulative volume of the day at the close of the previous bar
+        self._closed_volumes: Dict[str, Dict[str, Any]] = {}
+
+    def _bar_start(self, timestamp: pd.Timestamp) -> int:
+        # nanoseconds of the start of the bar, as `timestamp.floor()` which is slow per snapshot
+        return timestamp.value - timestamp.value % self._bar_ns
+
+    def add(
+        self,
+        code: Union[str, int],
+        timestamp: Union[str, pd.Timestamp],
+        price: Union[str, float],
+        volume: Optional[Union[str, int]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            code: code of the stock
+            timestamp: time of the snapshot, which must not be before the open bar of the code
+            price: price of the snapshot
+            volume: cumulative volume of the day at the snapshot
+
+        Returns:
+            the bar closed by the snapshot with the outputs of the indicators, or None
+        """
+        code = str(code)
+        if not isinstance(timestamp, pd.Timestamp):
+            timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is not None:
+            # the bars are of the local time of the market
+            timestamp = timestamp.tz_localize(None)
+        start = self._bar_start(timestamp=timestamp)
+        price = _to_float(price)
+        volume = None if volume is None or volume != volume else _to_int(volume)
+
+        closed = None
+        open_bar = self._open_bars.get(code)
+        if open_bar is not None and start < open_bar["start"]:
+            bar_start = pd.Timestamp(open_bar["start"])
+            raise ValueError(f"snapshot of {code} must not be before the open bar of {bar_start}, but {timestamp}")
+        if open_bar is not None and start > open_bar["start"]:
+            closed = self._close(code=code)
+            open_bar = None
+        if open_bar is None:
+            self._open_bars[code] = {
+                "start": start,
+                "open": price,
+                "high": price,
+                "low": price,
+                "close": price,
+                "cumulative_volume": volume,
+            }
+        else:
+            open_bar["high"] = max(open_bar["high"], price)
+            open_bar["low"] = min(open_bar["low"], price)
+            open_bar["close"] = price
+            if volume is not None:
+                open_bar["cumulative_volume"] = volume
+        return closed
+
+    def consume(self, snapshots: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Add the snapshots in order, such as `read_snapshots()` or `queue_snapshots()`.
+
+        Args:
+            snapshots: `code`, `timestamp` (or `dt` and `time` as `ExtractStockInfoBlock`), `close` and `volume`
+
+        Returns:
+            the bars as they close
+        """
+        for snapshot in snapshots:
+            closed = self.add(
+                code=snapshot["code"],
+                timestamp=_snapshot_timestamp(snapshot=snapshot),
+                price=snapshot["close"],
+                volume=snapshot.get("volume"),
+            )
+            if closed is not None:
+                yield closed
+
+    def flush(self, code: Optional[Union[str, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Close the open bar of `code`, or of all the codes if None.
+
+        Returns:
+            the closed bars with the outputs of the indicators
+        """
+        codes = list(self._open_bars.keys()) if code is None else [str(code)]
+        return [self._close(code=c) for c in codes if c in self._open_bars]
+
+    def bars(self, code: Union[str, int]) -> pd.DataFrame:
+        """
+        Returns:
+            the closed bars in the buffer of `code` with the outputs of the indicators, indexed by `dt`
+        """
+        buffer = self.buffers.get(str(code))
+        if not buffer:
+            return pd.DataFrame()
+        df = pd.DataFrame(list(buffer))
+        df.index = df["dt"]
+        return df
+
+    def _close(self, code: str) -> Dict[str, Any]:
+        open_bar = self._open_bars.pop(code)
+        start = pd.Timestamp(open_bar["start"])
+        day = start.strftime("%Y-%m-%d")
+        cumulative_volume = open_bar["cumulative_volume"]
+        volume = None
+        if cumulative_volume is not None:
+            previous = self._closed_volumes.get(code)
+            base = previous["volume"] if previous is not None and previous["day"] == day else 0
+            volume = max(cumulative_volume - base, 0)
+            self._closed_volumes[code] = {"day": day, "volume": cumulative_volume}
+
+        bar = {
+            "code": code,
+            "dt": start.strftime("%Y-%m-%d %H:%M"),
+            "open": open_bar["open"],
+            "high": open_bar["high"],
+            "low": open_bar["low"],
+            "close": open_bar["close"],
+            "volume": volume,
+        }
+        if code not in self.indicators:
+            self.indicators[code] = IncrementalIndicators(blocks=self.blocks, params=self.params, code=code)
+        outputs = self.indicators[code].update(bar=bar, dt=bar["dt"])
+        bar.update(outputs)
+        if code not in self.buffers:
+            self.buffers[code] = deque(maxlen=self.buffer_size)
+        self.buffers[code].append(bar)
+        return bar
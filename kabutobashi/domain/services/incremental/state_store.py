@@ -0,0 +1,61 @@
+import os
+import pickle
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import Optional
+
+from kabutobashi.domain.services.flow.checkpoint import _write_atomic
+
+from .incremental_indicators import IncrementalIndicators
+
+__all__ = ["IndicatorStateStore"]
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndicatorStateStore:
+    """
+    Persist `IncrementalIndicators` of each code to `state_dir` as pickle, one file per code.
+
+    Args:
+        state_dir: directory of the states of all the codes
+
+    Examples:
+        >>> from kabutobashi.domain.services.incremental import IncrementalIndicators, IndicatorStateStore
+        >>> store = IndicatorStateStore(state_dir="/tmp/kabutobashi/state")
+        >>> indicators = store.load(code="1375") or IncrementalIndicators(code="1375")
+        >>> indicators.update(bar, dt="2024-01-05")
+        >>> store.save(indicators)
+    """
+
+    state_dir: str
+
+    def path(self, code: str) -> Path:
+        return Path(self.state_dir) / f"{code}.state.pkl"
+
+    def load(self, code: str, params_key: Optional[str] = None) -> Optional[IncrementalIndicators]:
+        """
+        Args:
+            code: code of the state
+            params_key: `IncrementalIndicators.params_key` of the expected blocks and params
+
+        Returns:
+            the state, or None if it is not saved or is of other params
+        """
+        path = self.path(code=code)
+        if not path.exists():
+            return None
+        with open(path, "rb") as f:
+            indicators: IncrementalIndicators = pickle.load(f)
+        if params_key is not None and indicators.params_key != params_key:
+            logger.info(f"state of {code} is of other params, and is not used")
+            return None
+        return indicators
+
+    def save(self, indicators: IncrementalIndicators):
+        if indicators.code is None:
+            raise ValueError("code of the state is required to save it")
+        os.makedirs(self.state_dir, exist_ok=True)
+        _write_atomic(self.path(code=indicators.code), pickle.dumps(indicators))
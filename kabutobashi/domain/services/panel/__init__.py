@@ -0,0 +1 @@
+from .price_panel import PanelOutputFormat, PricePanel
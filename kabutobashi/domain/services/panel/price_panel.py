@@ -0,0 +1,158 @@
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Dict, List, Literal, Optional
+
+import numpy as np
+import pandas as pd
+
+from kabutobashi.domain.entity.blocks.basis_blocks import IBlock
+from kabutobashi.domain.entity.blocks.kernels import RollingKernel
+
+__all__ = ["PricePanel", "PanelOutputFormat"]
+
+logger = getLogger(__name__)
+
+PanelOutputFormat = Literal["long", "wide"]
+# the prices cleaned by `default_pre_process`, also the fields of a bar of `IncrementalIndicators`
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+
+@dataclass(frozen=True)
+class PricePanel:
+    """
+    Prices of many codes as 2-D arrays of (dates, codes), to compute the indicators of the whole market
+    with a vectorized call of each process block instead of a flow for each code.
+
+    The rows of a code are its own dates in ascending order, i.e. the codes are aligned at their first date
+    and padded with NaN after their last date, so a rolling window of a code never spans the missing dates
+    of another code, and the results are the same as the flow of each code.
+
+    Args:
+        codes: codes of the columns
+        dates: (dates, codes) array of the date of each row, None for the padding
+        lengths: number of the rows of each code
+        values: (dates, codes) arrays of `open`, `high`, `low`, `close` and `volume`
+
+    Examples:
+        >>> from kabutobashi.domain.entity.blocks.process_blocks import ProcessMacdBlock, ProcessSmaBlock
+        >>> from kabutobashi.domain.services.panel import PricePanel
+        >>> # the prices pre-processed by `default_pre_process`, with `code` and `dt` columns
+        >>> panel = PricePanel.from_frame(df)
+        >>> panel.process([ProcessSmaBlock, ProcessMacdBlock], params={"process_sma": {"short_term": 7}})
+    """
+
+    codes: List[str]
+    dates: np.ndarray
+    lengths: np.ndarray
+    values: Dict[str, np.ndarray]
+    _kernels: Dict[str, RollingKernel] = field(default_factory=dict, repr=False, compare=False)
+
+    @staticmethod
+    def from_frame(df: pd.DataFrame, code_column: str = "code", dt_column: str = "dt") -> "PricePanel":
+        """
+        Args:
+            df: long frame of the prices of all the codes, such as the series of `default_pre_process`
+            code_column: column of the codes
+            dt_column: column of the dates, which is sorted in ascending order for each code
+        """
+        # codes are compared as str, as the `code` params of the flows
+        code_index, codes = pd.factorize(df[code_column])
+        codes = np.asarray([str(c) for c in codes], dtype=object)
+        code_rank = np.argsort(np.argsort(codes, kind="stable"))
+        codes = np.sort(codes)
+        dt_index, _ = pd.factorize(df[dt_column], sort=True)
+        order = np.lexsort((dt_index, code_rank[code_index]))
+        df = df.iloc[order]
+        code_index = code_rank[code_index][order]
+        lengths = np.bincount(code_index, minlength=len(codes))
+        # position of each row in its code
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        position = np.arange(len(df)) - starts[code_index]
+        shape = (int(lengths.max()) if len(lengths) else 0, len(codes))
+
+        dates = np.full(shape, None, dtype=object)
+        dates[position, code_index] = df[dt_column].to_numpy()
+        values = {}
+        for name in PRICE_FIELDS + ("volume",):
+            if name not in df.columns:
+                continue
+            matrix = np.full(shape, np.nan)
+            matrix[position, code_index] = df[name].to_numpy(dtype=np.float64)
+            values[name] = matrix
+        logger.debug(f"panel of {shape[1]} codes and {shape[0]} rows")
+        return PricePanel(codes=[str(c) for c in codes], dates=dates, lengths=lengths, values=values)
+
+    @property
+    def shape(self) -> tuple:
+        return self.dates.shape
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.values[name]
+
+    def kernel(self, name: str) -> RollingKernel:
+        """
+        Returns:
+            the rolling kernel of `name`, shared by the blocks like `FeatureCache` of a flow
+        """
+        if name not in self._kernels:
+            self._kernels[name] = RollingKernel(self.values[name])
+        return self._kernels[name]
+
+    def compute(self, block: type[IBlock], params: Optional[dict] = None) -> Dict[str, np.ndarray]:
+        """
+        Args:
+            block: a process block which implements `_process_panel()`
+            params: params of the block, which override the defaults as `Flow.initialize()`
+
+        Returns:
+            (dates, codes) arrays of the `series_output_columns` of the block
+        """
+        if not hasattr(block, "_process_panel"):
+            raise ValueError(f"{block.block_name} does not support the panel")
+        return block._process_panel(panel=self, params=block.resolved_params(params=params))
+
+    def to_long(self, outputs: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """
+        Returns:
+            frame of `code`, `dt` and the outputs, ordered by `code` and `dt`
+        """
+        rows = np.arange(self.shape[0])[:, None] < self.lengths[None, :]
+        # transposed to order by code
+        data = {
+            "code": np.repeat(np.asarray(self.codes, dtype=object), self.lengths),
+            "dt": self.dates.T[rows.T],
+        }
+        data.update({k: v.T[rows.T] for k, v in outputs.items()})
+        return pd.DataFrame(data)
+
+    def to_wide(self, outputs: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """
+        Returns:
+            frame indexed by `dt`, whose columns are (output, code)
+        """
+        return self.to_long(outputs=outputs).set_index(["dt", "code"]).unstack("code").sort_index()
+
+    def process(
+        self,
+        blocks: List[type[IBlock]],
+        params: Optional[Dict[str, dict]] = None,
+        output: PanelOutputFormat = "long",
+    ) -> pd.DataFrame:
+        """
+        Args:
+            blocks: process blocks such as `ProcessSmaBlock` and `ProcessMacdBlock`
+            params: params of each block, keyed by `block_name`
+            output: `long` for a frame of `code` and `dt`, or `wide` for a frame of `dt` and (output, code)
+
+        Returns:
+            the outputs of all the blocks
+        """
+        params = params or {}
+        outputs = {}
+        for block in blocks:
+            outputs.update(self.compute(block=block, params=params.get(block.block_name)))
+        if output == "long":
+            return self.to_long(outputs=outputs)
+        elif output == "wide":
+            return self.to_wide(outputs=outputs)
+        raise ValueError(f"output must be `long` or `wide`, but {output}")
@@ -1,7 +1,7 @@
 import sqlite3
 from logging import INFO, getLogger
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional
 
 import pandas as pd
 
@@ -91,10 +91,20 @@ class KabutobashiDatabase:
                 logger.warning(f"stock_df(stock.code, stock.dt) already exists, {df=}")
         return self
 
-    def select_stock_df(self, code: str):
+    def select_stock_df(self, code: str, limit: Optional[int] = None):
+        """
+        Args:
+            code: code of the stock
+            limit: if given, only the latest `limit` rows, ordered by `dt` in ascending order
+        """
         stock_table_columns = ["code", "dt", "name", "open", "close", "high", "low", "volume"]
         with self as conn:
-            df = pd.read_sql(f"SELECT * FROM stock WHERE code = '{code}'", conn)
+            if limit is None:
+                df = pd.read_sql(f"SELECT * FROM stock WHERE code = '{code}'", conn)
+            else:
+                # the latest rows are read with the index of (code, dt)
+                query = f"SELECT * FROM stock WHERE code = '{code}' ORDER BY dt DESC LIMIT {int(limit)}"
+                df = pd.read_sql(f"SELECT * FROM ({query}) ORDER BY dt", conn)
             return df[stock_table_columns]
 
     def insert_impact_df(self, df: pd.DataFrame) -> "KabutobashiDatabase":
@@ -137,3 +147,51 @@ class KabutobashiDatabase:
                 return df[impact_table_columns]
             except sqlite3.DatabaseError:
                 return None
+
+    def select_brand_codes(self, after: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+        """
+        Args:
+            after: if given, only the codes greater than it, i.e. the last code of the previous page
+            limit: if given, only the first `limit` codes, ordered by `code`
+        """
+        query = "SELECT code FROM brand"
+        query_params = []
+        if after is not None:
+            query += " WHERE code > ?"
+            query_params.append(str(after))
+        query += " ORDER BY code"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self as conn:
+            try:
+                return [row[0] for row in conn.execute(query, query_params).fetchall()]
+            except sqlite3.DatabaseError:
+                return []
+
+    def iter_brand_codes(self, chunk_size: int) -> Iterator[List[str]]:
+        """
+        Codes of the brand table in pages of `chunk_size`, so that all the codes are never loaded at once.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, but {chunk_size}")
+        after = None
+        while True:
+            codes = self.select_brand_codes(after=after, limit=chunk_size)
+            if not codes:
+                return
+            yield codes
+            after = codes[-1]
+
+    def select_stock_row_counts(self, codes: List[str]) -> Dict[str, int]:
+        """
+        Returns:
+            rows of the stock table of each code, 0 for a code without records
+        """
+        codes = [str(code) for code in codes]
+        if not codes:
+            return {}
+        placeholders = ", ".join(["?"] * len(codes))
+        query = f"SELECT code, COUNT(*) FROM stock WHERE code IN ({placeholders}) GROUP BY code"
+        with self as conn:
+            counts = dict(conn.execute(query, codes).fetchall())
+        return {code: counts.get(code, 0) for code in codes}
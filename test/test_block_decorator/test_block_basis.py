@@ -1,3 +1,6 @@
+from dataclasses import replace
+
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -110,3 +113,40 @@ def test_block_glue_strict_error():
             required_columns=["col1", "col2", "col3"], series_required_columns_mode="strict"
         )
     assert str(block_e.value) == "orders=[1, 1] must be unique."
+
+
+def test_block_glue_column_store():
+    initial_output = BlockOutput(
+        series=None, params={"output2": {"p": 0}}, block_name="FLOW_INITIAL", execution_order=1
+    )
+    block_glue = BlockGlue(series=None, params=None, block_outputs={"FLOW_INITIAL": initial_output}, execution_order=1)
+
+    df1 = pd.DataFrame.from_dict({"col1": [1, 2], "col2": [3, 4]})
+    df2 = pd.DataFrame.from_dict({"col1": [5, 6], "col3": [3, 4]})
+    output1 = BlockOutput(series=df1, params={"p": 1, "q": 1}, block_name="output1", execution_order=2)
+    output2 = BlockOutput(series=df2, params={"p": 2}, block_name="output2", execution_order=3)
+    block_glue = block_glue.add_block_output(output1).add_block_output(output2)
+    store = block_glue.store
+    assert store is block_glue.column_store()
+    assert list(store.columns.keys()) == ["col1", "col3", "col2"]
+
+    fixed_df = block_glue.get_series_from_required_columns(
+        required_columns=["col1", "col2", "col3"], series_required_columns_mode="strict"
+    )
+    assert fixed_df.equals(pd.DataFrame.from_dict({"col1": [5, 6], "col2": [3, 4], "col3": [3, 4]}))
+    # columns are not copied
+    assert np.shares_memory(fixed_df["col3"].to_numpy(), df2["col3"].to_numpy())
+    assert block_glue.get_params(block_name="output2", params_required_keys=["p"]) == {"p": 2, "q": 1}
+
+    # the store is built again when `block_outputs` are replaced
+    df3 = pd.DataFrame.from_dict({"col4": [7, 8, 9]}, orient="columns").set_index(pd.Index([1, 0, 2]))
+    output3 = BlockOutput(series=df3, params=None, block_name="output3", execution_order=4)
+    replaced_glue = replace(block_glue, block_outputs={**block_glue.block_outputs, "output3": output3})
+    fixed_df = replaced_glue.get_series_from_required_columns(
+        required_columns=["col1", "col4"], series_required_columns_mode="strict"
+    )
+    # aligned to the index of the latest series, same as `DataFrame.join()`
+    expected = replaced_glue._get_series_by_join(required_columns=["col1", "col4"])
+    assert fixed_df.equals(expected)
+    assert fixed_df.index.to_list() == [1, 0, 2]
+    assert fixed_df["col4"].to_list() == [7, 8, 9]
@@ -0,0 +1,77 @@
+import pandas as pd
+
+from kabutobashi.domain.entity.blocks import BlockCache
+from kabutobashi.domain.entity.blocks.parameterize_blocks import *
+from kabutobashi.domain.entity.blocks.pre_process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.read_blocks import *
+from kabutobashi.domain.services.flow import Flow
+
+PARAMS = {"read_example": {"code": 1439}, "default_pre_process": {"for_analysis": True}}
+BLOCKS = [
+    ReadExampleBlock,
+    DefaultPreProcessBlock,
+    ProcessSmaBlock,
+    ParameterizeSmaBlock,
+    ProcessMacdBlock,
+    ParameterizeMacdBlock,
+]
+
+
+def test_block_cache_memory():
+    cache = BlockCache(max_size=16)
+    first = Flow.initialize(params=PARAMS, cache=cache).then(BLOCKS).block_glue
+    # `read_example` is not cacheable
+    assert cache.stats().misses == 5
+    assert cache.stats().hits == 0
+    assert len(cache) == 5
+
+    second = Flow.initialize(params=PARAMS, cache=cache).then(BLOCKS).block_glue
+    assert cache.stats().memory_hits == 5
+    assert second["parameterize_sma"].params == first["parameterize_sma"].params
+    assert second["process_macd"].series.equals(first["process_macd"].series)
+    assert second["process_macd"].execution_order == first["process_macd"].execution_order
+
+    # changed series are a miss
+    params = {**PARAMS, "read_example": {"code": 9260}}
+    third = Flow.initialize(params=params, cache=cache).then(BLOCKS).block_glue
+    assert cache.stats().misses == 10
+    assert third["parameterize_sma"].params != first["parameterize_sma"].params
+
+
+def test_block_cache_lru_and_disk(tmp_path):
+    cache = BlockCache(max_size=2, cache_dir=str(tmp_path))
+    first = Flow.initialize(params=PARAMS, cache=cache).then(BLOCKS).block_glue
+    assert len(cache) == 2
+
+    restarted_cache = BlockCache(max_size=2, cache_dir=str(tmp_path))
+    second = Flow.initialize(params=PARAMS, cache=restarted_cache).then(BLOCKS).block_glue
+    assert restarted_cache.stats().disk_hits == 5
+    assert restarted_cache.stats().misses == 0
+    assert second["parameterize_macd"].params == first["parameterize_macd"].params
+
+
+def test_block_cache_disk_eviction(tmp_path):
+    cache = BlockCache(max_size=16, cache_dir=str(tmp_path), max_disk_entries=3)
+    Flow.initialize(params=PARAMS, cache=cache).then(BLOCKS)
+    assert len(list(tmp_path.glob("*.pkl"))) == 3
+
+    # the files of the latest entries are kept
+    restarted_cache = BlockCache(max_size=16, cache_dir=str(tmp_path))
+    Flow.initialize(params=PARAMS, cache=restarted_cache).then(BLOCKS)
+    assert restarted_cache.stats().disk_hits == 3
+    assert restarted_cache.stats().misses == 2
+
+    restarted_cache.clear(disk=True)
+    assert len(restarted_cache) == 0
+    assert list(tmp_path.glob("*.pkl")) == []
+
+
+def test_block_cache_key(monkeypatch):
+    series = pd.DataFrame({"close": [1.0, 2.0]})
+    key = BlockCache.key(block_name="process_sma", params={"short_term": 5}, series=series)
+    assert key == BlockCache.key(block_name="process_sma", params={"short_term": 5}, series=series.copy())
+    assert key != BlockCache.key(block_name="process_sma", params={"short_term": 10}, series=series)
+    # the outputs of another version of kabutobashi are not reused
+    monkeypatch.setattr("kabutobashi.__version__", "0.0.0")
+    assert key != BlockCache.key(block_name="process_sma", params={"short_term": 5}, series=series)
@@ -32,6 +32,8 @@ def test_udf_block_decorator_basics():
     assert udf_block._validate_output is not None
     assert udf_block.__init__ is not None
     assert udf_block.__repr__ is not None
+    assert UdfBlock.resolved_params() == {"term": 10}
+    assert UdfBlock.resolved_params(params={"term": 20}) == {"term": 20}
 
 
 def test_udf_block_decorator_basics_2():
@@ -1,4 +1,5 @@
 import pandas as pd
+import pytest
 
 from kabutobashi import Flow, block
 from kabutobashi.domain.entity.blocks import BlockGlue
@@ -71,3 +72,27 @@ def test_udf_block_with_flow():
     assert "post_2_udf_term" in res_2_series.columns
     # check __len__
     assert len(res.block_glue) == 4
+
+
+def test_udf_block_metadata():
+    @block(block_name="udf_metadata")
+    class UdfMetadataBlock:
+        series: pd.DataFrame
+        term: int = 10
+        code: str
+
+        def _process(self) -> dict:
+            return {"udf_term": self.term}
+
+        def _validate_code(self, code: str):
+            if code is None:
+                raise ValueError()
+
+    metadata = UdfMetadataBlock._metadata
+    assert metadata.param_names == ("term", "code")
+    assert [v.arg_names for v in metadata.validators] == [("code",)]
+
+    glue = UdfMetadataBlock.glue(BlockGlue(params={"udf_metadata": {"code": "1439", "term": 5}}))
+    assert glue["udf_metadata"].params["udf_term"] == 5
+    with pytest.raises(ValueError):
+        UdfMetadataBlock.glue(BlockGlue(params={"udf_metadata": {"code": None}}))
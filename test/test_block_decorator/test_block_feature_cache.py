@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from kabutobashi.domain.entity.blocks import FeatureCache
+from kabutobashi.domain.entity.blocks.parameterize_blocks import *
+from kabutobashi.domain.entity.blocks.pre_process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.read_blocks import *
+from kabutobashi.domain.services.flow import Flow
+
+PARAMS = {"read_example": {"code": 1439}, "default_pre_process": {"for_analysis": True}}
+BLOCKS = [
+    ReadExampleBlock,
+    DefaultPreProcessBlock,
+    ProcessAdxBlock,
+    ParameterizeAdxBlock,
+    ProcessPsychoLogicalBlock,
+    ParameterizePsychoLogicalBlock,
+    ProcessSmaBlock,
+    ParameterizeSmaBlock,
+]
+
+
+def test_feature_cache_get():
+    close = pd.Series(np.arange(30, dtype=np.float64) % 7, name="close")
+    cache = FeatureCache()
+    assert np.array_equal(cache.get(close, "shift", 1), close.shift(1).to_numpy(), equal_nan=True)
+    assert np.array_equal(cache.get(close, "diff", 2), close.diff(2).to_numpy(), equal_nan=True)
+    assert np.array_equal(cache.get(close, "rolling_mean", 5), close.rolling(5).mean().to_numpy(), equal_nan=True)
+    assert np.array_equal(cache.get(close, "rolling_std", 5), close.rolling(5).std().to_numpy(), equal_nan=True)
+    assert np.array_equal(cache.get(close, "ewm_mean", 9), close.ewm(span=9).mean().to_numpy(), equal_nan=True)
+    assert cache.stats().misses == 5
+
+    shifted = cache.get(close, "shift", 1)
+    assert cache.stats().hits == 1
+    assert not shifted.flags.writeable
+    with pytest.raises(ValueError):
+        cache.get(close, "unknown", 1)
+
+    # changed values of the same column are computed again
+    changed = cache.get(close * 2, "shift", 1)
+    assert np.array_equal(changed, (close * 2).shift(1).to_numpy(), equal_nan=True)
+    assert cache.stats().misses == 6
+    assert len(cache) == 1
+
+    # a copy of the same values with NaN is the same column
+    with_nan = pd.Series(close.shift(1).to_numpy(), name="close")
+    cache.get(with_nan, "shift", 1)
+    cache.get(with_nan.copy(), "shift", 1)
+    assert cache.stats().hits == 2
+    # a change of any row drops the entries of the column
+    changed = with_nan.copy()
+    changed.iloc[5] = 100.0
+    assert np.array_equal(cache.get(changed, "shift", 1), changed.shift(1).to_numpy(), equal_nan=True)
+    assert cache.stats().hits == 2
+
+
+def test_feature_cache_flow():
+    flow = Flow.initialize(params=PARAMS).then(BLOCKS)
+    stats = flow.block_glue.features.stats()
+    # `close` shifted by 1 is shared by process_adx and process_psycho_logical
+    assert stats.hits == 1
+    assert stats.entries == stats.misses
+
+    no_cache = Flow.initialize(params=PARAMS, feature_cache=False).then(BLOCKS)
+    assert no_cache.block_glue.features is None
+    for block_name in ["process_adx", "process_psycho_logical", "process_sma"]:
+        assert flow.block_glue[block_name].series.equals(no_cache.block_glue[block_name].series)
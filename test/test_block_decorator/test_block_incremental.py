@@ -0,0 +1,232 @@
+import queue
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kabutobashi.domain.entity.blocks.kernels import (
+    EwmMeanState,
+    KernelExtremumState,
+    KernelSumState,
+    PandasRollingState,
+    RollingKernel,
+)
+from kabutobashi.domain.entity.blocks.pre_process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.read_blocks import *
+from kabutobashi.domain.services.flow import Flow
+from kabutobashi.domain.services.incremental import (
+    IncrementalIndicators,
+    IndicatorStateStore,
+    IntradayBarBuilder,
+    queue_snapshots,
+    read_snapshots,
+)
+
+BLOCKS = [
+    ProcessSmaBlock,
+    ProcessMacdBlock,
+    ProcessAdxBlock,
+    ProcessBollingerBandsBlock,
+    ProcessMomentumBlock,
+    ProcessPsychoLogicalBlock,
+    ProcessStochasticsBlock,
+    ProcessIchimokuBlock,
+]
+
+
+@pytest.fixture(scope="module")
+def bars() -> pd.DataFrame:
+    rng = np.random.default_rng(seed=1)
+    rows = 800
+    close = np.round(1000 + np.cumsum(rng.normal(0, 10, rows)), 1)
+    df = pd.DataFrame(
+        {
+            "open": close,
+            "high": close + rng.integers(0, 20, rows),
+            "low": close - rng.integers(0, 20, rows),
+            "close": close,
+            "volume": rng.integers(1, 1000, rows),
+        },
+        index=[f"d{i:05d}" for i in range(rows)],
+    )
+    # flat days make 0 / 0 in the indicators
+    df.iloc[300:330, :4] = close[299]
+    return df
+
+
+def _assert_same(actual: pd.DataFrame, expected: pd.DataFrame):
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_exact=True, check_names=False)
+
+
+@pytest.mark.parametrize("window", [1, 3, 12])
+def test_states_equal_pandas_and_kernels(bars, window):
+    values = bars["close"].to_numpy(dtype=np.float64) / 7
+    values[[0, 50, 51]] = np.nan
+    values[60] = np.inf
+    s = pd.Series(values)
+    kernel = RollingKernel(values)
+    expected = {
+        "sum": s.rolling(window).sum(),
+        "mean": s.rolling(window).mean(),
+        "var": s.rolling(window).var(),
+        "std": s.rolling(window).std(),
+    }
+    for statistic, e in expected.items():
+        state = PandasRollingState(window, statistic)
+        assert np.array_equal([state.update(v) for v in values], e.to_numpy(), equal_nan=True)
+    ewm = EwmMeanState(window)
+    assert np.array_equal([ewm.update(v) for v in values], s.ewm(span=window).mean().to_numpy(), equal_nan=True)
+    kernel_sum, kernel_mean = KernelSumState(window), KernelSumState(window)
+    assert np.array_equal([kernel_sum.sum(v) for v in values], kernel.sum(window), equal_nan=True)
+    assert np.array_equal([kernel_mean.mean(v) for v in values], kernel.mean(window), equal_nan=True)
+    kernel_max = KernelExtremumState(window, is_max=True)
+    assert np.array_equal([kernel_max.update(v) for v in values], kernel.max(window), equal_nan=True)
+    with pytest.raises(ValueError):
+        PandasRollingState(window, "median")
+
+
+def test_incremental_same_as_process(bars):
+    indicators = IncrementalIndicators(blocks=BLOCKS)
+    # the state is built from the history, and updated by the last bar
+    history = indicators.update_frame(bars.iloc[:-1])
+    last = indicators.update(bars.iloc[-1], dt=bars.index[-1])
+    actual = pd.concat([history, pd.DataFrame([last], index=bars.index[-1:]).astype(history.dtypes)])
+    for b in BLOCKS:
+        _assert_same(actual, b(series=bars, params={})._process())
+    with pytest.raises(ValueError):
+        indicators.update(bars.iloc[-1], dt=bars.index[-1])
+
+
+def test_incremental_same_as_flow():
+    blocks = [ProcessSmaBlock, ProcessMacdBlock, ProcessAdxBlock, ProcessStochasticsBlock]
+    params = {"process_sma": {"short_term": 7}, "process_macd": {"macd_span": 5}}
+    flow = Flow.initialize(
+        params={"read_example": {"code": 1375}, "default_pre_process": {"for_analysis": True}, **params}
+    ).then([ReadExampleBlock, DefaultPreProcessBlock] + blocks)
+    series = flow.block_glue["default_pre_process"].series
+    indicators = IncrementalIndicators(blocks=blocks, params=params, code="1375")
+    actual = indicators.update_frame(series)
+    for b in blocks:
+        _assert_same(actual, flow.block_glue[b.block_name].series)
+
+
+def test_incremental_volume_zero(bars):
+    df = bars.copy()
+    df.iloc[[10, 11, 400], df.columns.get_loc("volume")] = 0
+    df.iloc[[10, 11, 400], :4] = 0
+    expected_df = df.copy()
+    expected_df.loc[expected_df["volume"] == 0, ["open", "high", "low", "close"]] = np.nan
+    expected_df = expected_df.ffill()
+    actual = IncrementalIndicators(blocks=BLOCKS).update_frame(df)
+    for b in BLOCKS:
+        _assert_same(actual, b(series=expected_df, params={})._process())
+
+
+def test_incremental_sweep():
+    with pytest.raises(ValueError):
+        IncrementalIndicators(blocks=[ProcessSmaBlock], params={"process_sma": {"short_term": [5, 10]}})
+    with pytest.raises(ValueError):
+        IncrementalIndicators(blocks=[DefaultPreProcessBlock])
+
+
+def test_state_store(bars, tmp_path):
+    store = IndicatorStateStore(state_dir=str(tmp_path / "state"))
+    indicators = IncrementalIndicators(code="1375")
+    indicators.update_frame(bars.iloc[:-1])
+    store.save(indicators)
+    assert store.load(code="9999") is None
+    other_params = IncrementalIndicators(params={"process_sma": {"long_term": 50}})
+    assert store.load(code="1375", params_key=other_params.params_key) is None
+
+    restored = store.load(code="1375", params_key=indicators.params_key)
+    assert restored.last_dt == bars.index[-2]
+    assert restored.update(bars.iloc[-1], dt=bars.index[-1]) == indicators.update(bars.iloc[-1], dt=bars.index[-1])
+    with pytest.raises(ValueError):
+        store.save(IncrementalIndicators())
+
+
+@pytest.fixture(scope="module")
+def snapshots() -> pd.DataFrame:
+    rng = np.random.default_rng(seed=2)
+    timestamps = pd.date_range("2024-01-05 09:00", "2024-01-05 14:59", freq="20s")
+    # no snapshots during the lunch break
+    timestamps = timestamps[(timestamps.hour != 12)]
+    frames = []
+    for code in ["1375", "1439"]:
+        close = np.round(1000 + np.cumsum(rng.normal(0, 1, len(timestamps))), 1)
+        volume = np.cumsum(rng.integers(1, 100, len(timestamps)))
+        frames.append(pd.DataFrame({"code": code, "timestamp": timestamps, "close": close, "volume": volume}))
+    # the snapshots of the codes are interleaved
+    return pd.concat(frames).sort_values(["timestamp", "code"], kind="stable").reset_index(drop=True)
+
+
+def _expected_bars(snapshots: pd.DataFrame, code: str, minutes: int) -> pd.DataFrame:
+    df = snapshots[snapshots["code"] == code].set_index("timestamp")
+    grouped = df.groupby(df.index.floor(f"{minutes}min"))
+    expected = pd.DataFrame(
+        {
+            "open": grouped["close"].first(),
+            "high": grouped["close"].max(),
+            "low": grouped["close"].min(),
+            "close": grouped["close"].last(),
+            "volume": grouped["volume"].last().diff().fillna(grouped["volume"].last().iloc[0]).astype(int),
+        }
+    )
+    expected.index = expected.index.strftime("%Y-%m-%d %H:%M")
+    return expected
+
+
+@pytest.mark.parametrize("minutes", [1, 5, 15])
+def test_intraday_bar_builder(snapshots, minutes):
+    builder = IntradayBarBuilder(minutes=minutes, blocks=BLOCKS[:-1])
+    closed = list(builder.consume(snapshots.to_dict(orient="records")))
+    closed += builder.flush()
+    assert builder.flush() == []
+    for code in ["1375", "1439"]:
+        expected = _expected_bars(snapshots, code=code, minutes=minutes)
+        actual = builder.bars(code=code)
+        assert len([bar for bar in closed if bar["code"] == code]) == len(expected)
+        assert not any(actual["dt"].str.startswith("2024-01-05 12:"))
+        pd.testing.assert_frame_equal(actual[expected.columns], expected, check_names=False, check_dtype=False)
+        # the indicators of the bars are the same as the process blocks over the bars
+        for b in BLOCKS[:-1]:
+            _assert_same(actual, b(series=expected, params={})._process())
+
+
+def test_intraday_bar_builder_sources(snapshots, tmp_path):
+    snapshots = snapshots[snapshots["timestamp"] < "2024-01-05 09:30"]
+    expected = IntradayBarBuilder(minutes=5)
+    list(expected.consume(snapshots.to_dict(orient="records")))
+
+    # a local file, with the columns of `ExtractStockInfoBlock` and the prices as strings
+    path = tmp_path / "snapshots.csv"
+    df = snapshots.assign(
+        dt=snapshots["timestamp"].dt.strftime("%Y-%m-%d"),
+        time=snapshots["timestamp"].dt.strftime("%H:%M:%S"),
+        close=snapshots["close"].map(lambda x: f"{x:,}"),
+    )
+    df.drop(columns=["timestamp"]).to_csv(path, index=False)
+    from_file = IntradayBarBuilder(minutes=5)
+    list(from_file.consume(read_snapshots(str(path))))
+
+    # a queue of a producer
+    snapshot_queue = queue.Queue()
+    for snapshot in snapshots.to_dict(orient="records"):
+        snapshot_queue.put(snapshot)
+    snapshot_queue.put(None)
+    from_queue = IntradayBarBuilder(minutes=5, buffer_size=3)
+    list(from_queue.consume(queue_snapshots(snapshot_queue)))
+
+    for builder in [expected, from_file, from_queue]:
+        builder.flush()
+    pd.testing.assert_frame_equal(from_file.bars(code="1375"), expected.bars(code="1375"))
+    # only the latest bars are kept in the buffer
+    pd.testing.assert_frame_equal(from_queue.bars(code="1375"), expected.bars(code="1375").iloc[-3:])
+
+    builder = IntradayBarBuilder(minutes=5)
+    builder.add(code="1375", timestamp="2024-01-05 09:10", price=1000)
+    with pytest.raises(ValueError):
+        builder.add(code="1375", timestamp="2024-01-05 09:04", price=1000)
+    with pytest.raises(ValueError):
+        IntradayBarBuilder(minutes=3)
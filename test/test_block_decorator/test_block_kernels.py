@@ -0,0 +1,114 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kabutobashi.domain.entity.blocks.kernels import (
+    RollingKernel,
+    get_kernel_backend,
+    kernel_backend,
+    numba_available,
+    rolling_max,
+    rolling_mean,
+    rolling_sum,
+)
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks.abc_process_block import cross_signals
+
+
+@pytest.fixture(scope="module")
+def prices() -> np.ndarray:
+    rng = np.random.default_rng(seed=0)
+    values = 1000 + np.cumsum(rng.normal(0, 10, (2500, 4)), axis=0)
+    values[100:105, 1] = np.nan
+    values[:20, 2] = np.nan
+    return values
+
+
+@pytest.mark.parametrize("window", [1, 3, 12, 70, 3000])
+@pytest.mark.parametrize("min_periods", [None, 1])
+def test_rolling_kernel_equals_pandas(prices, window, min_periods):
+    kernel = RollingKernel(prices)
+    rolling = pd.DataFrame(prices).rolling(window, min_periods=min_periods)
+    # prices in yen
+    integer_kernel = RollingKernel(prices.round())
+    integer_rolling = pd.DataFrame(prices.round()).rolling(window, min_periods=min_periods)
+
+    for statistic in ["max", "min"]:
+        expected = getattr(rolling, statistic)().to_numpy()
+        assert np.array_equal(getattr(kernel, statistic)(window, min_periods), expected, equal_nan=True)
+    for statistic in ["sum", "mean"]:
+        expected = getattr(integer_rolling, statistic)().to_numpy()
+        assert np.array_equal(getattr(integer_kernel, statistic)(window, min_periods), expected, equal_nan=True)
+    for statistic in ["sum", "mean"]:
+        expected = getattr(rolling, statistic)().to_numpy()
+        actual = getattr(kernel, statistic)(window, min_periods)
+        assert np.array_equal(np.isnan(actual), np.isnan(expected))
+        assert np.allclose(actual, expected, rtol=1e-12, equal_nan=True)
+    # pandas has an error of 1e-9 for the variance of a window of 3, so the two-pass variance is the reference
+    head = np.full((window - 1, prices.shape[1]), np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(np.concatenate([head, prices]), window, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        two_pass = np.nanvar(windows, axis=2, ddof=1)
+    for statistic, reference in [("var", two_pass), ("std", np.sqrt(two_pass))]:
+        expected = getattr(rolling, statistic)().to_numpy()
+        actual = getattr(kernel, statistic)(window, min_periods)
+        assert np.array_equal(np.isnan(actual), np.isnan(expected))
+        reference = np.where(np.isnan(expected), np.nan, reference)
+        assert np.allclose(actual, reference, rtol=1e-9, atol=1e-10, equal_nan=True)
+
+
+def test_rolling_kernel_1d(prices):
+    close = pd.Series(prices[:, 0])
+    assert rolling_max(close.to_numpy(), 9).shape == (2500,)
+    assert np.array_equal(rolling_max(close.to_numpy(), 9), close.rolling(9).max().to_numpy(), equal_nan=True)
+    assert np.array_equal(rolling_sum([1, 0, 1, 1], 2), [np.nan, 1, 1, 2], equal_nan=True)
+    assert np.array_equal(rolling_mean([], 2), [])
+    with pytest.raises(ValueError):
+        rolling_mean([1, 2], 0)
+
+
+def test_rolling_kernel_memoize(prices):
+    kernel = RollingKernel(prices)
+    assert kernel.mean(12) is kernel.mean(12)
+    assert kernel.max(12) is kernel.max(12)
+    assert kernel.mean(12) is not kernel.mean(12, min_periods=1)
+
+
+def test_kernel_backend_selection():
+    expected = "numba" if numba_available() else "numpy"
+    assert get_kernel_backend() == expected
+    with kernel_backend("numpy"):
+        assert get_kernel_backend() == "numpy"
+    assert get_kernel_backend() == expected
+    with pytest.raises(ValueError):
+        with kernel_backend("cython"):
+            pass
+
+
+def test_kernel_backends_same(prices):
+    pytest.importorskip("numba")
+    df = pd.DataFrame(
+        {"close": prices[:, 0], "high": prices[:, 0] + 10, "low": prices[:, 0] - 10, "open": prices[:, 0]}
+    )
+    # flat days make 0 / 0 in the indicators
+    df.iloc[200:230] = df.iloc[199].to_numpy()
+    diff = np.diff(prices, axis=0, prepend=np.nan)
+    diff[diff < 1] = 0
+    results = {}
+    for backend in ["numpy", "numba"]:
+        with kernel_backend(backend):
+            results[backend] = [
+                *cross_signals(diff),
+                *cross_signals(diff[:, 0]),
+                ProcessAdxBlock(series=df, params={})._process(),
+                ProcessStochasticsBlock(series=df, params={})._process(),
+            ]
+    for numpy_result, numba_result in zip(results["numpy"], results["numba"]):
+        if isinstance(numpy_result, pd.DataFrame):
+            pd.testing.assert_frame_equal(numpy_result, numba_result, check_exact=True)
+        else:
+            assert numpy_result.dtype == numba_result.dtype
+            assert np.array_equal(numpy_result, numba_result)
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from kabutobashi.domain.entity.blocks.pre_process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.read_blocks import *
+from kabutobashi.domain.services.flow import Flow
+from kabutobashi.domain.services.panel import PricePanel
+
+CODES = [1375, 1439, 9260]
+BLOCKS = [
+    ProcessSmaBlock,
+    ProcessMacdBlock,
+    ProcessBollingerBandsBlock,
+    ProcessStochasticsBlock,
+    ProcessMomentumBlock,
+    ProcessPsychoLogicalBlock,
+    ProcessIchimokuBlock,
+]
+BLOCK_PARAMS = {"process_sma": {"short_term": 7}, "process_bollinger_bands": {"sigmas": (1, 1.5)}}
+
+
+@pytest.fixture(scope="module")
+def flows() -> dict:
+    flows = {}
+    for code in CODES:
+        params = {"read_example": {"code": code}, "default_pre_process": {"for_analysis": True}, **BLOCK_PARAMS}
+        flows[code] = Flow.initialize(params=params).then([ReadExampleBlock, DefaultPreProcessBlock] + BLOCKS)
+    return flows
+
+
+@pytest.fixture(scope="module")
+def panel(flows) -> PricePanel:
+    # the last rows are dropped, so the codes have different lengths
+    df = pd.concat([flows[code].block_glue["default_pre_process"].series for code in CODES]).iloc[:-5]
+    return PricePanel.from_frame(df)
+
+
+def test_panel_same_as_flows(flows, panel):
+    assert panel.codes == ["1375", "1439", "9260"]
+    assert list(panel.lengths) == [122, 122, 117]
+    res = panel.process(BLOCKS, params=BLOCK_PARAMS)
+    for code in CODES:
+        res_code = res[res["code"] == str(code)].set_index("dt")
+        for b in BLOCKS:
+            expected = flows[code].block_glue[b.block_name].series
+            if code == 9260:
+                expected = expected.iloc[:-5]
+            pd.testing.assert_frame_equal(res_code[expected.columns], expected, check_exact=True, check_names=False)
+
+
+def test_panel_wide(panel):
+    res = panel.process([ProcessSmaBlock], output="wide")
+    assert res.shape == (122, 5 * 3)
+    assert res[("sma_short", "9260")].isna().sum() == 4 + 5
+    with pytest.raises(ValueError):
+        panel.process([DefaultPreProcessBlock])
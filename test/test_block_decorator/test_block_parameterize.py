@@ -1,5 +1,7 @@
 from test.conftest import DATABASE_DIR
 
+import pandas as pd
+
 from kabutobashi.domain.entity.blocks.parameterize_blocks import *
 from kabutobashi.domain.entity.blocks.pre_process_blocks import *
 from kabutobashi.domain.entity.blocks.process_blocks import *
@@ -360,3 +362,64 @@ def test_block_parameterize_pct_change():
     assert params["pct_20"] == -0.01581898346743425
     assert params["pct_30"] == -0.010848218441679503
     assert params["pct_40"] == -0.0048062684235296756
+
+
+def test_block_parameterize_impacts():
+    blocks = [
+        ReadExampleBlock,
+        DefaultPreProcessBlock,
+        ProcessSmaBlock,
+        ParameterizeSmaBlock,
+        ProcessMacdBlock,
+        ParameterizeMacdBlock,
+        ProcessAdxBlock,
+        ParameterizeAdxBlock,
+        ProcessBollingerBandsBlock,
+        ParameterizeBollingerBandsBlock,
+        ProcessMomentumBlock,
+        ParameterizeMomentumBlock,
+        ProcessPsychoLogicalBlock,
+        ParameterizePsychoLogicalBlock,
+        ProcessStochasticsBlock,
+        ParameterizeStochasticsBlock,
+    ]
+    res = Flow.initialize(params=PARAMS).then(blocks)
+    prefixes = ["sma", "macd", "adx", "bollinger_bands", "momentum", "psycho_logical", "stochastics"]
+    signals = pd.concat(
+        [res.block_glue[f"process_{p}"].series[[f"{p}_buy_signal", f"{p}_sell_signal"]] for p in prefixes], axis=1
+    )
+    before = signals.copy()
+    impacts = get_impacts(df=signals)
+    assert signals.equals(before)
+    assert list(impacts.keys()) == [f"{p}_impact" for p in prefixes]
+    for p in prefixes:
+        assert impacts[f"{p}_impact"] == res.block_glue[f"parameterize_{p}"].params[f"{p}_impact"]
+    # the bounded rows leave the rounded impacts unchanged
+    assert get_impacts(df=signals, ewm_tolerance=None) == impacts
+    assert get_impacts(df=signals, prefixes=["macd"]) == {"macd_impact": impacts["macd_impact"]}
+    assert get_impacts(df=signals[[]]) == {}
+
+
+def test_block_parameterize_impact():
+    blocks = [
+        ReadExampleBlock,
+        DefaultPreProcessBlock,
+        ProcessSmaBlock,
+        ParameterizeSmaBlock,
+        ProcessMacdBlock,
+        ParameterizeMacdBlock,
+        ParameterizeImpactBlock,
+    ]
+    res = Flow.initialize(params=PARAMS).then(blocks)
+    # the same impacts as the parameterize blocks, of the signals in the flow only
+    assert res.block_glue["parameterize_impact"].params == {
+        "sma_impact": res.block_glue["parameterize_sma"].params["sma_impact"],
+        "macd_impact": res.block_glue["parameterize_macd"].params["macd_impact"],
+        "dt": res.block_glue["parameterize_macd"].params["dt"],
+    }
+
+    flow_path = FlowPath().read_example(code=1439).apply_default_pre_process().sma().impact(influence=3, tail=7)
+    params = Flow.from_json(params_list=flow_path.dumps()).block_glue["parameterize_impact"].params
+    assert params.keys() == {"sma_impact", "dt"}
+    signals = res.block_glue["process_sma"].series
+    assert params["sma_impact"] == get_impacts(df=signals, influence=3, tail=7, prefixes=["sma"])["sma_impact"]
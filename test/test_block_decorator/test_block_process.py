@@ -0,0 +1,275 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks.abc_process_block import cross, cross_signals, sweep_windows
+from kabutobashi.domain.services.flow import BlockDependencyGraph
+
+
+@pytest.fixture(scope="module")
+def price_df() -> pd.DataFrame:
+    rng = np.random.default_rng(seed=0)
+    n = 2500
+    close = 1000 + np.cumsum(rng.normal(0, 10, n))
+    high = close + rng.uniform(0, 15, n)
+    low = close - rng.uniform(0, 15, n)
+    open_ = low + (high - low) * rng.uniform(0, 1, n)
+    # flat days make 0 / 0 in the indicators
+    high[100:130] = low[100:130] = open_[100:130] = close[100:130] = close[99]
+    index = pd.date_range("2014-01-01", periods=n, freq="D").strftime("%Y-%m-%d")
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close}, index=index)
+
+
+def _reference_adx(df: pd.DataFrame, term: int, adx_term: int, adxr_term: int) -> pd.DataFrame:
+    # row-wise implementation, which the vectorized one must reproduce
+    def _true_range(x):
+        a = x["high"] - x["low"]
+        b = x["high"] - x["shift_close"]
+        c = x["shift_close"] - x["low"]
+        return max(max(a, b), max(a, c))
+
+    def _fixed_dm(dm, opposite_dm):
+        return dm if dm > 0 and dm > opposite_dm else 0
+
+    df = df.assign(shift_high=df["high"].shift(1), shift_low=df["low"].shift(1), shift_close=df["close"].shift(1))
+    df = df.assign(
+        plus_dm=df.apply(lambda x: x["high"] - x["shift_high"], axis=1),
+        minus_dm=df.apply(lambda x: x["shift_low"] - x["low"], axis=1),
+    )
+    df = df.assign(
+        fixed_plus_dm=df.apply(lambda x: _fixed_dm(x["plus_dm"], x["minus_dm"]), axis=1),
+        fixed_minus_dm=df.apply(lambda x: _fixed_dm(x["minus_dm"], x["plus_dm"]), axis=1),
+    )
+    df = df.assign(
+        true_range=df.apply(_true_range, axis=1),
+        sum_tr=lambda x: x["true_range"].rolling(term).sum(),
+        sum_plus_dm=lambda x: x["fixed_plus_dm"].rolling(term).sum(),
+        sum_minus_dm=lambda x: x["fixed_minus_dm"].rolling(term).sum(),
+    )
+    df = df.assign(
+        plus_di=df.apply(lambda x: x["sum_plus_dm"] / x["sum_tr"] * 100, axis=1),
+        minus_di=df.apply(lambda x: x["sum_minus_dm"] / x["sum_tr"] * 100, axis=1),
+    )
+    df = df.assign(
+        DX=df.apply(lambda x: abs(x["plus_di"] - x["minus_di"]) / (x["plus_di"] + x["minus_di"]) * 100, axis=1),
+        ADX=lambda x: x["DX"].rolling(adx_term).mean(),
+        ADXR=lambda x: x["DX"].rolling(adxr_term).mean(),
+    )
+    # signals
+    adx_trend = (df["ADX"] - df["ADX"].shift(1)).rolling(5).sum()
+    diff = df["plus_di"] - df["minus_di"]
+    shifted = diff.shift(1)
+    is_cross = diff * shifted < 0
+    df["adx_buy_signal"] = ((adx_trend > 0) & is_cross & (diff > shifted)).astype(int)
+    df["adx_sell_signal"] = ((adx_trend < 0) & is_cross & (diff < shifted)).astype(int)
+    return df
+
+
+def test_process_adx_same_as_reference(price_df: pd.DataFrame):
+    block = ProcessAdxBlock(series=price_df, params={})
+    res = block._process()
+    expected = _reference_adx(df=price_df, term=block.term, adx_term=block.adx_term, adxr_term=block.adxr_term)
+
+    for column in ["DX", "ADX", "ADXR", "adx_buy_signal", "adx_sell_signal"]:
+        pd.testing.assert_series_equal(res[column], expected[column], check_exact=True, check_dtype=False)
+    assert res["DX"].isna().sum() > block.term
+    assert res["adx_buy_signal"].sum() > 0
+    assert res["adx_sell_signal"].sum() > 0
+
+
+def _reference_cross(_s: pd.Series) -> pd.DataFrame:
+    df = pd.DataFrame({"original": _s, "shifted": _s.shift(1)})
+    df = df.assign(
+        is_cross=df.apply(lambda x: 1 if x["original"] * x["shifted"] < 0 else 0, axis=1),
+        is_higher=df.apply(lambda x: 1 if x["original"] > x["shifted"] else 0, axis=1),
+        is_lower=df.apply(lambda x: 1 if x["original"] < x["shifted"] else 0, axis=1),
+    )
+    return df.assign(to_plus=df["is_cross"] * df["is_higher"], to_minus=df["is_cross"] * df["is_lower"])
+
+
+def test_cross_same_as_reference():
+    rng = np.random.default_rng(seed=0)
+    values = rng.normal(0, 1, (300, 4))
+    values[rng.uniform(size=values.shape) < 0.05] = np.nan
+    values[rng.uniform(size=values.shape) < 0.05] = 0
+    df = pd.DataFrame(values, columns=["a", "b", "c", "d"])
+
+    to_plus, to_minus = cross_signals(values)
+    assert to_plus.dtype == np.int8
+    assert to_plus.shape == values.shape
+    multi = cross(df)
+    for idx, column in enumerate(df.columns):
+        expected = _reference_cross(df[column])
+        single = cross(df[column], to_plus_name="buy", to_minus_name="sell")
+        assert single["buy"].to_list() == expected["to_plus"].to_list()
+        assert single["sell"].to_list() == expected["to_minus"].to_list()
+        assert to_plus[:, idx].tolist() == expected["to_plus"].to_list()
+        assert to_minus[:, idx].tolist() == expected["to_minus"].to_list()
+        assert multi[f"{column}_to_plus"].to_list() == expected["to_plus"].to_list()
+    assert cross_signals(np.array([]))[0].shape == (0,)
+
+
+def test_process_bollinger_bands_same_as_reference(price_df: pd.DataFrame):
+    block = ProcessBollingerBandsBlock(series=price_df, params={})
+    res = block._process()
+
+    mean = price_df["close"].rolling(block.band_term).mean()
+    std = price_df["close"].rolling(block.band_term).std()
+    for k in [1, 2, 3]:
+        pd.testing.assert_series_equal(res[f"upper_{k}_sigma"], mean + std * k, check_names=False, check_exact=True)
+        pd.testing.assert_series_equal(res[f"lower_{k}_sigma"], mean - std * k, check_names=False, check_exact=True)
+    over_upper = (price_df["close"] > mean + std * 2).astype(int)
+    over_lower = (price_df["close"] < mean - std * 2).astype(int)
+    assert res["bollinger_bands_buy_signal"].to_list() == over_upper.to_list()
+    assert res["bollinger_bands_sell_signal"].to_list() == over_lower.to_list()
+    pd.testing.assert_series_equal(
+        res["over_upper_continuity"], over_upper.rolling(block.continuity_term).sum(), check_names=False
+    )
+
+    block = ProcessBollingerBandsBlock(series=price_df, params={"sigmas": [0.5, 2.5]})
+    res = block._process()
+    assert list(res.columns[:4]) == ["upper_0.5_sigma", "lower_0.5_sigma", "upper_2.5_sigma", "lower_2.5_sigma"]
+    pd.testing.assert_series_equal(res["upper_2.5_sigma"], mean + std * 2.5, check_names=False, check_exact=True)
+    assert res["bollinger_bands_buy_signal"].to_list() == over_upper.to_list()
+
+
+def _reference_stochastics_signal(k, d, sd, prev_k, prev_d, prev_sd, is_buy: bool) -> float:
+    # row-wise implementation, which the vectorized one must reproduce
+    if is_buy:
+        if (k > 30) | (d > 30) | (sd > 30):
+            return 0
+        if k < 20 and d < 20 and (prev_d > prev_k) and (d < k):
+            return k - d
+        if d < 20 and sd < 20 and (prev_sd > prev_d) and (sd < d):
+            return d - sd
+    else:
+        if (k < 70) | (d < 70) | (sd < 70):
+            return 0
+        if k > 80 and d > 80 and (prev_d < prev_k) and (d > k):
+            return d - k
+        if d > 80 and sd > 80 and (prev_sd < prev_d) and (sd > d):
+            return d - sd
+    return 1 / math.exp(math.pow(k - 20, 2) / 100 + math.pow(d - 20, 2) / 100 + math.pow(sd - 20, 2) / 100)
+
+
+def test_process_stochastics_same_as_reference(price_df: pd.DataFrame):
+    block = ProcessStochasticsBlock(series=price_df, params={})
+    res = block._process()
+    df = res[["K", "D", "SD"]].assign(
+        shift_K=lambda x: x["K"].shift(1), shift_D=lambda x: x["D"].shift(1), shift_SD=lambda x: x["SD"].shift(1)
+    )
+    df = df.fillna(0)
+    columns = ["K", "D", "SD", "shift_K", "shift_D", "shift_SD"]
+    expected_buy = df.apply(lambda x: _reference_stochastics_signal(*x[columns], is_buy=True), axis=1)
+    expected_sell = df.apply(lambda x: _reference_stochastics_signal(*x[columns], is_buy=False), axis=1)
+
+    pd.testing.assert_series_equal(res["stochastics_buy_signal"], expected_buy, check_exact=True, check_names=False)
+    pd.testing.assert_series_equal(res["stochastics_sell_signal"], expected_sell, check_exact=True, check_names=False)
+    # all the branches are covered
+    for signal, crossing in [(expected_buy, df["K"] - df["D"]), (expected_sell, df["D"] - df["K"])]:
+        assert (signal == 0).sum() > 0
+        assert (signal == crossing).sum() > 0
+        assert ((signal > 0) & (signal < 1) & (signal != crossing)).sum() > 0
+
+
+def _reference_psycho_logical(df: pd.DataFrame, psycho_term: int, upper: float, lower: float) -> pd.DataFrame:
+    # row-wise implementation, which the vectorized one must reproduce
+    df_ = df.copy()
+    df_["shift_close"] = df_["close"].shift(1)
+    df_ = df_.fillna(0)
+    df_["diff"] = df_.apply(lambda x: x["close"] - x["shift_close"], axis=1)
+    df_["is_raise"] = df_["diff"].apply(lambda x: 1 if x > 0 else 0)
+    df_["psycho_sum"] = df_["is_raise"].rolling(psycho_term).sum()
+    df_["psycho_line"] = df_["psycho_sum"].apply(lambda x: x / psycho_term)
+    df_["bought_too_much"] = df_["psycho_line"].apply(lambda x: 1 if x > upper else 0)
+    df_["sold_too_much"] = df_["psycho_line"].apply(lambda x: 1 if x < lower else 0)
+    df_["psycho_logical_buy_signal"] = df_["sold_too_much"]
+    df_["psycho_logical_sell_signal"] = df_["bought_too_much"]
+    return df_
+
+
+def test_process_psycho_logical_same_as_reference(price_df: pd.DataFrame):
+    df = price_df.copy()
+    df.iloc[[0, 500, 501]] = np.nan
+    block = ProcessPsychoLogicalBlock(series=df, params={})
+    res = block._process()
+    expected = _reference_psycho_logical(
+        df=df, psycho_term=block.psycho_term, upper=block.upper_threshold, lower=block.lower_threshold
+    )
+    pd.testing.assert_frame_equal(res, expected[res.columns], check_exact=True)
+    # the input series is left as is
+    assert list(df.columns) == ["open", "high", "low", "close"]
+    assert res["bought_too_much"].sum() > 0
+    assert res["sold_too_much"].sum() > 0
+
+
+def test_process_sma_same_as_reference(price_df: pd.DataFrame):
+    block = ProcessSmaBlock(series=price_df, params={})
+    res = block._process()
+    # the cumulative sum of the kernel differs from the summation of pandas by the rounding errors only
+    for name, term in [("short", block.short_term), ("medium", block.medium_term), ("long", block.long_term)]:
+        reference = price_df["close"].rolling(term).mean()
+        pd.testing.assert_series_equal(res[f"sma_{name}"], reference, check_names=False, check_exact=False, rtol=1e-9)
+    sma_short = price_df["close"].rolling(block.short_term).mean()
+    sma_long = price_df["close"].rolling(block.long_term).mean()
+    diff = pd.DataFrame({"sma_long": sma_long, "sma_short": sma_short}).apply(
+        lambda x: x["sma_long"] - x["sma_short"], axis=1
+    )
+    expected = _reference_cross(diff)
+    assert res["sma_buy_signal"].to_list() == expected["to_plus"].to_list()
+    assert res["sma_sell_signal"].to_list() == expected["to_minus"].to_list()
+    assert res["sma_buy_signal"].sum() > 0
+    assert list(price_df.columns) == ["open", "high", "low", "close"]
+
+
+def test_sweep_windows():
+    assert sweep_windows(short_term=5, long_term=70) is None
+    assert sweep_windows(short_term=[5, 10], long_term=70) == [
+        {"short_term": 5, "long_term": 70},
+        {"short_term": 10, "long_term": 70},
+    ]
+    with pytest.raises(ValueError):
+        sweep_windows(short_term=[5, 10], long_term=[70, 80, 90])
+
+
+def test_process_sma_sweep(price_df: pd.DataFrame):
+    terms = [(5, 21, 70), (10, 21, 70), (10, 30, 100)]
+    params = {k: [t[idx] for t in terms] for idx, k in enumerate(["short_term", "medium_term", "long_term"])}
+    res = ProcessSmaBlock(series=price_df, params=params)._process()
+    assert res.shape[1] == 2 + 2 + 2 + 3 * 2
+    assert set(res.columns) == set(BlockDependencyGraph.series_output_columns(block=ProcessSmaBlock, params=params))
+    for short, medium, long in terms:
+        params = {"short_term": short, "medium_term": medium, "long_term": long}
+        expected = ProcessSmaBlock(series=price_df, params=params)._process()
+        for name, term in [("short", short), ("medium", medium), ("long", long)]:
+            pd.testing.assert_series_equal(res[f"sma_{name}_{term}"], expected[f"sma_{name}"], check_names=False)
+        for name in ["sma_buy_signal", "sma_sell_signal"]:
+            pd.testing.assert_series_equal(res[f"{name}_{short}_{long}"], expected[name], check_names=False)
+
+
+def test_process_macd_sweep(price_df: pd.DataFrame):
+    params = {"short_term": [12, 8, 12], "long_term": 26, "macd_span": [9, 9, 5]}
+    res = ProcessMacdBlock(series=price_df, params=params)._process()
+    columns = BlockDependencyGraph.series_output_columns(block=ProcessMacdBlock, params=params)
+    assert set(res.columns) == set(columns)
+    for short, span in [(12, 9), (8, 9), (12, 5)]:
+        expected = ProcessMacdBlock(series=price_df, params={"short_term": short, "macd_span": span})._process()
+        pd.testing.assert_series_equal(res[f"ema_short_{short}"], expected["ema_short"], check_names=False)
+        pd.testing.assert_series_equal(res["ema_long_26"], expected["ema_long"], check_names=False)
+        for name in ["macd", "signal", "histogram", "macd_buy_signal", "macd_sell_signal"]:
+            pd.testing.assert_series_equal(res[f"{name}_{short}_26_{span}"], expected[name], check_names=False)
+
+
+def test_process_bollinger_bands_sweep(price_df: pd.DataFrame):
+    params = {"band_term": [12, 20, 50]}
+    res = ProcessBollingerBandsBlock(series=price_df, params=params)._process()
+    assert res.shape[1] == 3 * 10
+    columns = BlockDependencyGraph.series_output_columns(block=ProcessBollingerBandsBlock, params=params)
+    assert set(res.columns) == set(columns)
+    for term in [12, 20, 50]:
+        expected = ProcessBollingerBandsBlock(series=price_df, params={"band_term": term})._process()
+        for name in expected.columns:
+            pd.testing.assert_series_equal(res[f"{name}_{term}"], expected[name], check_names=False)
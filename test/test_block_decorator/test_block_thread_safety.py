@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from kabutobashi.domain.entity.blocks.pre_process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.read_blocks import *
+from kabutobashi.domain.services.flow import Flow
+
+BLOCKS = [ReadExampleBlock, DefaultPreProcessBlock, ProcessSmaBlock, ProcessBollingerBandsBlock]
+CASES = [(code, short_term) for code in [1439, 9260, 9262] for short_term in [3, 5, 8]]
+
+
+def _execute(code: int, short_term: int) -> Flow:
+    params = {
+        "read_example": {"code": code},
+        "default_pre_process": {"for_analysis": True},
+        "process_sma": {"short_term": short_term},
+        "process_bollinger_bands": {"band_term": short_term + 10},
+    }
+    return Flow.initialize(params=params).then(BLOCKS)
+
+
+def test_block_factory_does_not_mutate_class():
+    short_term = ProcessSmaBlock.short_term
+    flow = _execute(code=1439, short_term=short_term + 1)
+    assert ProcessSmaBlock.short_term == short_term
+    assert "_glue" not in ProcessSmaBlock.__dict__
+    assert "code" not in ReadExampleBlock.__dict__
+    assert flow.block_glue["read_example"].params["code"] == 1439
+
+
+def test_blocks_in_threads_same_as_sequential():
+    expected = {case: _execute(*case).block_glue for case in CASES}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [(case, executor.submit(_execute, *case)) for case in CASES * 4]
+        for case, future in futures:
+            glue = future.result().block_glue
+            assert glue["read_example"].params["code"] == case[0]
+            for block_name in ["process_sma", "process_bollinger_bands"]:
+                assert glue[block_name].series.equals(expected[case][block_name].series)
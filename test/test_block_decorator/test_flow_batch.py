@@ -0,0 +1,28 @@
+import pytest
+
+from kabutobashi.domain.services.flow import Flow, FlowPath
+
+PARAMS_LIST = FlowPath().read_example(code=None).apply_default_pre_process().sma().macd().dumps()
+
+
+def test_flow_map():
+    res = Flow.map(params_list=PARAMS_LIST, codes=[1439, 9260, 1], max_workers=2, chunksize=2)
+    assert len(res) == 3
+    assert set(res.results.keys()) == {1439, 9260}
+    # a code without records fails without aborting the batch
+    assert set(res.errors.keys()) == {1}
+    assert isinstance(res.errors[1], Exception)
+
+    single = Flow.from_json(params_list=FlowPath().read_example(code=1439).apply_default_pre_process().sma().dumps())
+    assert res.results[1439]["parameterize_sma"].params == single.block_glue["parameterize_sma"].params
+    assert res.results[9260]["read_example"].params["code"] == 9260
+
+
+def test_flow_path_map():
+    res = FlowPath().read_example(code=None).apply_default_pre_process().sma().map(codes=[1439])
+    assert res.results[1439]["parameterize_sma"].params["sma_impact"] == 5e-05
+
+
+def test_flow_map_without_code():
+    with pytest.raises(ValueError):
+        Flow.map(params_list=FlowPath().sma().dumps(), codes=[1439])
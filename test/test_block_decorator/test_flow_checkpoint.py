@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from kabutobashi import block
+from kabutobashi.domain.entity.blocks.parameterize_blocks import *
+from kabutobashi.domain.entity.blocks.pre_process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.read_blocks import *
+from kabutobashi.domain.services.flow import Flow, FlowCheckpoint, FlowPath
+
+PARAMS = {"read_example": {"code": 1439}, "default_pre_process": {"for_analysis": True}}
+BLOCKS = [ReadExampleBlock, DefaultPreProcessBlock, ProcessSmaBlock, ParameterizeSmaBlock]
+EXECUTED = []
+# e.g. a network error which does not happen again
+FAILURES = []
+
+
+@block(block_name="checkpoint_udf", params_required_keys=["sma_impact"])
+class CheckpointUdfBlock:
+    sma_impact: float
+
+    def _process(self) -> dict:
+        EXECUTED.append(self.block_name)
+        if FAILURES:
+            raise FAILURES.pop()
+        return {"udf_impact": self.sma_impact * 2}
+
+
+def test_flow_checkpoint_resume(tmp_path):
+    checkpoint = FlowCheckpoint(checkpoint_dir=str(tmp_path / "1439"))
+    FAILURES.append(RuntimeError("failed"))
+    with pytest.raises(RuntimeError):
+        Flow.initialize(params=PARAMS).then(BLOCKS + [CheckpointUdfBlock], checkpoint=checkpoint)
+    assert checkpoint.completed_blocks() == [b.block_name for b in BLOCKS]
+    manifest = json.loads((tmp_path / "1439" / "manifest.json").read_text())
+    assert manifest["blocks"][-1]["params"].endswith(".json")
+    # the files are written to temporary files, and then replaced
+    assert list((tmp_path / "1439").glob("*.tmp")) == []
+
+    # the flow with other params cannot be resumed from the checkpoint
+    with pytest.raises(ValueError):
+        Flow.initialize(params={**PARAMS, "read_example": {"code": 9260}}).then(BLOCKS, checkpoint=checkpoint)
+
+    EXECUTED.clear()
+    resumed = Flow.initialize(params=PARAMS).then(BLOCKS, checkpoint=checkpoint)
+    assert EXECUTED == []
+    expected = Flow.initialize(params=PARAMS).then(BLOCKS).block_glue
+    for block_name, output in expected:
+        if block_name == "FLOW_INITIAL":
+            continue
+        restored = resumed.block_glue[block_name]
+        assert restored.execution_order == output.execution_order
+        if output.series is not None:
+            assert restored.series.equals(output.series)
+        assert restored.params == output.params
+    assert resumed.block_glue.execution_order == expected.execution_order
+
+    # only the rest is executed after the restored blocks
+    resumed = resumed.then(CheckpointUdfBlock, checkpoint=checkpoint)
+    assert EXECUTED == ["checkpoint_udf"]
+    assert (
+        resumed.block_glue["checkpoint_udf"].params["udf_impact"]
+        == expected["parameterize_sma"].params["sma_impact"] * 2
+    )
+    assert checkpoint.completed_blocks()[-1] == "checkpoint_udf"
+
+
+def test_flow_map_with_checkpoint(tmp_path):
+    template = FlowPath().read_example(code=None).apply_default_pre_process().sma()
+    res = template.map(codes=[1439, 1], checkpoint_dir=str(tmp_path))
+    assert set(res.errors.keys()) == {1}
+    assert FlowCheckpoint(checkpoint_dir=str(tmp_path / "1439")).completed_blocks() == [
+        "read_example",
+        "default_pre_process",
+        "process_sma",
+        "parameterize_sma",
+    ]
+
+    resumed = template.map(codes=[1439, 1], checkpoint_dir=str(tmp_path))
+    assert resumed.results[1439]["parameterize_sma"].params == res.results[1439]["parameterize_sma"].params
+    assert resumed.results[1439]["process_sma"].series.equals(res.results[1439]["process_sma"].series)
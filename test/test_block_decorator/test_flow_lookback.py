@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from kabutobashi.application import analysis
+from kabutobashi.domain.entity.blocks.kernels import ewm_warmup
+from kabutobashi.domain.entity.blocks.parameterize_blocks import *
+from kabutobashi.domain.entity.blocks.pre_process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.read_blocks import *
+from kabutobashi.domain.services.flow import Flow, FlowPath, required_lookback
+from kabutobashi.infrastructure.repository import KabutobashiDatabase
+from kabutobashi.utilities import get_working_days_between
+
+PARAMS = {"read_example": {"code": 1439}, "default_pre_process": {"for_analysis": True}}
+
+
+@pytest.fixture(scope="module")
+def long_database_dir(tmp_path_factory) -> str:
+    database_dir = str(tmp_path_factory.mktemp("lookback"))
+    dates = get_working_days_between(start_date="2018-01-04", end_date="2023-12-29")
+    rng = np.random.default_rng(seed=0)
+    close = np.round(1000 + np.cumsum(rng.normal(0, 10, len(dates))))
+    df = pd.DataFrame(
+        {
+            "code": "9999",
+            "dt": dates,
+            "name": "example",
+            "open": close,
+            "close": close,
+            "high": close + rng.integers(0, 20, len(dates)),
+            "low": close - rng.integers(0, 20, len(dates)),
+            "volume": 1000,
+        }
+    )
+    KabutobashiDatabase(database_dir=database_dir).initialize().insert_stock_df(df=df)
+    return database_dir
+
+
+def test_ewm_warmup():
+    assert ewm_warmup(1) == 1
+    # the weight of the values older than the warm-up is below the tolerance
+    decay = 1 - 2 / 27
+    assert decay ** (ewm_warmup(26, tolerance=1e-6) - 1) < 1e-6 < decay ** (ewm_warmup(26, tolerance=1e-6) - 2)
+    with pytest.raises(ValueError):
+        ewm_warmup(0)
+    with pytest.raises(ValueError):
+        ewm_warmup(26, tolerance=0)
+
+
+def test_required_lookback():
+    blocks = [ReadExampleBlock, DefaultPreProcessBlock, ProcessSmaBlock, ParameterizeSmaBlock]
+    # the window of `sma_long`, and the last rows of `parameterize_sma`
+    impact_rows = 5 + ewm_warmup(2) - 1
+    assert required_lookback(blocks=blocks) == 70 + impact_rows
+    assert required_lookback(blocks=blocks, params={"process_sma": {"long_term": 100}}) == 100 + impact_rows
+    # the columns of a sweep are not required by the following blocks, so they are the results of the flow
+    assert required_lookback(blocks=blocks, params={"process_sma": {"long_term": [50, 120]}}) is None
+    sma_params = {"short_term": 5, "medium_term": 21}
+    sweep_rows = ProcessSmaBlock._lookback(params={**sma_params, "long_term": [50, 120]}, rows=3, ewm_tolerance=1e-6)
+    assert sweep_rows == ProcessSmaBlock._lookback(params={**sma_params, "long_term": 120}, rows=3, ewm_tolerance=1e-6)
+    # all the rows are the results of the flow
+    assert required_lookback(blocks=blocks[:3]) is None
+    # the volatility is of all the rows
+    assert required_lookback(blocks=blocks + [ParameterizeVolatilityBlock]) is None
+
+    template = FlowPath().read_sqlite3(code=1439, database_dir="").apply_default_pre_process().sma()
+    assert template.with_lookback().dumps()[0]["params"]["lookback"] == 70 + impact_rows
+    assert template.dumps()[0]["params"]["lookback"] is None
+
+
+def test_read_lookback(long_database_dir):
+    flow = Flow.initialize(params={**PARAMS, "read_example": {"code": 1439, "lookback": 30}}).then(ReadExampleBlock)
+    series = flow.block_glue["read_example"].series
+    assert len(series) == 30
+    assert series["dt"].is_monotonic_increasing
+    df = KabutobashiDatabase(database_dir=long_database_dir).select_stock_df(code="9999", limit=100)
+    assert len(df) == 100
+    assert df["dt"].is_monotonic_increasing
+    assert df["dt"].iloc[-1] == "2023-12-29"
+
+
+def test_analysis_lookback(long_database_dir):
+    bounded = analysis(code="9999", database_dir=long_database_dir, bounded_read=True)
+    full = analysis(code="9999", database_dir=long_database_dir, bounded_read=False)
+    assert len(bounded.block_glue["read_sqlite3"].series) < len(full.block_glue["read_sqlite3"].series) / 5
+    for block_name in [
+        "parameterize_sma",
+        "parameterize_macd",
+        "parameterize_adx",
+        "parameterize_bollinger_bands",
+        "parameterize_momentum",
+        "parameterize_psycho_logical",
+        "parameterize_stochastics",
+    ]:
+        bounded_params = bounded.block_glue[block_name].params
+        full_params = full.block_glue[block_name].params
+        assert bounded_params.keys() == full_params.keys()
+        for k, v in full_params.items():
+            if k == "dt":
+                assert bounded_params[k] == v
+            else:
+                assert bounded_params[k] == pytest.approx(v, rel=1e-6, abs=1e-5)
+    assert bounded.block_glue["fully_connect"].params["impact"] == pytest.approx(
+        full.block_glue["fully_connect"].params["impact"], abs=1e-5
+    )
@@ -0,0 +1,79 @@
+import pytest
+
+from kabutobashi.domain.entity.blocks.pre_process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.read_blocks import *
+from kabutobashi.domain.services.flow import Flow, FlowPath, FlowPlan
+
+FLOW_PATH = (
+    FlowPath()
+    .read_example(code=1439)
+    .apply_default_pre_process()
+    .sma()
+    .macd()
+    .adx()
+    .bollinger_bands()
+    .momentum()
+    .psycho_logical()
+    .stochastics()
+)
+
+
+def test_flow_plan_required_blocks():
+    plan = FLOW_PATH.plan()
+    assert len(plan.required_blocks()) == 16
+    required = [b.block_name for b in plan.required_blocks(outputs=["sma_short"])]
+    assert required == ["read_example", "default_pre_process", "process_sma"]
+    required = [b.block_name for b in plan.required_blocks(outputs=["parameterize_macd", "K"])]
+    assert required == [
+        "read_example",
+        "default_pre_process",
+        "process_macd",
+        "parameterize_macd",
+        "process_stochastics",
+    ]
+
+    # the raw columns are produced by the blocks which do not declare their outputs
+    for column in ["close", "open", "code"]:
+        required = [b.block_name for b in plan.required_blocks(outputs=[column])]
+        assert required == ["read_example", "default_pre_process"]
+    # the latest block which declares the key, as the dependencies of the blocks
+    required = [b.block_name for b in plan.required_blocks(outputs=["dt"])]
+    assert required == ["read_example", "default_pre_process", "process_stochastics", "parameterize_stochastics"]
+
+    with pytest.raises(KeyError):
+        FlowPath().sma().plan().required_blocks(outputs=["unknown"])
+
+
+def test_flow_plan_execute():
+    flow = FLOW_PATH.plan().execute(outputs=["macd_impact"])
+    assert list(flow.block_glue.block_outputs.keys()) == [
+        "FLOW_INITIAL",
+        "read_example",
+        "default_pre_process",
+        "process_macd",
+        "parameterize_macd",
+    ]
+    expected = Flow.from_json(params_list=FLOW_PATH.dumps()).block_glue
+    assert flow.block_glue["parameterize_macd"].params == expected["parameterize_macd"].params
+    assert flow.block_glue["process_macd"].series.equals(expected["process_macd"].series)
+
+
+def test_flow_plan_execute_options():
+    flow = FLOW_PATH.plan().execute(outputs=["close"], profiling=True, keep_outputs=False, feature_cache=False)
+    assert [p.block_name for p in flow.profile().profiles] == ["read_example", "default_pre_process"]
+    assert flow.block_glue["read_example"].released
+    assert not flow.block_glue["default_pre_process"].released
+    assert "close" in flow.block_glue["default_pre_process"].series.columns
+    assert flow.block_glue.features is None
+
+
+def test_flow_plan_sweep():
+    params = {"read_example": {"code": 1439}, "process_sma": {"short_term": [5, 10]}}
+    blocks = [ReadExampleBlock, DefaultPreProcessBlock, ProcessSmaBlock, ProcessMacdBlock]
+    plan = FlowPlan.initialize(params=params).then(blocks)
+    # the columns of the sweep depend on the params
+    required = [b.block_name for b in plan.required_blocks(outputs=["sma_short_5"])]
+    assert required == ["read_example", "default_pre_process", "process_sma"]
+    flow = plan.execute(outputs=["sma_buy_signal_10_70"])
+    assert "sma_buy_signal_10_70" in flow.block_glue["process_sma"].series.columns
@@ -0,0 +1,56 @@
+import json
+
+from kabutobashi.domain.entity.blocks import BlockCache
+from kabutobashi.domain.entity.blocks.parameterize_blocks import *
+from kabutobashi.domain.entity.blocks.pre_process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.read_blocks import *
+from kabutobashi.domain.services.flow import DagScheduler, Flow
+
+PARAMS = {"read_example": {"code": 1439}, "default_pre_process": {"for_analysis": True}}
+BLOCKS = [ReadExampleBlock, DefaultPreProcessBlock, ProcessSmaBlock, ParameterizeSmaBlock]
+
+
+def test_flow_profile(tmp_path):
+    flow = Flow.initialize(params=PARAMS, profiling=True).then(BLOCKS)
+    report = flow.profile()
+    assert [p.block_name for p in report.profiles] == [b.block_name for b in BLOCKS]
+
+    read_example = flow.block_glue["read_example"].profile
+    assert read_example.input_rows is None
+    assert read_example.output_rows == len(flow.block_glue["read_example"].series)
+    process_sma = flow.block_glue["process_sma"].profile
+    assert process_sma.input_rows == process_sma.output_rows
+    assert process_sma.output_memory_bytes > 0
+    assert process_sma.process_wall_time > 0
+    parameterize_sma = flow.block_glue["parameterize_sma"].profile
+    assert parameterize_sma.output_rows is None
+    assert report.total_wall_time >= sum([p.process_wall_time for p in report.profiles])
+
+    df = report.to_frame()
+    assert len(df) == len(BLOCKS)
+    assert "process_cpu_time" in df.columns
+    loaded = json.loads(report.to_json(path=str(tmp_path / "profile.json")))
+    assert loaded == json.loads((tmp_path / "profile.json").read_text())
+    assert len(loaded["profiles"]) == len(BLOCKS)
+    report.to_csv(path=str(tmp_path / "profile.csv"))
+    assert (tmp_path / "profile.csv").read_text().startswith("block_name,")
+
+
+def test_flow_profile_disabled():
+    flow = Flow.initialize(params=PARAMS).then(BLOCKS)
+    assert flow.block_glue["process_sma"].profile is None
+    assert len(flow.profile()) == 0
+
+
+def test_flow_profile_with_cache_and_scheduler():
+    cache = BlockCache()
+    Flow.initialize(params=PARAMS, cache=cache).then(BLOCKS)
+    flow = Flow.initialize(params=PARAMS, cache=cache, profiling=True).then(
+        BLOCKS, scheduler=DagScheduler(executor_type="thread")
+    )
+    profiles = {p.block_name: p for p in flow.profile().profiles}
+    assert len(profiles) == len(BLOCKS)
+    assert profiles["process_sma"].cache_hit
+    assert profiles["process_sma"].process_wall_time == 0.0
+    assert not profiles["read_example"].cache_hit
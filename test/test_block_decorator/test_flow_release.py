@@ -0,0 +1,67 @@
+import pytest
+
+from kabutobashi.domain.entity.blocks.parameterize_blocks import *
+from kabutobashi.domain.entity.blocks.pre_process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.read_blocks import *
+from kabutobashi.domain.entity.blocks.reduce_blocks import *
+from kabutobashi.domain.services.flow import BlockDependencyGraph, DagScheduler, Flow
+
+PARAMS = {"read_example": {"code": 1439}, "default_pre_process": {"for_analysis": True}}
+BLOCKS = [
+    ReadExampleBlock,
+    DefaultPreProcessBlock,
+    ProcessSmaBlock,
+    ParameterizeSmaBlock,
+    ProcessMacdBlock,
+    ParameterizeMacdBlock,
+    ProcessAdxBlock,
+    ParameterizeAdxBlock,
+    ProcessBollingerBandsBlock,
+    ParameterizeBollingerBandsBlock,
+    ProcessMomentumBlock,
+    ParameterizeMomentumBlock,
+    ProcessPsychoLogicalBlock,
+    ParameterizePsychoLogicalBlock,
+    ProcessStochasticsBlock,
+    ParameterizeStochasticsBlock,
+    FullyConnectBlock,
+]
+
+
+def test_block_dependency_graph_releasable_after():
+    graph = BlockDependencyGraph.from_blocks(blocks=BLOCKS)
+    assert graph.releasable_after(2) == []
+    assert graph.releasable_after(3) == [2]
+    # the series are not required after the last process block, but the params are
+    assert graph.releasable_after(14, kind="series") == [0, 1]
+    assert graph.releasable_after(14) == []
+    # fully_connect is the last block which requires the others, and is the result of the flow
+    assert graph.releasable_after(16) == [0, 1, 3, 5, 7, 9, 11, 13, 15]
+
+
+@pytest.mark.parametrize("scheduler", [None, DagScheduler(executor_type="thread")])
+def test_flow_release_outputs(scheduler):
+    kept = Flow.initialize(params=PARAMS).then(BLOCKS).block_glue
+    released = Flow.initialize(params=PARAMS, keep_outputs=False).then(BLOCKS, scheduler=scheduler).block_glue
+
+    assert released["fully_connect"].params == kept["fully_connect"].params
+    assert released.execution_order == kept.execution_order
+    for block_name in ["read_example", "default_pre_process", "process_sma", "parameterize_sma", "process_adx"]:
+        assert released[block_name].released
+        assert released[block_name].series is None
+        assert released[block_name].params is None
+        assert released[block_name].execution_order == kept[block_name].execution_order
+    assert not released["fully_connect"].released
+    assert released["FLOW_INITIAL"].params == PARAMS
+
+
+def test_flow_release_keeps_listed_outputs():
+    flow = Flow.initialize(params=PARAMS, keep_outputs=["process_sma"]).then(BLOCKS[:4])
+    assert not flow.block_glue["process_sma"].released
+    assert flow.block_glue["process_sma"].series is not None
+    # the series are released after the last block which requires them in `then()`
+    assert flow.block_glue["default_pre_process"].released
+    assert flow.block_glue["default_pre_process"].series is None
+    # the results of `then()` are kept for the following `then()`
+    assert not flow.block_glue["parameterize_sma"].released
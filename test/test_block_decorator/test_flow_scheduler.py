@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+
+from kabutobashi import block
+from kabutobashi.domain.entity.blocks.parameterize_blocks import *
+from kabutobashi.domain.entity.blocks.pre_process_blocks import *
+from kabutobashi.domain.entity.blocks.process_blocks import *
+from kabutobashi.domain.entity.blocks.read_blocks import *
+from kabutobashi.domain.entity.blocks.reduce_blocks import *
+from kabutobashi.domain.entity.blocks.write_blocks import *
+from kabutobashi.domain.services.flow import BlockDependencyGraph, DagScheduler, Flow
+
+PARAMS = {"read_example": {"code": 1439}, "default_pre_process": {"for_analysis": True}}
+BLOCKS = [
+    ReadExampleBlock,
+    DefaultPreProcessBlock,
+    ProcessSmaBlock,
+    ParameterizeSmaBlock,
+    ProcessMacdBlock,
+    ParameterizeMacdBlock,
+    ProcessAdxBlock,
+    ParameterizeAdxBlock,
+    ProcessBollingerBandsBlock,
+    ParameterizeBollingerBandsBlock,
+    ProcessMomentumBlock,
+    ParameterizeMomentumBlock,
+    ProcessPsychoLogicalBlock,
+    ParameterizePsychoLogicalBlock,
+    ProcessStochasticsBlock,
+    ParameterizeStochasticsBlock,
+    FullyConnectBlock,
+]
+
+
+@block(block_name="sweep_udf", series_required_columns=["sma_short_5"], params_output_keys=["sma_short_5_max"])
+class SweepUdfBlock:
+    series: pd.DataFrame
+
+    def _process(self) -> dict:
+        return {"sma_short_5_max": self.series["sma_short_5"].max()}
+
+
+def test_block_dependency_graph():
+    graph = BlockDependencyGraph.from_blocks(blocks=BLOCKS + [WriteImpactSqlite3Block])
+    assert graph.dependencies[0] == set()
+    assert graph.dependencies[1] == {0}
+    # process blocks only depend on the series read and pre-processed,
+    # since `default_pre_process` does not declare which columns it outputs
+    assert graph.dependencies[2] == {0, 1}
+    assert graph.dependencies[4] == {0, 1}
+    assert graph.dependencies[14] == {0, 1}
+    # parameterize blocks depend on their process block
+    assert graph.dependencies[3] == {0, 1, 2}
+    assert graph.dependencies[5] == {4}
+    assert graph.ancestors(5) == [0, 1, 4]
+    # reduce block depends on all parameterize blocks
+    assert {3, 5, 7, 9, 11, 13, 15} <= graph.dependencies[16]
+    assert 16 in graph.dependencies[17]
+    assert graph.dependents(4) == [5]
+
+
+def test_block_dependency_graph_sweep():
+    blocks = [ReadExampleBlock, DefaultPreProcessBlock, ProcessSmaBlock, ProcessMacdBlock, SweepUdfBlock]
+    graph = BlockDependencyGraph.from_blocks(blocks=blocks, params={"process_sma": {"short_term": [5, 10]}})
+    # the columns of the sweep depend on the params
+    assert graph.dependencies[4] == {2}
+    assert graph.dependents(2) == [4]
+
+
+@pytest.mark.parametrize("executor_type", ["thread", "process"])
+def test_dag_scheduler_same_as_sequential(executor_type: str):
+    sequential = Flow.initialize(params=PARAMS).then(BLOCKS).block_glue
+    scheduled = (
+        Flow.initialize(params=PARAMS)
+        .then(BLOCKS, scheduler=DagScheduler(executor_type=executor_type, max_workers=4))
+        .block_glue
+    )
+
+    assert list(scheduled.block_outputs.keys()) == list(sequential.block_outputs.keys())
+    assert scheduled.execution_order == sequential.execution_order
+    for block_name, output in sequential:
+        scheduled_output = scheduled[block_name]
+        assert scheduled_output.execution_order == output.execution_order
+        if output.series is None:
+            assert scheduled_output.series is None
+        else:
+            assert scheduled_output.series.equals(output.series)
+        assert scheduled_output.params == output.params
+    assert scheduled["fully_connect"].params["impact"] == sequential["fully_connect"].params["impact"]
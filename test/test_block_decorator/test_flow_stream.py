@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from kabutobashi.application import analysis, analysis_stream
+from kabutobashi.domain.services.flow import Flow, FlowPath
+from kabutobashi.domain.services.flow.stream import execute_stream
+from kabutobashi.infrastructure.repository import KabutobashiDatabase
+from kabutobashi.utilities import get_working_days_between
+
+CODES = ["1001", "1002", "1003", "1004", "1005"]
+
+
+@pytest.fixture(scope="module")
+def stream_database_dir(tmp_path_factory) -> str:
+    database_dir = str(tmp_path_factory.mktemp("stream"))
+    dates = get_working_days_between(start_date="2022-01-04", end_date="2023-12-29")
+    rng = np.random.default_rng(seed=0)
+    database = KabutobashiDatabase(database_dir=database_dir).initialize()
+    for idx, code in enumerate(CODES):
+        # the codes have different rows
+        code_dates = dates[idx * 50 :]
+        close = np.round(1000 + np.cumsum(rng.normal(0, 10, len(code_dates))))
+        df = pd.DataFrame(
+            {
+                "code": code,
+                "dt": code_dates,
+                "name": code,
+                "open": close,
+                "close": close,
+                "high": close + 10,
+                "low": close - 10,
+                "volume": 1000,
+            }
+        )
+        database.insert_stock_df(df=df)
+    # a code without records
+    brand_df = pd.DataFrame({"code": CODES + ["9999"], "name": "", "market": "", "industry_type": ""})
+    database.insert_brand_df(df=brand_df)
+    return database_dir
+
+
+def test_iter_brand_codes(stream_database_dir):
+    database = KabutobashiDatabase(database_dir=stream_database_dir)
+    chunks = list(database.iter_brand_codes(chunk_size=4))
+    assert chunks == [CODES[:4], CODES[4:] + ["9999"]]
+    assert database.select_brand_codes(after="1003", limit=1) == ["1004"]
+    counts = database.select_stock_row_counts(codes=["1001", "1002", "9999"])
+    assert counts["1001"] - counts["1002"] == 50
+    assert counts["9999"] == 0
+    with pytest.raises(ValueError):
+        next(database.iter_brand_codes(chunk_size=0))
+
+
+def test_flow_stream(stream_database_dir):
+    template = FlowPath().read_sqlite3(code=None, database_dir=stream_database_dir).apply_default_pre_process().sma()
+    results = list(Flow.stream(params_list=template.dumps(), database_dir=stream_database_dir, chunk_size=2))
+    assert sorted([res.code for res in results]) == CODES + ["9999"]
+    failed = [res for res in results if not res.succeeded]
+    assert [res.code for res in failed] == ["9999"]
+    assert failed[0].block_glue is None
+
+    counts = KabutobashiDatabase(database_dir=stream_database_dir).select_stock_row_counts(codes=CODES)
+    single = FlowPath().read_sqlite3(code="1003", database_dir=stream_database_dir).apply_default_pre_process().sma()
+    for res in results:
+        if res.succeeded:
+            assert res.rows == counts[res.code]
+            assert res.block_glue["read_sqlite3"].params["code"] == res.code
+    res_1003 = [res for res in results if res.code == "1003"][0]
+    assert res_1003.block_glue["parameterize_sma"].params == single.execute().block_glue["parameterize_sma"].params
+
+    # the rows in flight are bounded by the lookback of the read block
+    bounded = list(template.with_lookback().stream(database_dir=stream_database_dir, max_in_flight_rows=1))
+    lookback = template.with_lookback().dumps()[0]["params"]["lookback"]
+    assert max([res.rows for res in bounded]) == lookback
+
+
+def test_execute_stream_in_flight_rows():
+    params_list = FlowPath().read_example(code=None).apply_default_pre_process().sma().dumps()
+    rows = {1439: 100, 9260: 100, 1: 0}
+    pulled = []
+
+    def _code_chunks():
+        for codes in [[1439], [9260], [1]]:
+            pulled.append(codes)
+            yield codes
+
+    stream = execute_stream(
+        params_list=params_list,
+        code_chunks=_code_chunks(),
+        row_counts=lambda codes: {code: rows[code] for code in codes},
+        max_in_flight_rows=150,
+        max_workers=2,
+    )
+    first = next(stream)
+    # the second code does not fit with the first one, so it is not submitted until the first one is yielded
+    assert first.code == 1439
+    assert pulled == [[1439], [9260]]
+    rest = list(stream)
+    assert {res.code for res in rest} == {9260, 1}
+    assert [res.code for res in rest if not res.succeeded] == [1]
+
+    with pytest.raises(ValueError):
+        execute_stream(params_list=FlowPath().sma().dumps(), code_chunks=[], row_counts=dict)
+    with pytest.raises(ValueError):
+        execute_stream(params_list=params_list, code_chunks=[], row_counts=dict, max_in_flight_rows=0)
+
+
+def test_analysis_stream(stream_database_dir):
+    results = {res.code: res for res in analysis_stream(database_dir=stream_database_dir, max_workers=2)}
+    assert set(results.keys()) == set(CODES + ["9999"])
+    single = analysis(code="1002", database_dir=stream_database_dir)
+    impact = results["1002"].block_glue["fully_connect"].params["impact"]
+    assert impact == single.block_glue["fully_connect"].params["impact"]
+    # only the results of the flow are kept
+    assert results["1002"].block_glue["read_sqlite3"].series is None